@@ -1,23 +1,68 @@
 import re
-import ctypes  # <--- NUEVO: Para conectar con C++
-import os  # <--- NUEVO: Para encontrar la ruta del archivo
+import os
+import threading
 from PyQt6.QtCore import (
     pyqtSignal, QPropertyAnimation,
-    QEasingCurve, QParallelAnimationGroup
+    QEasingCurve, QParallelAnimationGroup, QObject, QTimer
 )
 from PyQt6.QtGui import QMouseEvent, QIcon, QDoubleValidator
-from PyQt6.QtWidgets import QDialog, QHeaderView, QLineEdit, QMessageBox, QTableWidgetItem, QAbstractItemView, \
-    QCompleter
+from PyQt6.QtWidgets import QDialog, QHeaderView, QLineEdit, QMessageBox, QAbstractItemView, \
+    QCompleter, QApplication, QFileDialog, QPushButton, QInputDialog, QProgressDialog
 from PyQt6.QtCore import QDate, QLocale, Qt
 from datetime import date
+from decimal import Decimal
+from functools import partial
 import socket
 from .ui_ControlWindows import Ui_Dialog
+from .ModeloTabla import ModeloTablaColumnar
+from .EjecutorConsultas import EjecutorConsultas
+from .PaginaAuditoria import PaginaAuditoria
+from .PanelInicio import PanelInicio
+from db.importadorInscripciones import ImportadorInscripciones
+from db.facturacion import GeneradorCobros, periodo_desde_texto
+from db.exportador import Exportador, formatos_disponibles
+from cpp import calculos
+
+
+def _pagos_con_total(db_manager, *args):
+    """Corre en el hilo de trabajo: una página de get_pagos_pagina con el Total (Monto - Descuento) tras Descuento."""
+    filas = db_manager.get_pagos_pagina(*args)
+    totales, _ = calculos.totales_de_cobros([f[3] for f in filas], [f[4] for f in filas])
+    return [f[:5] + (total,) + f[5:] for f, total in zip(filas, totales)]
+
+
+def _personas_con_edad(db_manager):
+    """Corre en el hilo de trabajo: get_all_personas_info con la edad (de toda la columna FecNac a la vez)."""
+    filas = db_manager.get_all_personas_info()
+    edades = calculos.calcular_edades([f[-1] for f in filas])
+    return [f[:-1] + (edad,) for f, edad in zip(filas, edades)]
+
+
+def _cambiar_password(db_manager, login, anterior, nuevo):
+    """Corre en el hilo de trabajo (scrypt): verifica la contraseña anterior y guarda la nueva."""
+    valida = db_manager.verificar_password(login, anterior)
+    if valida is None:
+        return None
+    return db_manager.actualizar_password(login, nuevo) if valida else "anterior"
+
+
+class _AvanceExportacion(QObject):
+    """Lleva el avance del hilo de trabajo al de la GUI (la señal llega encolada)."""
+    avance = pyqtSignal(int, int)
 
 
 class ControlWindows(QDialog):
     sesion_cerrada = pyqtSignal()
 
-    def __init__(self, db_manager):
+    # Filas por página al cargar la tabla de pagos (se piden más al hacer scroll)
+    TAM_PAGINA_PAGOS = 200
+    # Pausa al teclear en el filtro de nombre antes de volver a consultar
+    ESPERA_FILTRO_PAGOS_MS = 300
+
+    # Canales que se refrescan solos o traen su propio diálogo de avance: no cambian el cursor
+    CANALES_EN_SEGUNDO_PLANO = {"tablero", "exportacion"}
+
+    def __init__(self, db_manager, intervalo_tablero=60, depuracion=False):
         super().__init__()
 
         self.db_manager = db_manager
@@ -26,41 +71,42 @@ class ControlWindows(QDialog):
 
         # Propiedades para guardar los datos del usuario actual
         self.current_login = None
-        self.current_password = None
         self.current_puesto = None
         self.current_cv_user = None
         self.current_nombre_completo = None
 
-        # --- INTEGRACIÓN C++ (NUEVO BLOQUE) ---
-        self.cpp_lib = None
-        try:
-            # 1. Construir la ruta absoluta hacia la DLL
-            # Estamos en Gui/, subimos uno (..) y entramos a cpp/
-            base_path = os.path.dirname(os.path.abspath(__file__))
-            dll_path = os.path.join(base_path, "..", "cpp", "calculos.dll")
-
-            # 2. Cargar la librería
-            if os.path.exists(dll_path):
-                self.cpp_lib = ctypes.CDLL(dll_path)
-
-                # 3. Configurar los tipos de datos de la función C++
-                # int calcular_edad_cpp(int, int, int, int, int, int)
-                self.cpp_lib.calcular_edad_cpp.argtypes = [
-                    ctypes.c_int, ctypes.c_int, ctypes.c_int,  # Fecha Nacimiento
-                    ctypes.c_int, ctypes.c_int, ctypes.c_int  # Fecha Actual
-                ]
-                self.cpp_lib.calcular_edad_cpp.restype = ctypes.c_int
-                print(f"--- [ÉXITO] Librería C++ cargada desde: {dll_path} ---")
-            else:
-                print(f"--- [AVISO] No se encontró la DLL en: {dll_path} ---")
-
-        except Exception as e:
-            print(f"--- [ERROR] Fallo al cargar librería C++: {e} ---")
-            self.cpp_lib = None
-        # --------------------------------------
+        # --- INTEGRACIÓN C++ (cpp/calculos.py elige el binario de la plataforma) ---
+        self.cpp_lib = calculos.libreria()
 
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
 
+        # --- MODELOS DE LAS TABLAS (datos por columnas, formato al pintar) ---
+        self.modelo_pagos = ModeloTablaColumnar(self)
+        self.modelo_personas = ModeloTablaColumnar(self)
+        self.modelo_catalogos = ModeloTablaColumnar(self)
+        self.ui.tabla_pagos.setModel(self.modelo_pagos)
+        self.ui.tabla_personas.setModel(self.modelo_personas)
+        self.ui.tabla_catalogos.setModel(self.modelo_catalogos)
+
+        # --- CONSULTAS EN SEGUNDO PLANO (un hilo por conexión del pool) ---
+        self.ejecutor = EjecutorConsultas(max_hilos=self.db_manager.pool_max, parent=self)
+        self.ejecutor.ocupado.connect(self._on_ejecutor_ocupado)
+        self._canales_ocupados = set()
+
+        # --- PÁGINA DE AUDITORÍA (se arma en código, no está en el .ui) ---
+        self.pagina_auditoria = PaginaAuditoria(self.db_manager, self.ejecutor)
+        self.ui.stackedWidget.addWidget(self.pagina_auditoria)
+        self.btn_auditoria = QPushButton("Auditoría", parent=self.ui.frame_6)
+        self.btn_auditoria.setObjectName("btn_auditoria")
+        self.ui.verticalLayout_10.insertWidget(self.ui.verticalLayout_10.indexOf(self.ui.pushButton_4),
+                                               self.btn_auditoria)
+
+        # --- TABLERO DE INICIO (sólo consulta mientras Inicio está a la vista) ---
+        self.panel_inicio = PanelInicio(self.db_manager, self.ejecutor, intervalo_tablero, depuracion)
+        self.panel_inicio.setVisible(False)
+        self.ui.verticalLayout_5.addWidget(self.panel_inicio, 1)
+        self.ui.stackedWidget.currentChanged.connect(self._on_pagina_cambiada)
+
         # --- ESTILOS PARA VALIDACIÓN (PASSWORD) ---
         self.style_qline_ok = """
             font-size: 10pt; color: white;
@@ -142,6 +188,8 @@ class ControlWindows(QDialog):
         self.ui.btn_catalogos.clicked.connect(self.mostrar_pagina_catalogos)
         self.ui.btn_asistencia.clicked.connect(self.mostrar_pagina_asistencia)
         self.ui.btn_evaluaciones.clicked.connect(self.mostrar_pagina_evaluaciones)
+        self.btn_auditoria.clicked.connect(self.mostrar_pagina_auditoria)
+        self.pagina_auditoria.btn_regresar.clicked.connect(self.accion_pagos_regresar)
 
         try:
             self.ui.btn_pagos.clicked.connect(self.mostrar_pagina_pagos)
@@ -157,10 +205,24 @@ class ControlWindows(QDialog):
             self.ui.btn_pagos_actualizar.clicked.connect(self.accion_pagos_actualizar)
             self.ui.btn_pagos_borrar.clicked.connect(self.accion_pagos_borrar)
             self.ui.btn_pagos_consultar.clicked.connect(self.accion_pagos_consultar)
+            self.ui.btn_pagos_facturar.clicked.connect(self.accion_pagos_facturar)
+            self.ui.btn_pagos_exportar.clicked.connect(partial(self.accion_exportar, "pagos"))
             self.ui.btn_pagos_cancelar.clicked.connect(self.accion_pagos_cancelar)
             self.ui.btn_pagos_regresar.clicked.connect(self.accion_pagos_regresar)
-            self.ui.filtro_pagos_nombre.textChanged.connect(self.actualizar_filtros_tabla)
+            self.temporizador_filtro_pagos = QTimer(self)
+            self.temporizador_filtro_pagos.setSingleShot(True)
+            self.temporizador_filtro_pagos.setInterval(self.ESPERA_FILTRO_PAGOS_MS)
+            self.temporizador_filtro_pagos.timeout.connect(self.actualizar_filtros_tabla)
+            self.ui.filtro_pagos_nombre.textChanged.connect(self.temporizador_filtro_pagos.start)
             self.ui.filtro_pagos_estado.currentIndexChanged.connect(self.actualizar_filtros_tabla)
+            self.ui.tabla_pagos.verticalScrollBar().valueChanged.connect(self._on_scroll_tabla_pagos)
+            self.ui.tabla_pagos.selectionModel().selectionChanged.connect(
+                lambda: self.configurar_botones_pagos(
+                    "consultando") if self.estado_actual_pagos == "consultando" else None
+            )
+            self.pagos_ultima_llave = None
+            self.pagos_hay_mas = False
+            self.pagos_filtros = (None, None)
 
             self.ui.combo_pagos_tipo.currentIndexChanged.connect(self.actualizar_monto_y_total)
             self.ui.combo_pagos_descuento.currentIndexChanged.connect(self.actualizar_monto_y_total)
@@ -185,15 +247,19 @@ class ControlWindows(QDialog):
             self.ui.btn_per_consultar.clicked.connect(self.accion_personas_consultar)
             self.ui.btn_per_cancelar.clicked.connect(self.accion_personas_cancelar)
             self.ui.btn_per_regresar.clicked.connect(self.accion_personas_regresar)
+            self.ui.btn_per_importar.clicked.connect(self.accion_personas_importar)
+            self.ui.btn_per_exportar.clicked.connect(partial(self.accion_exportar, "personas"))
 
             self.ui.filtro_personas_nombre.textChanged.connect(self.actualizar_filtros_tabla_personas)
             self.ui.filtro_personas_tipo.currentIndexChanged.connect(self.actualizar_filtros_tabla_personas)
 
-            self.ui.tabla_personas.itemSelectionChanged.connect(
+            self.ui.tabla_personas.selectionModel().selectionChanged.connect(
                 lambda: self.configurar_botones_personas(
                     "consultando") if self.estado_actual_personas == "consultando" else None
             )
-            self.ui.combo_per_edocta.addItems(["True", "False"])
+            # EdoCta es TINYINT(1): el texto es el de siempre y el dato el valor de la columna
+            self.ui.combo_per_edocta.addItem("True", 1)
+            self.ui.combo_per_edocta.addItem("False", 0)
 
         except AttributeError:
             pass
@@ -239,27 +305,14 @@ class ControlWindows(QDialog):
         hoy = date.today()
         nac = fecha_nacimiento.toPyDate()
 
-        # 1. INTENTO CON C++
-        if self.cpp_lib:
-            try:
-                # Llamada a la función externa
-                edad = self.cpp_lib.calcular_edad_cpp(
-                    nac.day, nac.month, nac.year,
-                    hoy.day, hoy.month, hoy.year
-                )
-                print(f"[C++] Edad calculada nativamente: {edad}")
-                return edad
-            except Exception as e:
-                print(f"[ERROR C++] Fallo la llamada a la DLL: {e}. Usando Python...")
-
-        # 2. RESPALDO CON PYTHON
-        edad = hoy.year - nac.year - ((hoy.month, hoy.day) < (nac.month, nac.day))
-        print(f"[PYTHON] Edad calculada: {edad}")
+        edad = calculos.calcular_edad(nac, hoy)
+        print(f"[{'C++' if self.cpp_lib else 'PYTHON'}] Edad calculada: {edad}")
         return edad
 
     def mostrar_pagina_personas(self):
         try:
-            # 1. Cambiar a la página de personas
+            # 1. Cambiar a la página de personas (lo que aún cargaba otra página se descarta)
+            self.ejecutor.cancelar()
             self.ui.stackedWidget.setCurrentWidget(self.ui.Personas)
 
             # 2. Registrar auditoría
@@ -267,9 +320,8 @@ class ControlWindows(QDialog):
                 self.current_login, True, "AUDITORIA APP: Acceso al módulo de Personas", self.obtener_ip()
             )
 
-            # 3. Cargar combos y filtros
+            # 3. Cargar combos y filtros (en paralelo, llegan por separado)
             self.cargar_combobox_catalogos_personas()
-            self.cargar_combobox_filtro_tipo_persona()
 
             # 4. Ocultar el menú lateral si está visible
             if not self.menu_esta_oculto:
@@ -283,22 +335,26 @@ class ControlWindows(QDialog):
 
     def mostrar_pagina_pagos(self):
         try:
+            self.ejecutor.cancelar()
             self.ui.stackedWidget.setCurrentWidget(self.ui.Pagos)
             self.db_manager.registrar_acceso(
                 self.current_login, True, "AUDITORIA APP: Acceso al módulo de Pagos", self.obtener_ip()
             )
-            self.cargar_tabla_pagos()
             self.cargar_combobox_alumnos()
             self.cargar_combobox_pagos_y_descuentos()
             self.cargar_combobox_filtro_estado()
+            self.ui.btn_pagos_facturar.setVisible(self.current_puesto != 'Estudiante')
+            self.ui.btn_pagos_exportar.setVisible(self.current_puesto != 'Estudiante')
             if not self.menu_esta_oculto:
                 self.toggle_menu_main()
+            # Carga la tabla (una sola vez; antes se pedía aquí y otra vez al consultar)
             self.accion_pagos_consultar()
         except Exception as e:
             print(f"Error en Pagos: {e}")
 
     def mostrar_pagina_cambiarpass(self):
         try:
+            self.ejecutor.cancelar()
             self.ui.stackedWidget.setCurrentWidget(self.ui.Cambiarpass)
             self.db_manager.registrar_acceso(
                 self.current_login, True, "AUDITORIA APP: Acceso al módulo CambiarPass", self.obtener_ip()
@@ -316,6 +372,7 @@ class ControlWindows(QDialog):
 
     def mostrar_pagina_catalogos(self):
         try:
+            self.ejecutor.cancelar()
             self.ui.stackedWidget.setCurrentWidget(self.ui.Catalogos)
             self.cargar_lista_de_catalogos()
             try:
@@ -335,6 +392,7 @@ class ControlWindows(QDialog):
 
     def mostrar_pagina_asistencia(self):
         try:
+            self.ejecutor.cancelar()
             self.ui.stackedWidget.setCurrentWidget(self.ui.Asistencia)
             self.db_manager.registrar_acceso(
                 self.current_login, True, "Auditoria APP: Acceso al modulo de Asistencia", self.obtener_ip()
@@ -347,6 +405,7 @@ class ControlWindows(QDialog):
 
     def mostrar_pagina_evaluaciones(self):
         try:
+            self.ejecutor.cancelar()
             self.ui.stackedWidget.setCurrentWidget(self.ui.Evaluaciones)
             self.db_manager.registrar_acceso(
                 self.current_login, True, "Auditoria APP: Acceso al modulo de Evaluaciones", self.obtener_ip()
@@ -357,6 +416,19 @@ class ControlWindows(QDialog):
         except Exception as e:
             print(f"Error en evaluaciones: {e}")
 
+    def mostrar_pagina_auditoria(self):
+        try:
+            self.ejecutor.cancelar()
+            self.ui.stackedWidget.setCurrentWidget(self.pagina_auditoria)
+            self.db_manager.registrar_acceso(
+                self.current_login, True, "AUDITORIA APP: Acceso al módulo de Auditoría", self.obtener_ip()
+            )
+            if not self.menu_esta_oculto:
+                self.toggle_menu_main()
+            self.pagina_auditoria.buscar()
+        except Exception as e:
+            print(f"Error en auditoria: {e}")
+
     def toggle_menu_main(self):
         if self.animacion_grupo_main and self.animacion_grupo_main.state() == QParallelAnimationGroup.State.Running:
             return
@@ -402,7 +474,7 @@ class ControlWindows(QDialog):
             self.dragging = False
             self.offset = None
 
-    def set_user_info(self, nombre_completo, puesto, genero, login, password, cv_user):
+    def set_user_info(self, nombre_completo, puesto, genero, login, cv_user):
         saludo = "Bienvenido(a)"
         if genero.lower() == 'masculino':
             saludo = "Bienvenido"
@@ -411,14 +483,21 @@ class ControlWindows(QDialog):
         texto_bienvenida = f"{saludo}:\n{nombre_completo}\n({puesto})"
         self.ui.lbl_bienvenida.setText(texto_bienvenida)
         self.current_login = login
-        self.current_password = password
         self.current_puesto = puesto
         self.current_cv_user = cv_user
         self.current_nombre_completo = nombre_completo
+        # La bitácora y el tablero financiero sólo los consulta la dirección
+        self.btn_auditoria.setVisible(puesto == 'Director')
+        self.panel_inicio.setVisible(puesto == 'Director')
         self.ui.stackedWidget.setCurrentWidget(self.ui.Inicio)
+        self._on_pagina_cambiada()
 
     def cerrar_sesion(self):
         self.ui.lbl_bienvenida.setText("Bienvenido(a):")
+        self.panel_inicio.activar(False)
+        self.ejecutor.cancelar()
+        # Que la bitácora de la sesión quede escrita antes de salir
+        self.db_manager.vaciar_auditoria()
         self.sesion_cerrada.emit()
 
     def toggle_password_visibility(self, line_edit_widget):
@@ -488,11 +567,9 @@ class ControlWindows(QDialog):
         password_anterior = self.ui.txt_pass_anterior.text()
         password_nuevo = self.ui.txt_pass_nuevo.text()
         password_repetir = self.ui.txt_pass_repetir.text()
-        password_actual_guardado = self.current_password
 
-        if not password_actual_guardado == password_anterior:
-            QMessageBox.warning(self, "Acción denegada", "La contraseña anterior no es igual a la ingresada.")
-            self.limpiar_campos_password()
+        if not password_anterior:
+            QMessageBox.warning(self, "Error", "Ingrese la contraseña anterior.")
             return
         if not password_nuevo or not password_repetir:
             QMessageBox.warning(self, "Error", "El campo 'Password Nuevo' y 'Repetir' no pueden estar vacíos.")
@@ -502,7 +579,7 @@ class ControlWindows(QDialog):
             QMessageBox.warning(self, "Error", "Las nuevas contraseñas no coinciden.")
             self.limpiar_campos_password()
             return
-        if password_nuevo == password_actual_guardado:
+        if password_nuevo == password_anterior:
             QMessageBox.warning(self, "Error", "La nueva contraseña no puede ser igual a la anterior.")
             self.limpiar_campos_password()
             return
@@ -514,15 +591,21 @@ class ControlWindows(QDialog):
             self.limpiar_campos_password()
             QMessageBox.warning(self, "Error", "La contraseña nueva no cumple con los criterios.")
             return
-        if self.db_manager.verificar_password_existente(password_nuevo):
-            QMessageBox.warning(self, "Error", "Esa contraseña ya está en uso por otro usuario.")
-            self.limpiar_campos_password()
+        if self.ejecutor.esta_ocupado("password"):
             return
-        exito = self.db_manager.actualizar_password(self.current_login, password_nuevo)
-        if exito:
+        self.ui.btn_aceptar_pass.setEnabled(False)
+        self.ejecutor.ejecutar("password", _cambiar_password, self.db_manager, self.current_login,
+                               password_anterior, password_nuevo,
+                               al_terminar=self._password_cambiado,
+                               al_fallar=lambda _: self._password_cambiado(None))
+
+    def _password_cambiado(self, resultado):
+        self.ui.btn_aceptar_pass.setEnabled(True)
+        self.limpiar_campos_password()
+        if resultado == "anterior":
+            QMessageBox.warning(self, "Acción denegada", "La contraseña anterior no es igual a la ingresada.")
+        elif resultado:
             QMessageBox.information(self, "Éxito", "¡Contraseña actualizada correctamente!")
-            self.current_password = password_nuevo
-            self.limpiar_campos_password()
         else:
             QMessageBox.critical(self, "Error de Base de Datos", "No se pudo actualizar la contraseña.")
 
@@ -551,7 +634,7 @@ class ControlWindows(QDialog):
 
     def configurar_botones_pagos(self, estado):
         self.estado_actual_pagos = estado
-        fila_seleccionada = self.ui.tabla_pagos.currentRow()
+        fila_seleccionada = self._fila_seleccionada(self.ui.tabla_pagos)
         if estado == "consultando":
             self.ui.btn_pagos_nuevo.setText("Nuevo")
             self.ui.btn_pagos_nuevo.setEnabled(True)
@@ -577,27 +660,47 @@ class ControlWindows(QDialog):
             self.ui.btn_pagos_consultar.setEnabled(True)
 
     def cargar_tabla_pagos(self):
+        """Reinicia la tabla y carga la primera página; el resto llega al hacer scroll."""
         if self.current_puesto == 'Estudiante':
-            datos_pagos = self.db_manager.get_pagos_por_usuario(self.current_cv_user)
-            headers = ["ID Cobro", "Fecha", "Tipo", "Monto", "Descuento", "Estado", "Alumno"]
+            headers = ["ID Cobro", "Fecha", "Tipo", "Monto", "Descuento", "Total", "Estado", "Alumno"]
         else:
-            datos_pagos = self.db_manager.get_todos_los_pagos()
-            headers = ["ID Cobro", "Fecha", "Tipo", "Monto", "Descuento", "Estado", "Alumno", "ID Usuario"]
-        self.ui.tabla_pagos.setColumnCount(len(headers))
-        self.ui.tabla_pagos.setHorizontalHeaderLabels(headers)
-        self.ui.tabla_pagos.setRowCount(len(datos_pagos))
-        for row_idx, row_data in enumerate(datos_pagos):
-            for col_idx, col_data in enumerate(row_data):
-                item = QTableWidgetItem(str(col_data))
-                self.ui.tabla_pagos.setItem(row_idx, col_idx, item)
+            headers = ["ID Cobro", "Fecha", "Tipo", "Monto", "Descuento", "Total", "Estado", "Alumno", "ID Usuario"]
+        self.ejecutor.cancelar("tabla_pagos")
+        self.temporizador_filtro_pagos.stop()
+        self.modelo_pagos.reiniciar(headers)
+        self.pagos_ultima_llave = None
+        self.pagos_hay_mas = True
+        # Los filtros se fijan al reiniciar: todas las páginas siguientes usan los mismos
+        estado = self.ui.filtro_pagos_estado.currentText()
+        self.pagos_filtros = (self.ui.filtro_pagos_nombre.text().strip() or None,
+                              estado if estado and estado != "Todos" else None)
+        self.cargar_mas_pagos()
         header = self.ui.tabla_pagos.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.ui.tabla_pagos.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.ui.tabla_pagos.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.ui.tabla_pagos.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
-        self.ui.tabla_pagos.itemSelectionChanged.connect(
-            lambda: self.configurar_botones_pagos("consultando") if self.estado_actual_pagos == "consultando" else None
-        )
+
+    def cargar_mas_pagos(self):
+        """Agrega a la tabla la siguiente página de cobros (paginación por llave)."""
+        if not self.pagos_hay_mas or self.ejecutor.esta_ocupado("tabla_pagos"):
+            return
+        cv_user = self.current_cv_user if self.current_puesto == 'Estudiante' else None
+        self.ejecutor.ejecutar("tabla_pagos", _pagos_con_total, self.db_manager,
+                               self.TAM_PAGINA_PAGOS, self.pagos_ultima_llave, cv_user, *self.pagos_filtros,
+                               al_terminar=self._agregar_pagina_pagos)
+
+    def _agregar_pagina_pagos(self, datos_pagos):
+        self.modelo_pagos.agregar_filas(datos_pagos)
+        if datos_pagos:
+            ultima = datos_pagos[-1]
+            self.pagos_ultima_llave = (ultima[1], ultima[0])  # (FechaCobro, CvCobro)
+        self.pagos_hay_mas = len(datos_pagos) == self.TAM_PAGINA_PAGOS
+
+    def _on_scroll_tabla_pagos(self, valor):
+        barra = self.ui.tabla_pagos.verticalScrollBar()
+        if self.pagos_hay_mas and valor >= barra.maximum() - 5:
+            self.cargar_mas_pagos()
 
     def cargar_combobox_alumnos(self):
         self.ui.combo_pagos_alumno.clear()
@@ -608,28 +711,27 @@ class ControlWindows(QDialog):
         else:
             self.ui.combo_pagos_alumno.setEnabled(True)
             self.ui.combo_pagos_alumno.setEditable(True)
-            alumnos = self.db_manager.get_alumnos_para_combobox()
-            nombres_alumnos = []
             self.ui.combo_pagos_alumno.addItem("Seleccionar alumno...", None)
-            for cv_user, nombre_completo in alumnos:
-                self.ui.combo_pagos_alumno.addItem(nombre_completo, cv_user)
-                nombres_alumnos.append(nombre_completo)
-            completer = QCompleter(nombres_alumnos)
-            completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
-            completer.setFilterMode(Qt.MatchFlag.MatchContains)
-            self.ui.combo_pagos_alumno.setCompleter(completer)
+            self.ejecutor.ejecutar("pagina", self.db_manager.get_alumnos_para_combobox,
+                                   al_terminar=self._llenar_combobox_alumnos)
+
+    def _llenar_combobox_alumnos(self, alumnos):
+        nombres_alumnos = []
+        for cv_user, nombre_completo in alumnos:
+            self.ui.combo_pagos_alumno.addItem(nombre_completo, cv_user)
+            nombres_alumnos.append(nombre_completo)
+        completer = QCompleter(nombres_alumnos)
+        completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        completer.setFilterMode(Qt.MatchFlag.MatchContains)
+        self.ui.combo_pagos_alumno.setCompleter(completer)
 
     def cargar_combobox_pagos_y_descuentos(self):
         self.ui.combo_pagos_tipo.clear()
-        tipos_pago = self.db_manager.get_tipos_pago()
-        self.ui.combo_pagos_tipo.addItem("Seleccione un tipo...", (None, 0.0))
-        for cv, ds, monto in tipos_pago:
-            self.ui.combo_pagos_tipo.addItem(f"{ds} (${monto})", (cv, monto))
+        self.ui.combo_pagos_tipo.addItem("Seleccione un tipo...", (None, Decimal(0)))
         self.ui.combo_pagos_descuento.clear()
-        descuentos = self.db_manager.get_descuentos()
-        self.ui.combo_pagos_descuento.addItem("Seleccione descuento...", (None, 0.0))
-        for cv, ds, porcentaje in descuentos:
-            self.ui.combo_pagos_descuento.addItem(f"{ds} ({porcentaje * 100}%)", (cv, porcentaje))
+        self.ui.combo_pagos_descuento.addItem("Seleccione descuento...", (None, Decimal(0)))
+        self.ejecutor.ejecutar("pagina", self.db_manager.get_tipos_pago, al_terminar=self._llenar_combobox_tipos_pago)
+        self.ejecutor.ejecutar("pagina", self.db_manager.get_descuentos, al_terminar=self._llenar_combobox_descuentos)
         if self.current_puesto == 'Estudiante':
             self.ui.combo_pagos_tipo.setEnabled(False)
             self.ui.combo_pagos_descuento.setEnabled(False)
@@ -637,20 +739,28 @@ class ControlWindows(QDialog):
             self.ui.combo_pagos_tipo.setEnabled(True)
             self.ui.combo_pagos_descuento.setEnabled(True)
 
+    def _llenar_combobox_tipos_pago(self, tipos_pago):
+        for cv, ds, monto in tipos_pago:
+            self.ui.combo_pagos_tipo.addItem(f"{ds} (${monto})", (cv, monto))
+
+    def _llenar_combobox_descuentos(self, descuentos):
+        for cv, ds, porcentaje in descuentos:
+            self.ui.combo_pagos_descuento.addItem(f"{ds} ({porcentaje * 100}%)", (cv, porcentaje))
+
     def actualizar_monto_y_total(self):
         tipo_data = self.ui.combo_pagos_tipo.currentData()
         desc_data = self.ui.combo_pagos_descuento.currentData()
-        monto = 0.0
-        porcentaje_desc = 0.0
+        monto = 0
+        porcentaje_desc = 0
         if tipo_data and tipo_data[0] is not None:
-            monto = float(tipo_data[1])
+            monto = tipo_data[1]
         if desc_data and desc_data[0] is not None:
-            porcentaje_desc = float(desc_data[1])
-        monto_descuento = monto * porcentaje_desc
-        total = monto - monto_descuento
+            porcentaje_desc = desc_data[1]
+        # En centavos exactos, igual que la facturación mensual
+        _, total = calculos.calcular_neto(monto, porcentaje_desc)
         locale = QLocale(QLocale.Language.Spanish, QLocale.Country.Mexico)
-        self.ui.txt_pagos_monto.setText(locale.toString(monto, 'f', 2))
-        self.ui.txt_pagos_total.setText(locale.toString(total, 'f', 2))
+        self.ui.txt_pagos_monto.setText(locale.toString(float(monto), 'f', 2))
+        self.ui.txt_pagos_total.setText(locale.toString(float(total), 'f', 2))
 
     def limpiar_formulario_pagos(self):
         self.ui.lbl_pagos_user_dinamico.setText(self.current_nombre_completo)
@@ -676,51 +786,37 @@ class ControlWindows(QDialog):
         if self.estado_actual_pagos == "actualizando":
             self.guardar_actualizacion_pago()
         else:
-            fila = self.ui.tabla_pagos.currentRow()
+            fila = self._fila_seleccionada(self.ui.tabla_pagos)
             if fila == -1:
                 QMessageBox.warning(self, "Error", "No has seleccionado ningún pago para actualizar.")
                 return
-            headers = [self.ui.tabla_pagos.horizontalHeaderItem(c).text() for c in
-                       range(self.ui.tabla_pagos.columnCount())]
+            # Valores tal como salen del cursor (Decimal, date); el último es el CvDescuento
+            valores = self.modelo_pagos.fila(fila)
             try:
-                datos_fila = {}
-                for idx, header in enumerate(headers):
-                    datos_fila[header] = self.ui.tabla_pagos.item(fila, idx).text()
+                datos_fila = dict(zip(self.modelo_pagos.encabezados(), valores))
                 self.current_pago_id_edicion = int(datos_fila["ID Cobro"])
                 self.limpiar_formulario_pagos()
                 self._set_combo_by_text(self.ui.combo_pagos_alumno, datos_fila["Alumno"])
                 self._set_combo_by_text(self.ui.combo_pagos_tipo, datos_fila["Tipo"])
-                monto = float(datos_fila["Monto"])
-                descuento = float(datos_fila["Descuento"])
-                if monto > 0:
-                    porcentaje_buscado = (descuento / monto) * 100
-                    self._set_combo_by_text(self.ui.combo_pagos_descuento, f"({porcentaje_buscado:.2f}%)")
-                else:
-                    self.ui.combo_pagos_descuento.setCurrentIndex(0)
+                self._set_combo_descuento(valores[-1], datos_fila["Monto"], datos_fila["Descuento"])
                 self.ui.combo_pagos_estado.setCurrentText(datos_fila["Estado"])
-                fecha = QDate.fromString(datos_fila["Fecha"], "yyyy-MM-dd")
-                self.ui.date_pagos_fecha.setDate(fecha)
+                fecha = datos_fila["Fecha"]
+                self.ui.date_pagos_fecha.setDate(QDate(fecha.year, fecha.month, fecha.day))
                 self.ui.stackedWidget_pagos.setCurrentWidget(self.ui.pagos_page_formulario)
                 self.configurar_botones_pagos("actualizando")
             except Exception as e:
                 print(f"Error al leer tabla: {e}")
 
     def accion_pagos_borrar(self):
-        fila = self.ui.tabla_pagos.currentRow()
+        fila = self._fila_seleccionada(self.ui.tabla_pagos)
         if fila == -1:
             QMessageBox.warning(self, "Error", "No has seleccionado ningún pago para borrar.")
             return
         try:
-            id_cobro_item = self.ui.tabla_pagos.item(fila, 0)
-            id_a_borrar = int(id_cobro_item.text())
-            col_alumno_idx = -1
-            for col in range(self.ui.tabla_pagos.columnCount()):
-                header = self.ui.tabla_pagos.horizontalHeaderItem(col).text()
-                if header == "Alumno":
-                    col_alumno_idx = col
-                    break
-            nombre_alumno = self.ui.tabla_pagos.item(fila,
-                                                     col_alumno_idx).text() if col_alumno_idx != -1 else "pago seleccionado"
+            id_a_borrar = int(self.modelo_pagos.valor(fila, 0))
+            col_alumno_idx = self.modelo_pagos.indice_columna("Alumno")
+            nombre_alumno = self.modelo_pagos.valor(fila,
+                                                    col_alumno_idx) if col_alumno_idx != -1 else "pago seleccionado"
             confirmacion = QMessageBox.question(self, "Confirmar Eliminación",
                                                 f"¿Deseas eliminar el pago de {nombre_alumno} (ID: {id_a_borrar})?",
                                                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
@@ -737,10 +833,65 @@ class ControlWindows(QDialog):
     def accion_pagos_consultar(self):
         self.ui.stackedWidget_pagos.setCurrentWidget(self.ui.pagos_page_consulta)
         self.configurar_botones_pagos("consultando")
+        # Sin señales: limpiar los filtros no debe pedir la tabla otra vez
+        self.ui.filtro_pagos_nombre.blockSignals(True)
+        self.ui.filtro_pagos_estado.blockSignals(True)
         self.ui.filtro_pagos_nombre.clear()
         self.ui.filtro_pagos_estado.setCurrentIndex(0)
+        self.ui.filtro_pagos_nombre.blockSignals(False)
+        self.ui.filtro_pagos_estado.blockSignals(False)
         self.cargar_tabla_pagos()
 
+    def accion_pagos_facturar(self):
+        """Genera las mensualidades de un mes: primero calcula cuántas y cuánto, luego pide confirmación."""
+        texto, ok = QInputDialog.getText(self, "Generar mensualidades", "Mes a facturar (AAAA-MM):",
+                                         text=date.today().strftime("%Y-%m"))
+        if not ok or not texto.strip():
+            return
+        try:
+            periodo = periodo_desde_texto(texto)
+        except ValueError:
+            QMessageBox.warning(self, "Error", "El mes debe tener el formato AAAA-MM.")
+            return
+        self.ui.btn_pagos_facturar.setEnabled(False)
+        generador = GeneradorCobros(self.db_manager)
+        self.ejecutor.ejecutar("facturacion", partial(generador.generar, dry_run=True), periodo, self.current_login,
+                               al_terminar=lambda r: self._confirmar_facturacion(generador, r),
+                               al_fallar=self._facturacion_fallida, cancelable=False)
+
+    def _confirmar_facturacion(self, generador, previo):
+        self.ui.btn_pagos_facturar.setEnabled(True)
+        if previo["candidatos"] == 0:
+            QMessageBox.information(self, "Mensualidades",
+                                    f"Todos los alumnos activos ya tienen su mensualidad de {previo['periodo']:%m/%Y}.")
+            return
+        respuesta = QMessageBox.question(
+            self, "Mensualidades",
+            f"Se generarán {previo['candidatos']} cobros de {previo['periodo']:%m/%Y} "
+            f"por un neto de ${previo['monto_neto']:,.2f} (descuentos: ${previo['descuento']:,.2f}).\n\n¿Continuar?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if respuesta != QMessageBox.StandardButton.Yes:
+            return
+        self.ui.btn_pagos_facturar.setEnabled(False)
+        self.ejecutor.ejecutar("facturacion", generador.generar, previo["periodo"], self.current_login,
+                               al_terminar=self._facturacion_terminada, al_fallar=self._facturacion_fallida,
+                               cancelable=False)
+
+    def _facturacion_terminada(self, resumen):
+        self.ui.btn_pagos_facturar.setEnabled(True)
+        omitidos = resumen["candidatos"] - resumen["insertados"]
+        mensaje = f"Cobros generados: {resumen['insertados']}"
+        if omitidos:
+            mensaje += f"\nYa facturados por otra sesión: {omitidos}"
+        QMessageBox.information(self, "Mensualidades", mensaje)
+        if self.ui.stackedWidget.currentWidget() is self.ui.Pagos:
+            self.cargar_tabla_pagos()
+
+    def _facturacion_fallida(self, mensaje):
+        self.ui.btn_pagos_facturar.setEnabled(True)
+        QMessageBox.critical(self, "Mensualidades", f"No se generaron los cobros:\n{mensaje}")
+
     def accion_pagos_cancelar(self):
         self.accion_pagos_consultar()
 
@@ -770,9 +921,9 @@ class ControlWindows(QDialog):
             QMessageBox.warning(self, "Error", "Seleccione un Descuento.")
             return
         tipo_str = self.ui.combo_pagos_tipo.currentText().split(" (")[0]
-        monto_final = float(tipo_data[1])
-        porcentaje_final = float(desc_data[1])
-        descuento_calculado = monto_final * porcentaje_final
+        # Montos como Decimal desde el catálogo hasta el INSERT
+        monto_final = tipo_data[1]
+        descuento_calculado, _ = calculos.calcular_neto(monto_final, desc_data[1])
         exito = self.db_manager.add_pago(
             cv_usuario=cv_usuario,
             fecha=fecha,
@@ -780,7 +931,8 @@ class ControlWindows(QDialog):
             monto=monto_final,
             descuento=descuento_calculado,
             estado=estado,
-            admin_login=self.current_login
+            admin_login=self.current_login,
+            cv_descuento=desc_data[0]
         )
         if exito:
             QMessageBox.information(self, "Éxito", "Pago registrado.")
@@ -789,28 +941,60 @@ class ControlWindows(QDialog):
             QMessageBox.critical(self, "Error", "No se registró en BD.")
 
     def cargar_combobox_filtro_estado(self):
+        self.ui.filtro_pagos_estado.blockSignals(True)
         self.ui.filtro_pagos_estado.clear()
         self.ui.filtro_pagos_estado.addItem("Todos")
         self.ui.filtro_pagos_estado.addItem("Pagado")
         self.ui.filtro_pagos_estado.addItem("Pendiente")
+        self.ui.filtro_pagos_estado.blockSignals(False)
 
     def actualizar_filtros_tabla(self):
-        filtro_nombre = self.ui.filtro_pagos_nombre.text().lower()
-        filtro_estado = self.ui.filtro_pagos_estado.currentText()
-        col_alumno_idx = -1
-        col_estado_idx = -1
-        for col in range(self.ui.tabla_pagos.columnCount()):
-            header = self.ui.tabla_pagos.horizontalHeaderItem(col).text()
-            if header == "Alumno":
-                col_alumno_idx = col
-            elif header == "Estado":
-                col_estado_idx = col
-        for fila in range(self.ui.tabla_pagos.rowCount()):
-            item_alumno = self.ui.tabla_pagos.item(fila, col_alumno_idx).text().lower()
-            item_estado = self.ui.tabla_pagos.item(fila, col_estado_idx).text()
-            match_nombre = filtro_nombre in item_alumno
-            match_estado = (filtro_estado == "Todos" or filtro_estado == item_estado)
-            self.ui.tabla_pagos.setRowHidden(fila, not (match_nombre and match_estado))
+        """
+        Los filtros de nombre y estado van en la consulta (get_pagos_pagina), no sobre
+        las filas ya cargadas: al cambiar se vuelve a cargar desde la primera página.
+        """
+        if self.ui.stackedWidget_pagos.currentWidget() is self.ui.pagos_page_consulta:
+            self.cargar_tabla_pagos()
+
+    def _on_ejecutor_ocupado(self, canal, ocupado):
+        """Cursor de espera mientras haya alguna consulta en curso; la ventana sigue respondiendo."""
+        if canal in self.CANALES_EN_SEGUNDO_PLANO:
+            return
+        antes = bool(self._canales_ocupados)
+        if ocupado:
+            self._canales_ocupados.add(canal)
+        else:
+            self._canales_ocupados.discard(canal)
+        ahora = bool(self._canales_ocupados)
+        if ahora and not antes:
+            QApplication.setOverrideCursor(Qt.CursorShape.BusyCursor)
+        elif antes and not ahora:
+            QApplication.restoreOverrideCursor()
+
+    def _on_pagina_cambiada(self, indice=None):
+        en_inicio = self.ui.stackedWidget.currentWidget() is self.ui.Inicio
+        self.panel_inicio.activar(en_inicio and self.current_puesto == 'Director')
+
+    def _fila_seleccionada(self, tabla):
+        """Índice de la fila seleccionada en una QTableView, o -1 si no hay."""
+        filas = tabla.selectionModel().selectedRows()
+        return filas[0].row() if filas else -1
+
+    def _set_combo_descuento(self, cv_descuento, monto, descuento):
+        """
+        Selecciona el descuento que se guardó con el cobro. Los cobros anteriores a
+        fCobro.CvDescuento que no se pudieron asociar se buscan por su proporción.
+        """
+        combo = self.ui.combo_pagos_descuento
+        proporcion = None
+        if cv_descuento is None and monto:
+            proporcion = (Decimal(descuento or 0) / Decimal(monto)).quantize(calculos.CENTAVO)
+        for indice in range(1, combo.count()):
+            cv, porcentaje = combo.itemData(indice)
+            if cv == cv_descuento or (proporcion is not None and porcentaje == proporcion):
+                combo.setCurrentIndex(indice)
+                return
+        combo.setCurrentIndex(0)
 
     def _set_combo_by_text(self, combobox, texto_a_buscar):
         if not texto_a_buscar:
@@ -840,9 +1024,8 @@ class ControlWindows(QDialog):
             QMessageBox.warning(self, "Error", "Datos incompletos.")
             return
         tipo_str = self.ui.combo_pagos_tipo.currentText().split(" (")[0]
-        monto_final = float(tipo_data[1])
-        porcentaje_final = float(desc_data[1])
-        descuento_calculado = monto_final * porcentaje_final
+        monto_final = tipo_data[1]
+        descuento_calculado, _ = calculos.calcular_neto(monto_final, desc_data[1])
         exito = self.db_manager.update_pago(
             cv_cobro=cv_cobro,
             cv_usuario=cv_usuario,
@@ -851,7 +1034,8 @@ class ControlWindows(QDialog):
             monto=monto_final,
             descuento=descuento_calculado,
             estado=estado,
-            admin_login=self.current_login
+            admin_login=self.current_login,
+            cv_descuento=desc_data[0]
         )
         if exito:
             QMessageBox.information(self, "Éxito", "Pago actualizado.")
@@ -860,41 +1044,45 @@ class ControlWindows(QDialog):
             QMessageBox.critical(self, "Error", "No se actualizó.")
 
     def cargar_combobox_catalogos_personas(self):
-        self.ui.combo_per_genero.clear()
-        self.ui.combo_per_genero.addItem("Seleccione...", None)
-        for cv, ds in self.db_manager.get_generos():
-            self.ui.combo_per_genero.addItem(ds, cv)
-        self.ui.combo_per_puesto.clear()
-        self.ui.combo_per_puesto.addItem("Seleccione...", None)
-        for cv, ds in self.db_manager.get_puestos():
-            self.ui.combo_per_puesto.addItem(ds, cv)
-        self.ui.combo_per_tipopersona.clear()
-        self.ui.combo_per_tipopersona.addItem("Seleccione...", None)
-        for cv, ds in self.db_manager.get_tipos_persona():
-            self.ui.combo_per_tipopersona.addItem(ds, cv)
-
-    def cargar_combobox_filtro_tipo_persona(self):
+        """Pide los tres catálogos en paralelo; tipos de persona también llena el filtro."""
+        self.ejecutor.ejecutar("pagina", self.db_manager.get_generos,
+                               al_terminar=lambda datos: self._llenar_combo_catalogo(self.ui.combo_per_genero, datos))
+        self.ejecutor.ejecutar("pagina", self.db_manager.get_puestos,
+                               al_terminar=lambda datos: self._llenar_combo_catalogo(self.ui.combo_per_puesto, datos))
+        self.ejecutor.ejecutar("pagina", self.db_manager.get_tipos_persona,
+                               al_terminar=self._llenar_combos_tipo_persona)
+
+    def _llenar_combo_catalogo(self, combo, datos):
+        combo.clear()
+        combo.addItem("Seleccione...", None)
+        for cv, ds in datos:
+            combo.addItem(ds, cv)
+
+    def _llenar_combos_tipo_persona(self, tipos):
+        self._llenar_combo_catalogo(self.ui.combo_per_tipopersona, tipos)
+        self.cargar_combobox_filtro_tipo_persona(tipos)
+
+    def cargar_combobox_filtro_tipo_persona(self, tipos):
         self.ui.filtro_personas_tipo.clear()
         self.ui.filtro_personas_tipo.addItem("Todos")
-        for cv, ds in self.db_manager.get_tipos_persona():
+        for cv, ds in tipos:
             self.ui.filtro_personas_tipo.addItem(ds)
 
     def cargar_tabla_personas(self):
-        datos_personas = self.db_manager.get_all_personas_info()
-        headers = ["ID Usuario", "Login", "Nombre Completo", "Tipo", "Puesto", "E-mail", "Telefono", "EdoCta"]
-        self.ui.tabla_personas.setColumnCount(len(headers))
-        self.ui.tabla_personas.setHorizontalHeaderLabels(headers)
-        self.ui.tabla_personas.setRowCount(len(datos_personas))
-        for row_idx, row_data in enumerate(datos_personas):
-            for col_idx, col_data in enumerate(row_data):
-                item = QTableWidgetItem(str(col_data))
-                self.ui.tabla_personas.setItem(row_idx, col_idx, item)
+        self.ejecutor.cancelar("tabla_personas")
+        self.ejecutor.ejecutar("tabla_personas", _personas_con_edad, self.db_manager,
+                               al_terminar=self._mostrar_tabla_personas)
         header = self.ui.tabla_personas.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.ui.tabla_personas.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.ui.tabla_personas.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.ui.tabla_personas.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
 
+    def _mostrar_tabla_personas(self, datos_personas):
+        headers = ["ID Usuario", "Login", "Nombre Completo", "Tipo", "Puesto", "E-mail", "Telefono", "EdoCta", "Edad"]
+        self.modelo_personas.reiniciar(headers, datos_personas)
+        self.actualizar_filtros_tabla_personas()
+
     def limpiar_formulario_personas(self):
         self.ui.lbl_per_user_dinamico.setText(self.current_nombre_completo)
         self.ui.txt_per_nombre.clear()
@@ -904,6 +1092,7 @@ class ControlWindows(QDialog):
         self.ui.txt_per_telefono.clear()
         self.ui.txt_per_login.clear()
         self.ui.txt_per_password.clear()
+        self.ui.txt_per_password.setPlaceholderText("")
         self.ui.date_per_fecnac.setDate(QDate(2000, 1, 1))
         self.ui.date_per_fecini.setDate(QDate.currentDate())
         self.ui.date_per_fecven.setDate(QDate.currentDate().addYears(1))
@@ -915,7 +1104,7 @@ class ControlWindows(QDialog):
 
     def configurar_botones_personas(self, estado):
         self.estado_actual_personas = estado
-        fila_seleccionada = self.ui.tabla_personas.currentRow()
+        fila_seleccionada = self._fila_seleccionada(self.ui.tabla_personas)
         if estado == "consultando":
             self.ui.btn_per_nuevo.setText("Nuevo")
             self.ui.btn_per_nuevo.setEnabled(True)
@@ -947,9 +1136,9 @@ class ControlWindows(QDialog):
         filtro_tipo = self.ui.filtro_personas_tipo.currentText()
         col_nombre_idx = 2
         col_tipo_idx = 3
-        for fila in range(self.ui.tabla_personas.rowCount()):
-            item_nombre = self.ui.tabla_personas.item(fila, col_nombre_idx).text().lower()
-            item_tipo = self.ui.tabla_personas.item(fila, col_tipo_idx).text()
+        for fila in range(self.modelo_personas.rowCount()):
+            item_nombre = str(self.modelo_personas.valor(fila, col_nombre_idx)).lower()
+            item_tipo = str(self.modelo_personas.valor(fila, col_tipo_idx))
             match_nombre = filtro_nombre in item_nombre
             match_tipo = (filtro_tipo == "Todos" or filtro_tipo == item_tipo)
             self.ui.tabla_personas.setRowHidden(fila, not (match_nombre and match_tipo))
@@ -969,6 +1158,78 @@ class ControlWindows(QDialog):
         self.ui.filtro_personas_tipo.setCurrentIndex(0)
         self.cargar_tabla_personas()
 
+    def accion_personas_importar(self):
+        ruta, _ = QFileDialog.getOpenFileName(self, "Importar inscripciones", "",
+                                              "Inscripciones (*.csv *.xlsx)")
+        if not ruta:
+            return
+        self.ui.btn_per_importar.setEnabled(False)
+        importador = ImportadorInscripciones(self.db_manager)
+        # No se cancela al cambiar de página: el resumen debe mostrarse al terminar
+        self.ejecutor.ejecutar("importacion", importador.importar, ruta, self.current_login,
+                               al_terminar=self._importacion_terminada, al_fallar=self._importacion_fallida,
+                               cancelable=False)
+
+    def _importacion_terminada(self, resumen):
+        self.ui.btn_per_importar.setEnabled(True)
+        mensaje = f"Personas insertadas: {resumen['insertadas']}\nFilas rechazadas: {resumen['rechazadas']}"
+        if resumen['archivo_errores']:
+            mensaje += f"\n\nDetalle de los errores en:\n{resumen['archivo_errores']}"
+        QMessageBox.information(self, "Importación", mensaje)
+        if self.ui.stackedWidget.currentWidget() is self.ui.Personas:
+            self.cargar_tabla_personas()
+
+    def _importacion_fallida(self, mensaje):
+        self.ui.btn_per_importar.setEnabled(True)
+        QMessageBox.critical(self, "Importación",
+                             f"No se pudo completar la importación:\n{mensaje}\n\n"
+                             "Si vuelve a importar el mismo archivo se continúa desde el último lote guardado.")
+
+    # --- EXPORTACIÓN (Pagos y Personas) ---
+
+    def accion_exportar(self, tabla):
+        """Exporta la tabla completa desde la BD (no sólo lo cargado en pantalla) en segundo plano."""
+        if self.ejecutor.esta_ocupado("exportacion"):
+            QMessageBox.information(self, "Exportar", "Ya hay una exportación en curso.")
+            return
+        filtros = {".csv": "CSV (*.csv)", ".xlsx": "Excel (*.xlsx)", ".pdf": "PDF (*.pdf)"}
+        disponibles = formatos_disponibles()
+        ruta, filtro = QFileDialog.getSaveFileName(self, f"Exportar {tabla}", f"{tabla}.csv",
+                                                   ";;".join(filtros[f] for f in disponibles))
+        if not ruta:
+            return
+        if os.path.splitext(ruta)[1].lower() not in disponibles:
+            ruta += next(f for f in disponibles if filtros[f] == filtro)
+
+        dialogo = QProgressDialog(f"Exportando {tabla}...", "Cancelar", 0, 0, self)
+        dialogo.setWindowTitle("Exportar")
+        dialogo.setWindowModality(Qt.WindowModality.WindowModal)
+        dialogo.setMinimumDuration(0)
+        cancelar = threading.Event()
+        dialogo.canceled.connect(cancelar.set)
+        avance = _AvanceExportacion(dialogo)
+        avance.avance.connect(lambda escritas, total: (dialogo.setMaximum(total), dialogo.setValue(escritas)))
+
+        exportador = Exportador(self.db_manager)
+        self.ejecutor.ejecutar("exportacion", exportador.exportar, tabla, ruta, self.current_login,
+                               avance.avance.emit, cancelar.is_set,
+                               al_terminar=partial(self._exportacion_terminada, dialogo),
+                               al_fallar=partial(self._exportacion_fallida, dialogo),
+                               cancelable=False)
+
+    def _exportacion_terminada(self, dialogo, resumen):
+        dialogo.reset()
+        dialogo.deleteLater()
+        if resumen["cancelado"]:
+            QMessageBox.information(self, "Exportar", "Exportación cancelada; no se guardó el archivo.")
+        else:
+            QMessageBox.information(self, "Exportar", f"Se exportaron {resumen['filas']} filas a:\n{resumen['ruta']}")
+
+    def _exportacion_fallida(self, dialogo, mensaje):
+        dialogo.reset()
+        dialogo.deleteLater()
+        QMessageBox.critical(self, "Exportar", f"No se pudo completar la exportación:\n{mensaje}")
+
     def accion_personas_cancelar(self):
         self.accion_personas_consultar()
 
@@ -1025,7 +1286,7 @@ class ControlWindows(QDialog):
             "Password": self.ui.txt_per_password.text(),
             "FecIni": self.ui.date_per_fecini.date().toString("yyyy-MM-dd"),
             "FecVen": self.ui.date_per_fecven.date().toString("yyyy-MM-dd"),
-            "EdoCta": self.ui.combo_per_edocta.currentText()
+            "EdoCta": self.ui.combo_per_edocta.currentData()
         }
         exito = self.db_manager.add_persona_y_usuario(datos_persona, datos_usuario, self.current_login)
         if exito:
@@ -1051,13 +1312,21 @@ class ControlWindows(QDialog):
             self.cargar_datos_persona_en_formulario()
 
     def cargar_datos_persona_en_formulario(self):
-        fila = self.ui.tabla_personas.currentRow()
+        fila = self._fila_seleccionada(self.ui.tabla_personas)
         if fila == -1:
             QMessageBox.warning(self, "Error", "Seleccione una persona.")
             return
         try:
-            cv_user_a_editar = int(self.ui.tabla_personas.item(fila, 0).text())
-            datos = self.db_manager.get_persona_info_by_id(cv_user_a_editar)
+            cv_user_a_editar = int(self.modelo_personas.valor(fila, 0))
+        except Exception as e:
+            print(f"Error cargando persona: {e}")
+            return
+        self.ejecutor.cancelar("formulario_personas")
+        self.ejecutor.ejecutar("formulario_personas", self.db_manager.get_persona_info_by_id, cv_user_a_editar,
+                               al_terminar=lambda datos: self._mostrar_persona_en_formulario(cv_user_a_editar, datos))
+
+    def _mostrar_persona_en_formulario(self, cv_user_a_editar, datos):
+        try:
             if not datos:
                 QMessageBox.critical(self, "Error", "No se pudieron obtener los datos.")
                 return
@@ -1070,11 +1339,12 @@ class ControlWindows(QDialog):
             self.ui.txt_per_email.setText(datos['E_mail'])
             self.ui.txt_per_telefono.setText(datos['Telefono'])
             self.ui.txt_per_login.setText(datos['Login'])
-            self.ui.txt_per_password.setText(datos['Password'])
+            # Sólo se guarda el hash; vacío significa conservar la contraseña actual
+            self.ui.txt_per_password.setPlaceholderText("Sin cambios")
             self._set_combo_by_data(self.ui.combo_per_genero, datos['CvGenero'])
             self._set_combo_by_data(self.ui.combo_per_puesto, datos['CvPuesto'])
             self._set_combo_by_data(self.ui.combo_per_tipopersona, datos['CvTpPerso'])
-            self.ui.combo_per_edocta.setCurrentText(datos['EdoCta'])
+            self._set_combo_by_data(self.ui.combo_per_edocta, datos['EdoCta'])
             self.ui.date_per_fecnac.setDate(QDate.fromString(str(datos['FecNac']), "yyyy-MM-dd"))
             self.ui.date_per_fecini.setDate(QDate.fromString(str(datos['FecIni']), "yyyy-MM-dd"))
             self.ui.date_per_fecven.setDate(QDate.fromString(str(datos['FecVen']), "yyyy-MM-dd"))
@@ -1093,8 +1363,7 @@ class ControlWindows(QDialog):
             "Apellido Paterno": self.ui.txt_per_apepat,
             "Apellido Materno": self.ui.txt_per_apemat,
             "E-mail": self.ui.txt_per_email,
-            "Login": self.ui.txt_per_login,
-            "Password": self.ui.txt_per_password
+            "Login": self.ui.txt_per_login
         }
         for nombre, widget in campos_texto.items():
             if not widget.text().strip():
@@ -1124,7 +1393,7 @@ class ControlWindows(QDialog):
             "Password": self.ui.txt_per_password.text(),
             "FecIni": self.ui.date_per_fecini.date().toString("yyyy-MM-dd"),
             "FecVen": self.ui.date_per_fecven.date().toString("yyyy-MM-dd"),
-            "EdoCta": self.ui.combo_per_edocta.currentText()
+            "EdoCta": self.ui.combo_per_edocta.currentData()
         }
         exito = self.db_manager.update_persona_y_usuario(cv_user, cv_person, datos_persona, datos_usuario,
                                                          self.current_login)
@@ -1135,13 +1404,13 @@ class ControlWindows(QDialog):
             QMessageBox.critical(self, "Error", "No se pudo actualizar.")
 
     def accion_personas_borrar(self):
-        fila = self.ui.tabla_personas.currentRow()
+        fila = self._fila_seleccionada(self.ui.tabla_personas)
         if fila == -1:
             QMessageBox.warning(self, "Error", "Seleccione una persona.")
             return
         try:
-            cv_user = int(self.ui.tabla_personas.item(fila, 0).text())
-            nombre = self.ui.tabla_personas.item(fila, 2).text()
+            cv_user = int(self.modelo_personas.valor(fila, 0))
+            nombre = self.modelo_personas.valor(fila, 2)
             if cv_user == self.current_cv_user:
                 QMessageBox.critical(self, "Error", "No puedes borrar tu propia cuenta.")
                 return
@@ -1195,6 +1464,7 @@ class ControlWindows(QDialog):
         if self.estado_actual_catalogos == "nuevo":
             self.db_manager.registrar_acceso(self.current_login, True, f"INSERT catalogo '{catalogo}' (Sim)",
                                              self.obtener_ip())
+            self._invalidar_cache_catalogo(catalogo)
             QMessageBox.information(self, "Simulación", f"Registro guardado en '{catalogo}'.")
             self.accion_catalogos_consultar()
         else:
@@ -1208,6 +1478,7 @@ class ControlWindows(QDialog):
         if self.estado_actual_catalogos == "actualizando":
             self.db_manager.registrar_acceso(self.current_login, True, f"UPDATE catalogo '{catalogo}' (Sim)",
                                              self.obtener_ip())
+            self._invalidar_cache_catalogo(catalogo)
             QMessageBox.information(self, "Simulación", f"Registro actualizado en '{catalogo}'.")
             self.accion_catalogos_consultar()
         else:
@@ -1223,8 +1494,14 @@ class ControlWindows(QDialog):
                                       self.ui.btn_cata_borrar, self.ui.btn_cata_cancelar, self.ui.btn_cata_consultar)
         self.db_manager.registrar_acceso(self.current_login, True, f"DELETE catalogo '{catalogo}' (Sim)",
                                          self.obtener_ip())
+        self._invalidar_cache_catalogo(catalogo)
         QMessageBox.information(self, "Simulación", f"Registro borrado de '{catalogo}'.")
 
+    def _invalidar_cache_catalogo(self, catalogo):
+        """Tras escribir en un catálogo, los combos deben volver a leerlo de la BD."""
+        config = getattr(self, "catalogo_config", {}).get(catalogo)
+        self.db_manager.invalidar_catalogo(config[0] if config else None)
+
     def accion_catalogos_consultar(self):
         self.estado_actual_catalogos = "consultando"
         self._configurar_botones_crud(self.estado_actual_catalogos, self.ui.btn_cata_nuevo, self.ui.btn_cata_actualizar,
@@ -1328,13 +1605,10 @@ class ControlWindows(QDialog):
         if not seleccion or seleccion not in self.catalogo_config:
             return
         tabla, col_id, col_desc = self.catalogo_config[seleccion]
-        datos = self.db_manager.get_catalogo_dinamico(tabla, col_id, col_desc)
-        self.ui.tabla_catalogos.setColumnCount(2)
-        self.ui.tabla_catalogos.setHorizontalHeaderLabels(["ID", "Descripción"])
-        self.ui.tabla_catalogos.setRowCount(len(datos))
-        for row_idx, (id_val, desc_val) in enumerate(datos):
-            self.ui.tabla_catalogos.setItem(row_idx, 0, QTableWidgetItem(str(id_val)))
-            self.ui.tabla_catalogos.setItem(row_idx, 1, QTableWidgetItem(str(desc_val)))
+        # Si el usuario cambia de catálogo antes de que llegue el anterior, ése se descarta
+        self.ejecutor.cancelar("tabla_catalogos")
+        self.ejecutor.ejecutar("tabla_catalogos", self.db_manager.get_catalogo_dinamico, tabla, col_id, col_desc,
+                               al_terminar=lambda datos: self.modelo_catalogos.reiniciar(["ID", "Descripción"], datos))
         self.ui.tabla_catalogos.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.ui.tabla_catalogos.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.ui.tabla_catalogos.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
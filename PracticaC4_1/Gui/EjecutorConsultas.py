@@ -0,0 +1,107 @@
+import logging
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class _SenalesTarea(QObject):
+    """Vive en el hilo de la GUI; lo que se emite desde el hilo de trabajo llega encolado."""
+    terminado = pyqtSignal(int, object)
+    fallido = pyqtSignal(int, str)
+
+
+class _TareaConsulta(QRunnable):
+    def __init__(self, id_tarea, funcion, args, senales):
+        super().__init__()
+        self.id_tarea = id_tarea
+        self.funcion = funcion
+        self.args = args
+        self.senales = senales
+
+    def run(self):
+        try:
+            resultado = self.funcion(*self.args)
+        except Exception as e:
+            self.senales.fallido.emit(self.id_tarea, str(e))
+            return
+        self.senales.terminado.emit(self.id_tarea, resultado)
+
+
+class EjecutorConsultas(QObject):
+    """
+    Corre las llamadas a DatabaseManager en un QThreadPool y entrega el
+    resultado en el hilo de la GUI. Las tareas se agrupan por canal
+    ("pagina", "tabla_pagos", ...): al cancelar un canal, los resultados
+    que aún no llegan se descartan en vez de pintarse sobre otra página.
+    """
+    # canal, True mientras tenga tareas pendientes
+    ocupado = pyqtSignal(str, bool)
+
+    def __init__(self, max_hilos=4, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_hilos)
+        self._senales = _SenalesTarea(self)
+        self._senales.terminado.connect(self._al_terminar)
+        self._senales.fallido.connect(self._al_fallar)
+        self._pendientes = {}  # id_tarea -> (canal, al_terminar, al_fallar, cancelable)
+        self._siguiente_id = 0
+
+    def ejecutar(self, canal, funcion, *args, al_terminar=None, al_fallar=None, cancelable=True):
+        """
+        Encola `funcion(*args)`; `al_terminar(resultado)` se llama en el hilo de la GUI.
+        Con cancelable=False el resultado se entrega aunque se cambie de página
+        (p. ej. una importación larga); sólo cancelar(canal) lo descarta.
+        """
+        self._siguiente_id += 1
+        id_tarea = self._siguiente_id
+        estaba_ocupado = self.esta_ocupado(canal)
+        self._pendientes[id_tarea] = (canal, al_terminar, al_fallar, cancelable)
+        if not estaba_ocupado:
+            self.ocupado.emit(canal, True)
+        self._pool.start(_TareaConsulta(id_tarea, funcion, args, self._senales))
+        return id_tarea
+
+    def cancelar(self, canal=None):
+        """Descarta los resultados pendientes de un canal (o de todos los cancelables si no se indica)."""
+        # Las consultas ya en marcha no se interrumpen; su resultado simplemente ya no se entrega
+        if canal is not None:
+            cancelados = [i for i, (c, _, _, _) in self._pendientes.items() if c == canal]
+        else:
+            cancelados = [i for i, (_, _, _, cancelable) in self._pendientes.items() if cancelable]
+        canales = {self._pendientes[i][0] for i in cancelados}
+        for id_tarea in cancelados:
+            del self._pendientes[id_tarea]
+        for c in canales:
+            if not self.esta_ocupado(c):
+                self.ocupado.emit(c, False)
+
+    def esta_ocupado(self, canal):
+        return any(c == canal for c, _, _, _ in self._pendientes.values())
+
+    def esperar(self, timeout_ms=5000):
+        """Espera a que terminen los hilos (al cerrar la ventana)."""
+        return self._pool.waitForDone(timeout_ms)
+
+    # --- Internos (hilo de la GUI) ---
+
+    def _sacar(self, id_tarea):
+        tarea = self._pendientes.pop(id_tarea, None)
+        if tarea is None:
+            return None
+        canal, al_terminar, al_fallar, _ = tarea
+        if not self.esta_ocupado(canal):
+            self.ocupado.emit(canal, False)
+        return al_terminar, al_fallar
+
+    def _al_terminar(self, id_tarea, resultado):
+        callbacks = self._sacar(id_tarea)
+        if callbacks and callbacks[0]:
+            callbacks[0](resultado)
+
+    def _al_fallar(self, id_tarea, mensaje):
+        callbacks = self._sacar(id_tarea)
+        if callbacks is None:
+            return
+        logging.error(f"Consulta en segundo plano fallida: {mensaje}")
+        print(f"Error en consulta en segundo plano: {mensaje}")
+        if callbacks[1]:
+            callbacks[1](mensaje)
@@ -0,0 +1,42 @@
+from PyQt6.QtCore import QRectF
+from PyQt6.QtGui import QColor, QPainter
+from PyQt6.QtWidgets import QWidget
+
+
+class HistogramaBarras(QWidget):
+    """
+    Barras por periodo a partir de [(periodo, total, parte)]: cada barra mide el
+    total y la parte (fallidos, pendiente, ...) se pinta en rojo en su base.
+    """
+
+    COLOR_TOTAL = QColor(20, 200, 220)
+    COLOR_PARTE = QColor(220, 60, 60)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._datos = []
+        self.setMinimumHeight(120)
+
+    def set_datos(self, datos):
+        """`datos` es p. ej. lo que regresa DatabaseManager.get_histograma_bitacora."""
+        self._datos = list(datos)
+        if self._datos:
+            self.setToolTip(f"{self._datos[0][0]} a {self._datos[-1][0]}")
+        self.update()
+
+    def paintEvent(self, event):
+        if not self._datos:
+            return
+        pintor = QPainter(self)
+        margen = 4
+        alto = self.height() - 2 * margen
+        ancho_barra = (self.width() - 2 * margen) / len(self._datos)
+        maximo = max(total for _, total, _ in self._datos) or 1
+        for i, (_, total, parte) in enumerate(self._datos):
+            x = margen + i * ancho_barra
+            h_total = alto * float(total) / float(maximo)
+            h_parte = alto * float(parte) / float(maximo)
+            ancho = max(ancho_barra - 1, 1)
+            pintor.fillRect(QRectF(x, margen + alto - h_total, ancho, h_total - h_parte), self.COLOR_TOTAL)
+            pintor.fillRect(QRectF(x, margen + alto - h_parte, ancho, h_parte), self.COLOR_PARTE)
+        pintor.end()
@@ -1,19 +1,39 @@
 from PyQt6.QtWidgets import QWidget, QMessageBox
 from PyQt6.QtCore import pyqtSignal
-from datetime import datetime
+from functools import partial
 from PyQt6.QtCore import Qt, QSize
 import socket
 from .ui_LoginWindows import Ui_Dialog
+from .EjecutorConsultas import EjecutorConsultas
+from db.limitadorLogin import LimitadorLogin, DETALLE_CREDENCIALES_INVALIDAS, DETALLE_LOGIN_EXITOSO
+
+
+# Estado de la cuenta que evalúa el servidor (DatabaseManager.validar_usuario) -> (mensaje, detalle para la bitácora).
+# Sin detalle: validar_usuario ya escribió la bitácora junto con el cambio de EdoCta
+RECHAZOS_POR_ESTADO = {
+    "caducada": ("Cuenta caducada", "Intento fallido: Cuenta caducada y deshabilitada"),
+    "deshabilitada": ("Cuenta desabilitada", "Intento fallido: Cuenta deshabilitada('False')"),
+    "vencida": ("Cuenta vencida", None),
+    "vencida_sin_cambio": ("Cuenta vencida", "Intento fallido: Cuenta vencida (ya actualizada por otra sesión)"),
+    "vencida_error": ("Cuenta vencida", "Intento fallido: Cuenta vencida (Error al actualizar)"),
+    "por_activar": ("Cuenta por activarse.", "Intento Fallido: Cuenta por activarse"),
+}
 
 
 class LoginWindow(QWidget):
-    # Señal actualizada para enviar también el ID del usuario (int)
-    login_exitoso = pyqtSignal(str, str, str, str, str, int)
+    # nombre, puesto, género, login y el ID del usuario (int); la contraseña ya no sale de esta ventana
+    login_exitoso = pyqtSignal(str, str, str, str, int)
 
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, limitador=None):
         super().__init__()
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
         self.db_manager = db_manager
+        # La verificación (scrypt) tarda a propósito; corre fuera del hilo de la GUI
+        self.ejecutor = EjecutorConsultas(max_hilos=1, parent=self)
+        # Los intentos de más se rechazan aquí, sin consultar ni escribir en la BD
+        self.limitador = limitador or LimitadorLogin()
+        self.ejecutor.ejecutar("sembrar", self.db_manager.get_intentos_login, self.limitador.ventana_seg,
+                               al_terminar=self.limitador.sembrar)
         self.ui = Ui_Dialog()
         self.ui.setupUi(self)
 
@@ -77,6 +97,7 @@ class LoginWindow(QWidget):
         password = self.ui.txt_password.text()
 
         # --- NUEVO: Obtener IP para auditoría ---
+        # Es la IP de este equipo, no la de la persona: por eso el limitador no cuenta por IP salvo que se configure
         try:
             hostname = socket.gethostname()
             ip_address = socket.gethostbyname(hostname)
@@ -90,7 +111,26 @@ class LoginWindow(QWidget):
             self.db_manager.registrar_acceso(login, False, "Intento fallido: Campos vacios", ip_address)
             return
 
-        db_data = self.db_manager.validar_usuario(login, password)
+        if self.ejecutor.esta_ocupado("login"):
+            return
+        espera = self.limitador.espera(login, ip_address)
+        if espera > 0:
+            QMessageBox.warning(self, "Acceso denegado",
+                                f"Demasiados intentos fallidos. Intente de nuevo en {int(espera) + 1} segundos.")
+            self.ui.txt_password.clear()
+            return
+        self.ui.btn_aceptar.setEnabled(False)
+        self.ejecutor.ejecutar("login", self.db_manager.validar_usuario, login, password, ip_address,
+                               al_terminar=partial(self._procesar_validacion, login, ip_address),
+                               al_fallar=partial(self._validacion_fallida, login, ip_address))
+
+    def _validacion_fallida(self, login, ip_address, mensaje):
+        self.ui.btn_aceptar.setEnabled(True)
+        QMessageBox.critical(self, "Error de Sistema", f"No se pudo validar el usuario: {mensaje}")
+        self.db_manager.registrar_acceso(login, False, "Error de conexion/SQL en validacion", ip_address)
+
+    def _procesar_validacion(self, login, ip_address, db_data):
+        self.ui.btn_aceptar.setEnabled(True)
 
         if db_data is None:
             QMessageBox.critical(self, "Error de Sistema",
@@ -102,60 +142,22 @@ class LoginWindow(QWidget):
         if db_data == -1:
             QMessageBox.critical(self, "Acceso denegado", "Credenciales inválidas (Usuario o Contraseña incorrectos).")
             # Enviamos la IP
-            self.db_manager.registrar_acceso(login, False, "Intento fallido Credenciales invalidas", ip_address)
-            self.ui.txt_login.clear()
-            self.ui.txt_password.clear()
-            return
-
-        try:
-            (cv_user, edocta_str, fecini_str, fecven_str,
-             nombre, ape_pat, ape_mat, puesto, genero) = db_data
-
-            fecini = datetime.strptime(fecini_str, '%Y-%m-%d').date()
-            fecven = datetime.strptime(fecven_str, '%Y-%m-%d').date()
-            fecha_actual = datetime.now().date()
-
-        except (ValueError, TypeError) as e:
-            QMessageBox.critical(self, "Error de Datos",
-                                 f"El formato de datos devuelto por la base de datos es incorrecto. Error: {e}")
-            # Enviamos la IP
-            self.db_manager.registrar_acceso(login, False, f"Error de formato de datos {e}", ip_address)
-            self.db_manager.registrar_error(f"Error procesando login: {e}", "Login", login, )
-            return
-
-        if fecha_actual > fecven and edocta_str.lower() == 'false':
-            QMessageBox.warning(self, "Acceso denegado", "Cuenta caducada")
-            # Enviamos la IP
-            self.db_manager.registrar_acceso(login, False, "Intento fallido: Cuenta caducada y deshabilitada",
-                                             ip_address)
-            self.ui.txt_login.clear()
-            self.ui.txt_password.clear()
-            return
-
-        if edocta_str.lower() == 'false':
-            QMessageBox.warning(self, "Acceso denegado",
-                                "Cuenta desabilitada")
-            # Enviamos la IP
-            self.db_manager.registrar_acceso(login, False, "Intento fallido: Cuenta deshabilitada('False')", ip_address)
+            self.db_manager.registrar_acceso(login, False, DETALLE_CREDENCIALES_INVALIDAS, ip_address)
+            if self.limitador.registrar_fallo(login, ip_address):
+                self.db_manager.registrar_acceso(login, False, "Bloqueo temporal: demasiados intentos fallidos",
+                                                 ip_address)
             self.ui.txt_login.clear()
             self.ui.txt_password.clear()
             return
 
-        if fecha_actual > fecven:
-            exito_update = self.db_manager.actualizar_estado_cuenta(cv_user, 'False')
-            Detalle = "Intento fallido: Cuenta vencida(Actualizada a ('False')" if exito_update else "Intento fallido: Cuenta vencida (Error al actualizar)"
-            QMessageBox.critical(self, "Acceso denegado", "Cuenta vencida")
-            # Enviamos la IP
-            self.db_manager.registrar_acceso(login, False, Detalle, ip_address)
-            self.ui.txt_login.clear()
-            self.ui.txt_password.clear()
-            return
+        cv_user, estado, nombre, ape_pat, ape_mat, puesto, genero = db_data
 
-        if fecha_actual < fecini:
-            QMessageBox.warning(self, "Acceso denegado",
-                                "Cuenta por activarse.")
-            # Enviamos la IP
-            self.db_manager.registrar_acceso(login, False, "Intento Fallido: Cuenta por activarse", ip_address)
+        if estado in RECHAZOS_POR_ESTADO:
+            mensaje, detalle = RECHAZOS_POR_ESTADO[estado]
+            QMessageBox.warning(self, "Acceso denegado", mensaje)
+            if detalle:
+                # Enviamos la IP
+                self.db_manager.registrar_acceso(login, False, detalle, ip_address)
             self.ui.txt_login.clear()
             self.ui.txt_password.clear()
             return
@@ -165,7 +167,9 @@ class LoginWindow(QWidget):
         genero_str = genero if genero else "N/A"
 
         # Enviamos la IP en el login exitoso
-        self.db_manager.registrar_acceso(login, True, "Login exitoso", ip_address)
+        self.db_manager.registrar_acceso(login, True, DETALLE_LOGIN_EXITOSO, ip_address)
+        self.limitador.registrar_exito(login, ip_address)
 
-        self.login_exitoso.emit(nombre_completo, puesto_str, genero_str, login, password, cv_user)
+        self.ui.txt_password.clear()
+        self.login_exitoso.emit(nombre_completo, puesto_str, genero_str, login, cv_user)
         self.hide()
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+Compara la carga de la tabla de Pagos como era antes (QTableWidget con un
+QTableWidgetItem por celda) contra ModeloTablaColumnar en un QTableView, con
+filas sintéticas: de una vez con reiniciar() y por páginas de 200 con
+agregar_filas(), que es como se llena la tabla de Pagos. Uso (desde PracticaC4_1/):
+
+    python -m Gui.MedirTabla                 100000 filas
+    python -m Gui.MedirTabla -n 500000
+
+Cada variante corre en su propio proceso para que la memoria de una no se
+sume a la otra. Se reporta el tiempo hasta pintar la tabla, cuánto creció el
+pico de memoria del proceso (RSS; incluye lo que reserva Qt en C++) y el pico
+de memoria de Python (tracemalloc; sólo objetos de Python).
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+try:
+    import resource  # Sólo en Unix; en Windows el RSS se lee con psutil si está instalado
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+ENCABEZADOS = ["ID Cobro", "Fecha", "Tipo", "Monto", "Descuento", "Total", "Estado", "Alumno", "ID Usuario"]
+VARIANTES = ("QTableWidget", "ModeloTablaColumnar", "ModeloTablaColumnar (páginas)")
+TAM_PAGINA = 200  # ControlWindows.TAM_PAGINA_PAGOS
+
+
+def filas_sinteticas(n, semilla=7):
+    """Filas con la forma de _pagos_con_total: ints, date, Decimal y texto."""
+    azar = random.Random(semilla)
+    inicio = date(2020, 1, 1)
+    tipos = ["Mensualidad", "Inscripción", "Examen"]
+    nombres = [f"Alumno{i} Apellido{i % 97}" for i in range(500)]
+    filas = []
+    for cv in range(n, 0, -1):
+        monto = Decimal(azar.choice([800, 1200, 1500])).quantize(Decimal("0.01"))
+        descuento = (monto * Decimal(azar.choice(["0", "0.10", "0.25"]))).quantize(Decimal("0.01"))
+        cv_usuario = azar.randrange(500)
+        filas.append((cv, inicio + timedelta(days=cv % 2000), azar.choice(tipos), monto, descuento,
+                      monto - descuento, azar.choice(["Pagado", "Pendiente"]), nombres[cv_usuario], cv_usuario))
+    return filas
+
+
+def _rss_pico_kb():
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico // 1024 if sys.platform == "darwin" else pico  # macOS lo da en bytes
+    if psutil is not None:
+        return psutil.Process().memory_info().peak_wset // 1024
+    return None
+
+
+def _cargar_widget(filas):
+    from PyQt6.QtWidgets import QTableWidget, QTableWidgetItem
+    tabla = QTableWidget()
+    tabla.setColumnCount(len(ENCABEZADOS))
+    tabla.setHorizontalHeaderLabels(ENCABEZADOS)
+    tabla.setRowCount(len(filas))
+    for row_idx, row_data in enumerate(filas):
+        for col_idx, col_data in enumerate(row_data):
+            tabla.setItem(row_idx, col_idx, QTableWidgetItem(str(col_data)))
+    return tabla
+
+
+def _cargar_modelo(filas, por_paginas=False):
+    from PyQt6.QtWidgets import QTableView
+    from .ModeloTabla import ModeloTablaColumnar
+    tabla = QTableView()
+    modelo = ModeloTablaColumnar(tabla)
+    tabla.setModel(modelo)
+    if por_paginas:
+        modelo.reiniciar(ENCABEZADOS)
+        for inicio in range(0, len(filas), TAM_PAGINA):
+            modelo.agregar_filas(filas[inicio:inicio + TAM_PAGINA])
+    else:
+        modelo.reiniciar(ENCABEZADOS, filas)
+    return tabla
+
+
+def _columnas_compactas(tabla):
+    from array import array
+    modelo = tabla.model()
+    if modelo is None or not hasattr(modelo, "_columnas"):
+        return None
+    return sum(1 for columna in modelo._columnas if isinstance(columna, array))
+
+
+def medir_variante(variante, n, semilla):
+    """Corre en el proceso hijo: carga la tabla, la pinta y regresa las mediciones."""
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    cargar = {
+        "QTableWidget": _cargar_widget,
+        "ModeloTablaColumnar": _cargar_modelo,
+        "ModeloTablaColumnar (páginas)": lambda f: _cargar_modelo(f, por_paginas=True),
+    }[variante]
+    filas = filas_sinteticas(n, semilla)
+
+    rss_antes = _rss_pico_kb()
+    inicio = time.perf_counter()
+    tabla = cargar(filas)
+    tabla.resize(1000, 600)
+    tabla.show()
+    app.processEvents()
+    ms = (time.perf_counter() - inicio) * 1000
+    rss_despues = _rss_pico_kb()
+    compactas = _columnas_compactas(tabla)
+    tabla.close()
+    del tabla
+    app.processEvents()
+
+    # Segunda carga sólo para medir los objetos de Python (tracemalloc la hace varias veces más lenta)
+    tracemalloc.start()
+    tabla = cargar(filas)
+    _, pico_python = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "ms": ms,
+        "rss_mb": None if rss_antes is None else (rss_despues - rss_antes) / 1024,
+        "python_mb": pico_python / 2 ** 20,
+        "compactas": compactas,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara QTableWidget contra ModeloTablaColumnar.")
+    parser.add_argument("-n", type=int, default=100000, help="cantidad de filas")
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--variante", choices=VARIANTES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.variante:
+        print(json.dumps(medir_variante(args.variante, args.n, args.semilla)))
+        return 0
+
+    # Sin pantalla (servidor, CI) Qt necesita la plataforma offscreen
+    entorno = dict(os.environ)
+    if sys.platform.startswith("linux") and not entorno.get("DISPLAY") and not entorno.get("WAYLAND_DISPLAY"):
+        entorno.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    print(f"{args.n} filas x {len(ENCABEZADOS)} columnas")
+    print(f"{'variante':<32}{'carga ms':>12}{'pico RSS MB':>14}{'Python MB':>12}{'cols array':>12}")
+    for variante in VARIANTES:
+        proceso = subprocess.run(
+            [sys.executable, "-m", "Gui.MedirTabla", "-n", str(args.n), "--semilla", str(args.semilla),
+             "--variante", variante],
+            capture_output=True, text=True, env=entorno
+        )
+        if proceso.returncode != 0:
+            print(f"ERROR en {variante}: {proceso.stderr.strip()}")
+            return 1
+        r = json.loads(proceso.stdout.strip().splitlines()[-1])
+        rss = "n/d" if r["rss_mb"] is None else f"{r['rss_mb']:.1f}"
+        compactas = "-" if r["compactas"] is None else str(r["compactas"])
+        print(f"{variante:<32}{r['ms']:>12.1f}{rss:>14}{r['python_mb']:>12.1f}{compactas:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
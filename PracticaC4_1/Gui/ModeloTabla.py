@@ -0,0 +1,105 @@
+from array import array
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+
+def _compactar(valores):
+    """Las columnas de enteros (IDs) se guardan en un array de C en vez de una lista de objetos."""
+    if valores and all(type(v) is int for v in valores):
+        try:
+            return array('q', valores)
+        except OverflowError:
+            pass
+    return list(valores)
+
+
+class ModeloTablaColumnar(QAbstractTableModel):
+    """
+    Modelo de sólo lectura para las tablas de la ventana de control.
+    Guarda los datos por columnas tal como salen del cursor y sólo convierte
+    a texto las celdas que la vista pide pintar. Las columnas de más (sin
+    encabezado) se guardan sin mostrarse y se leen con valor() o fila().
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._encabezados = []
+        self._columnas = []
+        self._filas = 0
+        self._formatos = {}
+
+    # --- API de Qt ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._filas
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._encabezados)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        valor = self._columnas[index.column()][index.row()]
+        formato = self._formatos.get(index.column())
+        return formato(valor) if formato else str(valor)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self._encabezados[section] if section < len(self._encabezados) else None
+        return str(section + 1)
+
+    # --- Carga de datos ---
+
+    def reiniciar(self, encabezados, filas=(), formatos=None):
+        """Reemplaza encabezados y datos. `filas` es lo que regresa fetchall()."""
+        self.beginResetModel()
+        self._encabezados = list(encabezados)
+        self._formatos = dict(formatos or {})
+        self._columnas = [_compactar(c) for c in zip(*filas)] if filas else []
+        if len(self._columnas) < len(self._encabezados):
+            # Vacías como array('q'): si lo que llega con agregar_filas son enteros se quedan compactas
+            self._columnas.extend(array('q') for _ in range(len(self._encabezados) - len(self._columnas)))
+        self._filas = len(filas)
+        self.endResetModel()
+
+    def agregar_filas(self, filas):
+        """Agrega filas al final (p. ej. la siguiente página de una consulta)."""
+        if not filas:
+            return
+        inicio = self._filas
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(filas) - 1)
+        while len(self._columnas) < len(filas[0]):
+            self._columnas.append(array('q') if self._filas == 0 else [None] * self._filas)
+        for idx, valores in enumerate(zip(*filas)):
+            columna = self._columnas[idx]
+            if isinstance(columna, array):
+                # Al primer valor que no es entero (o no cabe en 64 bits) la columna pasa a lista
+                antes = len(columna)
+                try:
+                    if all(type(v) is int for v in valores):
+                        columna.extend(valores)
+                        continue
+                except OverflowError:
+                    del columna[antes:]
+                columna = self._columnas[idx] = list(columna)
+            columna.extend(valores)
+        self._filas += len(filas)
+        self.endInsertRows()
+
+    # --- Acceso a los valores originales (sin formato) ---
+
+    def valor(self, fila, columna):
+        return self._columnas[columna][fila]
+
+    def fila(self, fila):
+        return tuple(columna[fila] for columna in self._columnas)
+
+    def indice_columna(self, encabezado):
+        try:
+            return self._encabezados.index(encabezado)
+        except ValueError:
+            return -1
+
+    def encabezados(self):
+        return list(self._encabezados)
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+from PyQt6.QtCore import QDate
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QGridLayout, QLabel, QLineEdit, QComboBox,
+    QDateEdit, QPushButton, QTableView, QHeaderView, QAbstractItemView
+)
+from .ModeloTabla import ModeloTablaColumnar
+from .HistogramaBarras import HistogramaBarras
+
+
+class PaginaAuditoria(QWidget):
+    """
+    Consulta de bitacora_accesos para auditoría. Los filtros se resuelven en el
+    servidor; la tabla se llena por páginas al hacer scroll y los totales y el
+    histograma se calculan con GROUP BY, así que un rango de meses no trae todas
+    las filas a la aplicación.
+    """
+
+    TAM_PAGINA = 300
+    ENCABEZADOS = ["ID", "Fecha y hora", "Usuario", "IP", "Resultado", "Detalle"]
+
+    def __init__(self, db_manager, ejecutor, parent=None):
+        super().__init__(parent)
+        self.setObjectName("Auditoria")
+        self.db_manager = db_manager
+        self.ejecutor = ejecutor
+        self._filtro = None
+        self._ultima_llave = None
+        self._hay_mas = False
+
+        layout = QVBoxLayout(self)
+
+        titulo = QLabel("Auditoría de accesos")
+        titulo.setProperty("cssClass", "titulo")
+        layout.addWidget(titulo)
+
+        filtros = QGridLayout()
+        hoy = QDate.currentDate()
+        self.fecha_desde = QDateEdit(hoy.addDays(-30))
+        self.fecha_hasta = QDateEdit(hoy)
+        for fecha in (self.fecha_desde, self.fecha_hasta):
+            fecha.setCalendarPopup(True)
+            fecha.setDisplayFormat("dd/MM/yyyy")
+        self.txt_usuario = QLineEdit()
+        self.txt_usuario.setPlaceholderText("Login exacto")
+        self.txt_ip = QLineEdit()
+        self.txt_ip.setPlaceholderText("p. ej. 192.168.0.10")
+        self.combo_resultado = QComboBox()
+        self.combo_resultado.addItem("Todos", None)
+        self.combo_resultado.addItem("Exitosos", True)
+        self.combo_resultado.addItem("Fallidos", False)
+        self.btn_buscar = QPushButton("Buscar")
+        self.btn_regresar = QPushButton("Regresar")
+
+        filtros.addWidget(QLabel("Desde:"), 0, 0)
+        filtros.addWidget(self.fecha_desde, 0, 1)
+        filtros.addWidget(QLabel("Hasta:"), 0, 2)
+        filtros.addWidget(self.fecha_hasta, 0, 3)
+        filtros.addWidget(QLabel("Resultado:"), 0, 4)
+        filtros.addWidget(self.combo_resultado, 0, 5)
+        filtros.addWidget(QLabel("Usuario:"), 1, 0)
+        filtros.addWidget(self.txt_usuario, 1, 1)
+        filtros.addWidget(QLabel("IP:"), 1, 2)
+        filtros.addWidget(self.txt_ip, 1, 3)
+        filtros.addWidget(self.btn_buscar, 1, 4)
+        filtros.addWidget(self.btn_regresar, 1, 5)
+        layout.addLayout(filtros)
+
+        self.lbl_resumen = QLabel("")
+        layout.addWidget(self.lbl_resumen)
+
+        self.histograma = HistogramaBarras()
+        layout.addWidget(self.histograma)
+
+        self.modelo = ModeloTablaColumnar(self)
+        self.tabla = QTableView()
+        self.tabla.setModel(self.modelo)
+        self.tabla.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.tabla.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.tabla.horizontalHeader().setStretchLastSection(True)
+        self.tabla.verticalScrollBar().valueChanged.connect(self._on_scroll)
+        layout.addWidget(self.tabla, 1)
+
+        self.btn_buscar.clicked.connect(self.buscar)
+        self.txt_usuario.returnPressed.connect(self.buscar)
+        self.txt_ip.returnPressed.connect(self.buscar)
+
+    # --- Búsqueda ---
+
+    def _leer_filtro(self):
+        desde = datetime.combine(self.fecha_desde.date().toPyDate(), datetime.min.time())
+        # "Hasta" incluye todo ese día: el rango es medio abierto [desde, hasta + 1 día)
+        hasta = datetime.combine(self.fecha_hasta.date().toPyDate(), datetime.min.time()) + timedelta(days=1)
+        return (desde, hasta, self.txt_usuario.text().strip() or None,
+                self.combo_resultado.currentData(), self.txt_ip.text().strip() or None)
+
+    @staticmethod
+    def _unidad_histograma(desde, hasta):
+        dias = (hasta - desde).days
+        if dias <= 2:
+            return "hora"
+        return "dia" if dias <= 120 else "mes"
+
+    def buscar(self):
+        """Reinicia la tabla con el filtro actual y pide en paralelo la primera página, totales e histograma."""
+        self.ejecutor.cancelar("tabla_auditoria")
+        self.ejecutor.cancelar("resumen_auditoria")
+        self._filtro = self._leer_filtro()
+        desde, hasta = self._filtro[:2]
+        if desde >= hasta:
+            self.lbl_resumen.setText("El rango de fechas no es válido.")
+            return
+
+        formatos = {1: lambda v: v.strftime("%d/%m/%Y %H:%M:%S"),
+                    3: lambda v: v or "",
+                    4: lambda v: "Exitoso" if v else "Fallido"}
+        self.modelo.reiniciar(self.ENCABEZADOS, formatos=formatos)
+        self._ultima_llave = None
+        self._hay_mas = True
+        self.lbl_resumen.setText("Consultando...")
+        self.histograma.set_datos([])
+
+        self.ejecutor.ejecutar("resumen_auditoria", self.db_manager.get_resumen_bitacora, *self._filtro,
+                               al_terminar=self._mostrar_resumen)
+        self.ejecutor.ejecutar("resumen_auditoria", self.db_manager.get_histograma_bitacora, *self._filtro,
+                               self._unidad_histograma(desde, hasta), al_terminar=self.histograma.set_datos)
+        self.cargar_mas()
+
+    def cargar_mas(self):
+        if self._filtro is None or not self._hay_mas or self.ejecutor.esta_ocupado("tabla_auditoria"):
+            return
+        self.ejecutor.ejecutar("tabla_auditoria", self.db_manager.buscar_bitacora, *self._filtro,
+                               self.TAM_PAGINA, self._ultima_llave, al_terminar=self._agregar_pagina)
+
+    def _agregar_pagina(self, filas):
+        self.modelo.agregar_filas(filas)
+        if filas:
+            self._ultima_llave = (filas[-1][1], filas[-1][0])  # (fecha_hora, id_acceso)
+        self._hay_mas = len(filas) == self.TAM_PAGINA
+
+    def _mostrar_resumen(self, resumen):
+        if resumen is None:
+            self.lbl_resumen.setText("No se pudo obtener el resumen de la bitácora.")
+            return
+        self.lbl_resumen.setText(
+            f"Eventos: {resumen['eventos']}   Fallidos: {resumen['fallidos']}   "
+            f"Usuarios: {resumen['usuarios']}   IPs: {resumen['ips']}"
+        )
+
+    def _on_scroll(self, valor):
+        barra = self.tabla.verticalScrollBar()
+        if self._hay_mas and valor >= barra.maximum() - 5:
+            self.cargar_mas()
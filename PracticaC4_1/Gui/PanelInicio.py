@@ -0,0 +1,156 @@
+import time
+from datetime import date
+from PyQt6.QtCore import QTimer, QLocale
+from PyQt6.QtGui import QKeySequence, QShortcut
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QTableView, QHeaderView, QAbstractItemView
+)
+from .ModeloTabla import ModeloTablaColumnar
+from .HistogramaBarras import HistogramaBarras
+
+
+def _mes(fecha, desplazamiento=0):
+    """Primer día del mes de `fecha` movido `desplazamiento` meses."""
+    indice = fecha.year * 12 + fecha.month - 1 + desplazamiento
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def _medir(funcion, *args):
+    """Corre en el hilo de trabajo: regresa (resultado, milisegundos que tardó la consulta)."""
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+class PanelInicio(QWidget):
+    """
+    Tablero de la página de Inicio: ingresos por mes, adeudo total, gasto por
+    descuento y principales deudores. Todo sale de consultas agregadas (la mayoría
+    sobre fResumenCobro) que corren en segundo plano y se repiten cada
+    `intervalo_seg` mientras el tablero está a la vista.
+    Ctrl+Shift+D muestra u oculta lo que tardó cada consulta.
+    """
+
+    MESES = 12
+    TOP_DEUDORES = 10
+
+    def __init__(self, db_manager, ejecutor, intervalo_seg=60, depuracion=False, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.ejecutor = ejecutor
+        self.locale = QLocale(QLocale.Language.Spanish, QLocale.Country.Mexico)
+        self._tiempos = {}
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        indicadores = QHBoxLayout()
+        self.lbl_cobrado_mes = QLabel()
+        self.lbl_pendiente = QLabel()
+        self.lbl_deudores = QLabel()
+        self.lbl_descuentos = QLabel()
+        for etiqueta in (self.lbl_cobrado_mes, self.lbl_pendiente, self.lbl_deudores, self.lbl_descuentos):
+            indicadores.addWidget(etiqueta)
+        layout.addLayout(indicadores)
+
+        cuadricula = QGridLayout()
+        cuadricula.addWidget(QLabel("Ingresos por mes (rojo: pendiente)"), 0, 0)
+        self.grafica_meses = HistogramaBarras()
+        cuadricula.addWidget(self.grafica_meses, 1, 0)
+
+        cuadricula.addWidget(QLabel("Descuentos del mes"), 0, 1)
+        self.modelo_descuentos = ModeloTablaColumnar(self)
+        cuadricula.addWidget(self._tabla(self.modelo_descuentos), 1, 1)
+
+        cuadricula.addWidget(QLabel("Mayores adeudos"), 2, 0, 1, 2)
+        self.modelo_deudores = ModeloTablaColumnar(self)
+        cuadricula.addWidget(self._tabla(self.modelo_deudores), 3, 0, 1, 2)
+        layout.addLayout(cuadricula, 1)
+
+        # Tiempos por consulta (modo depuración)
+        self.lbl_tiempos = QLabel()
+        self.lbl_tiempos.setStyleSheet("font-size: 9pt; color: yellow; background-color: rgba(0, 0, 0, 160);")
+        self.lbl_tiempos.setVisible(depuracion)
+        layout.addWidget(self.lbl_tiempos)
+        atajo = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        atajo.activated.connect(lambda: self.lbl_tiempos.setVisible(not self.lbl_tiempos.isVisible()))
+
+        self.temporizador = QTimer(self)
+        self.temporizador.setInterval(int(intervalo_seg * 1000))
+        self.temporizador.timeout.connect(self.refrescar)
+
+    @staticmethod
+    def _tabla(modelo):
+        tabla = QTableView()
+        tabla.setModel(modelo)
+        tabla.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        tabla.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        tabla.verticalHeader().setVisible(False)
+        return tabla
+
+    def _moneda(self, valor):
+        return self.locale.toCurrencyString(float(valor or 0), "$")
+
+    # --- Actualización ---
+
+    def activar(self, activo):
+        """Refresca de inmediato y luego por intervalo; con False deja de consultar."""
+        if activo:
+            self.temporizador.start()
+            self.refrescar()
+        else:
+            self.temporizador.stop()
+            self.ejecutor.cancelar("tablero")
+
+    def refrescar(self):
+        # Si la vuelta anterior no ha terminado (servidor lento) no se encima otra
+        if not self.temporizador.isActive() or self.ejecutor.esta_ocupado("tablero"):
+            return
+        hoy = date.today()
+        mes_actual = _mes(hoy)
+        mes_siguiente = _mes(hoy, 1)
+        consultas = {
+            "ingresos": (self.db_manager.get_resumen_mensual_cobros,
+                         (_mes(hoy, 1 - self.MESES), mes_siguiente), self._mostrar_ingresos),
+            "totales": (self.db_manager.get_totales_cobros, (), self._mostrar_totales),
+            "descuentos": (self.db_manager.get_gasto_descuentos,
+                           (mes_actual, mes_siguiente), self._mostrar_descuentos),
+            "deudores": (self.db_manager.get_saldos_por_alumno,
+                         (True, self.TOP_DEUDORES), self._mostrar_deudores),
+        }
+        for nombre, (funcion, args, mostrar) in consultas.items():
+            self.ejecutor.ejecutar("tablero", _medir, funcion, *args,
+                                   al_terminar=lambda r, n=nombre, m=mostrar: self._recibir(n, m, r))
+
+    def _recibir(self, nombre, mostrar, resultado_y_tiempo):
+        resultado, ms = resultado_y_tiempo
+        self._tiempos[nombre] = ms
+        self.lbl_tiempos.setText("   ".join(f"{n}: {t:.1f} ms" for n, t in self._tiempos.items()))
+        mostrar(resultado)
+
+    def _mostrar_ingresos(self, meses):
+        # (Periodo, Alumnos, Cobros, Facturado, Descuento, Pagado, Pendiente)
+        self.grafica_meses.set_datos([(f"{m[0]:%Y-%m}", m[5] + m[6], m[6]) for m in meses])
+        mes_actual = _mes(date.today())
+        pagado = next((m[5] for m in meses if m[0] == mes_actual), 0)
+        self.lbl_cobrado_mes.setText(f"Cobrado este mes:\n{self._moneda(pagado)}")
+
+    def _mostrar_totales(self, totales):
+        if totales is None:
+            return
+        _, _, _, pendiente, alumnos = totales
+        self.lbl_pendiente.setText(f"Pendiente total:\n{self._moneda(pendiente)}")
+        self.lbl_deudores.setText(f"Alumnos con adeudo:\n{alumnos}")
+
+    def _mostrar_descuentos(self, descuentos):
+        self.modelo_descuentos.reiniciar(["Descuento", "Cobros", "Descontado"], descuentos,
+                                         formatos={2: self._moneda})
+        total = sum(d[2] for d in descuentos)
+        self.lbl_descuentos.setText(f"Descontado este mes:\n{self._moneda(total)}")
+
+    def _mostrar_deudores(self, deudores):
+        # Sin el ID, que no le dice nada a quien lee el tablero
+        filas = [(d[1], d[2], d[4], d[5]) for d in deudores]
+        self.modelo_deudores.reiniciar(["Alumno", "Facturado", "Pagado", "Pendiente"], filas,
+                                       formatos={1: self._moneda, 2: self._moneda, 3: self._moneda})
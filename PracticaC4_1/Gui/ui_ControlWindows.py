@@ -217,7 +217,7 @@ class Ui_Dialog(object):
 "}\n"
 "\n"
 "/* --- TABLA --- */\n"
-"QTableWidget {\n"
+"QTableView {\n"
 "    font-size: 10pt;\n"
 "    color: white;\n"
 "    background-color: #000000ff; /* Fondo negro */\n"
@@ -353,10 +353,8 @@ class Ui_Dialog(object):
         self.frame_36.setObjectName("frame_36")
         self.horizontalLayout_36 = QtWidgets.QHBoxLayout(self.frame_36)
         self.horizontalLayout_36.setObjectName("horizontalLayout_36")
-        self.tabla_catalogos = QtWidgets.QTableWidget(parent=self.frame_36)
+        self.tabla_catalogos = QtWidgets.QTableView(parent=self.frame_36)
         self.tabla_catalogos.setObjectName("tabla_catalogos")
-        self.tabla_catalogos.setColumnCount(0)
-        self.tabla_catalogos.setRowCount(0)
         self.horizontalLayout_36.addWidget(self.tabla_catalogos)
         self.verticalLayout_24.addWidget(self.frame_36)
         self.verticalLayout_24.setStretch(0, 1)
@@ -493,10 +491,8 @@ class Ui_Dialog(object):
         self.horizontalLayout_28.setContentsMargins(0, 0, 0, 0)
         self.horizontalLayout_28.setSpacing(0)
         self.horizontalLayout_28.setObjectName("horizontalLayout_28")
-        self.tabla_personas = QtWidgets.QTableWidget(parent=self.frame_28)
+        self.tabla_personas = QtWidgets.QTableView(parent=self.frame_28)
         self.tabla_personas.setObjectName("tabla_personas")
-        self.tabla_personas.setColumnCount(0)
-        self.tabla_personas.setRowCount(0)
         self.horizontalLayout_28.addWidget(self.tabla_personas)
         self.verticalLayout_12.addWidget(self.frame_28)
         self.verticalLayout_12.setStretch(0, 1)
@@ -663,6 +659,12 @@ class Ui_Dialog(object):
         self.btn_per_cancelar = QtWidgets.QPushButton(parent=self.frame_13)
         self.btn_per_cancelar.setObjectName("btn_per_cancelar")
         self.verticalLayout_11.addWidget(self.btn_per_cancelar)
+        self.btn_per_importar = QtWidgets.QPushButton(parent=self.frame_13)
+        self.btn_per_importar.setObjectName("btn_per_importar")
+        self.verticalLayout_11.addWidget(self.btn_per_importar)
+        self.btn_per_exportar = QtWidgets.QPushButton(parent=self.frame_13)
+        self.btn_per_exportar.setObjectName("btn_per_exportar")
+        self.verticalLayout_11.addWidget(self.btn_per_exportar)
         self.btn_per_regresar = QtWidgets.QPushButton(parent=self.frame_13)
         self.btn_per_regresar.setObjectName("btn_per_regresar")
         self.verticalLayout_11.addWidget(self.btn_per_regresar)
@@ -874,10 +876,8 @@ class Ui_Dialog(object):
         self.frame_26.setObjectName("frame_26")
         self.horizontalLayout_25 = QtWidgets.QHBoxLayout(self.frame_26)
         self.horizontalLayout_25.setObjectName("horizontalLayout_25")
-        self.tabla_pagos = QtWidgets.QTableWidget(parent=self.frame_26)
+        self.tabla_pagos = QtWidgets.QTableView(parent=self.frame_26)
         self.tabla_pagos.setObjectName("tabla_pagos")
-        self.tabla_pagos.setColumnCount(0)
-        self.tabla_pagos.setRowCount(0)
         self.horizontalLayout_25.addWidget(self.tabla_pagos)
         self.verticalLayout_21.addWidget(self.frame_26)
         self.verticalLayout_21.setStretch(0, 1)
@@ -1009,6 +1009,12 @@ class Ui_Dialog(object):
         self.btn_pagos_cancelar = QtWidgets.QPushButton(parent=self.frame_24)
         self.btn_pagos_cancelar.setObjectName("btn_pagos_cancelar")
         self.verticalLayout_18.addWidget(self.btn_pagos_cancelar)
+        self.btn_pagos_facturar = QtWidgets.QPushButton(parent=self.frame_24)
+        self.btn_pagos_facturar.setObjectName("btn_pagos_facturar")
+        self.verticalLayout_18.addWidget(self.btn_pagos_facturar)
+        self.btn_pagos_exportar = QtWidgets.QPushButton(parent=self.frame_24)
+        self.btn_pagos_exportar.setObjectName("btn_pagos_exportar")
+        self.verticalLayout_18.addWidget(self.btn_pagos_exportar)
         self.btn_pagos_regresar = QtWidgets.QPushButton(parent=self.frame_24)
         self.btn_pagos_regresar.setObjectName("btn_pagos_regresar")
         self.verticalLayout_18.addWidget(self.btn_pagos_regresar)
@@ -1304,6 +1310,8 @@ class Ui_Dialog(object):
         self.btn_per_actualizar.setText(_translate("Dialog", "Actualizar"))
         self.btn_per_consultar.setText(_translate("Dialog", "Consultar"))
         self.btn_per_cancelar.setText(_translate("Dialog", "Cancelar"))
+        self.btn_per_importar.setText(_translate("Dialog", "Importar"))
+        self.btn_per_exportar.setText(_translate("Dialog", "Exportar"))
         self.btn_per_regresar.setText(_translate("Dialog", "Regresar"))
         self.label_6.setText(_translate("Dialog", "<html><head/><body><p><span style=\" font-size:14pt;\">Control de asistencias</span></p></body></html>"))
         self.pushButton_13.setText(_translate("Dialog", ">"))
@@ -1333,6 +1341,8 @@ class Ui_Dialog(object):
         self.btn_pagos_actualizar.setText(_translate("Dialog", "Actualizar"))
         self.btn_pagos_consultar.setText(_translate("Dialog", "Consultar"))
         self.btn_pagos_cancelar.setText(_translate("Dialog", "Cancel"))
+        self.btn_pagos_facturar.setText(_translate("Dialog", "Mensualidades"))
+        self.btn_pagos_exportar.setText(_translate("Dialog", "Exportar"))
         self.btn_pagos_regresar.setText(_translate("Dialog", "Regresar"))
         self.label_9.setText(_translate("Dialog", "<html><head/><body><p><span style=\" font-size:14pt;\">Control de evaluaciones</span></p></body></html>"))
         self.pushButton_6.setText(_translate("Dialog", ">"))
@@ -3,6 +3,7 @@ import os
 from dotenv import load_dotenv
 from PyQt6.QtWidgets import QApplication
 from db.databaseManager import DatabaseManager
+from db.limitadorLogin import LimitadorLogin
 from Gui.LoginWindows import LoginWindow
 from Gui.ControlWindows import ControlWindows
 import logging
@@ -15,18 +16,34 @@ class MainApplication():
             host=os.getenv('DB_HOST'),
             user=os.getenv('DB_USER'),
             password=os.getenv('DB_PASSWORD'),
-            database=os.getenv('DB_NAME')
+            database=os.getenv('DB_NAME'),
+            pool_min=int(os.getenv('DB_POOL_MIN', 1)),
+            pool_max=int(os.getenv('DB_POOL_MAX', 5)),
+            directorio_spool=os.getenv('DB_SPOOL_DIR', 'spool'),
+            ttl_catalogos=float(os.getenv('DB_CACHE_TTL', 300))
+        )
+        limitador = LimitadorLogin(
+            ventana_seg=int(os.getenv('LOGIN_VENTANA_SEG', 900)),
+            max_fallos_login=int(os.getenv('LOGIN_MAX_FALLOS', 5)),
+            # Apagado salvo que se configure: la IP es la del equipo, no la de cada persona
+            max_fallos_ip=int(os.getenv('LOGIN_MAX_FALLOS_IP')) if os.getenv('LOGIN_MAX_FALLOS_IP') else None,
+            bloqueo_seg=int(os.getenv('LOGIN_BLOQUEO_SEG', 900)),
+            ruta=os.getenv('LOGIN_CONTADORES') or None
+        )
+        self.login_win = LoginWindow(self.db_manager, limitador)
+        self.control_win = ControlWindows(
+            self.db_manager,
+            intervalo_tablero=int(os.getenv('DASHBOARD_INTERVALO', 60)),
+            depuracion=os.getenv('APP_DEBUG', '0') == '1'
         )
-        self.login_win = LoginWindow(self.db_manager)
-        self.control_win = ControlWindows(self.db_manager)
         self.login_win.login_exitoso.connect(self.mostrar_control)
         self.control_win.sesion_cerrada.connect(self.mostrar_login)
 
     def run(self):
         self.login_win.show()
 
-    def mostrar_control(self, nombre_completo, puesto, genero, login, password, cv_user):
-        self.control_win.set_user_info(nombre_completo, puesto, genero, login, password, cv_user)
+    def mostrar_control(self, nombre_completo, puesto, genero, login, cv_user):
+        self.control_win.set_user_info(nombre_completo, puesto, genero, login, cv_user)
         self.control_win.show()
 
     def mostrar_login(self):
@@ -44,5 +61,6 @@ if __name__ == '__main__':
     )
     app = QApplication(sys.argv)
     main_app = MainApplication()
+    app.aboutToQuit.connect(main_app.db_manager.cerrar)
     main_app.run()
     sys.exit(app.exec())
\ No newline at end of file
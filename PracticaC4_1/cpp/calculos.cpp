@@ -1,3 +1,10 @@
+#include <cstdint>
+
+// Redondeo a la mitad hacia arriba (lejos de cero) de a / 100, como ROUND_HALF_UP de Decimal
+static inline int64_t dividir_entre_100(int64_t a) {
+    return a >= 0 ? (a + 50) / 100 : -((-a + 50) / 100);
+}
+
 extern "C" {
     int calcular_edad_cpp(int dia_nac, int mes_nac, int anio_nac, int dia_act, int mes_act, int anio_act) {
         int edad = anio_act - anio_nac;
@@ -8,4 +15,27 @@ extern "C" {
 
         return edad;
     }
-}
\ No newline at end of file
+
+    // Edades de n personas en una sola llamada. Las fechas vienen como enteros AAAAMMDD,
+    // así (hoy - nacimiento) / 10000 ya descuenta si aún no llega el cumpleaños.
+    // Una fecha 0 (sin dato) deja -1 en su lugar.
+    void calcular_edades_cpp(const int32_t* nacimientos, int32_t n, int32_t hoy, int32_t* edades) {
+        for (int32_t i = 0; i < n; i++) {
+            edades[i] = nacimientos[i] > 0 ? (hoy - nacimientos[i]) / 10000 : -1;
+        }
+    }
+
+    // Neto = monto x (1 - porcentaje) en centavos exactos. Montos en centavos,
+    // porcentajes en centésimas (0.10 -> 10, como DECIMAL(5,2) de cDescuentos).
+    // Llena descuentos[] y netos[] y regresa la suma de los netos.
+    int64_t calcular_netos_cpp(const int64_t* montos, const int32_t* porcentajes, int32_t n,
+                               int64_t* descuentos, int64_t* netos) {
+        int64_t total = 0;
+        for (int32_t i = 0; i < n; i++) {
+            descuentos[i] = dividir_entre_100(montos[i] * porcentajes[i]);
+            netos[i] = montos[i] - descuentos[i];
+            total += netos[i];
+        }
+        return total;
+    }
+}
@@ -0,0 +1,345 @@
+"""
+Cálculos por lote (edades, descuentos y netos de cobros) con tres motores que
+dan exactamente el mismo resultado, y se elige el primero disponible:
+
+    C++     la librería nativa (calculos.cpp): libcalculos.so, libcalculos.dylib
+            o calculos.dll según la plataforma; una sola llamada por columna.
+    NumPy   operaciones vectorizadas sobre la columna completa (pip install numpy).
+    Python  respaldo elemento por elemento, siempre disponible.
+
+CALCULOS_MOTOR=NumPy (o Python) obliga a usar otro motor. Desde PracticaC4_1/:
+
+    python -m cpp.calculos              compara la velocidad de los motores disponibles
+    python -m cpp.calculos -n 1000000
+    python -m cpp.calculos --paridad    compara los resultados de todos contra Python
+"""
+import argparse
+import ctypes
+import os
+import random
+import sys
+import time
+from array import array
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+try:
+    import numpy as np  # Opcional: motor vectorizado cuando no hay librería nativa
+except ImportError:
+    np = None
+
+_NOMBRES = {"win32": "calculos.dll", "darwin": "libcalculos.dylib"}
+# "lib" por delante: un calculos.so junto a calculos.py lo tomaría Python como módulo de extensión
+_NOMBRE_LINUX = "libcalculos.so"
+_FUNCIONES_LOTE = ("calcular_edades_cpp", "calcular_netos_cpp")
+
+CENTAVO = Decimal("0.01")
+
+_lib = None
+_cargada = False
+
+
+def ruta_libreria():
+    """Ruta del binario que corresponde a esta plataforma (exista o no)."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), _NOMBRES.get(sys.platform, _NOMBRE_LINUX))
+
+
+def libreria():
+    """La librería nativa ya configurada, o None si no hay binario para esta plataforma."""
+    global _lib, _cargada
+    if _cargada:
+        return _lib
+    _cargada = True
+    ruta = ruta_libreria()
+    if not os.path.exists(ruta):
+        print(f"--- [AVISO] No se encontró la librería C++ en: {ruta} ---")
+        return None
+    try:
+        lib = ctypes.CDLL(ruta)
+    except OSError as e:
+        print(f"--- [ERROR] Fallo al cargar librería C++: {e} ---")
+        return None
+
+    # int calcular_edad_cpp(int, int, int, int, int, int)
+    lib.calcular_edad_cpp.argtypes = [ctypes.c_int] * 6
+    lib.calcular_edad_cpp.restype = ctypes.c_int
+    # Las funciones por lote no existen en binarios compilados antes de agregarlas
+    if hasattr(lib, "calcular_edades_cpp"):
+        lib.calcular_edades_cpp.argtypes = [
+            ctypes.POINTER(ctypes.c_int32), ctypes.c_int32, ctypes.c_int32, ctypes.POINTER(ctypes.c_int32)
+        ]
+        lib.calcular_edades_cpp.restype = None
+    if hasattr(lib, "calcular_netos_cpp"):
+        lib.calcular_netos_cpp.argtypes = [
+            ctypes.POINTER(ctypes.c_int64), ctypes.POINTER(ctypes.c_int32), ctypes.c_int32,
+            ctypes.POINTER(ctypes.c_int64), ctypes.POINTER(ctypes.c_int64)
+        ]
+        lib.calcular_netos_cpp.restype = ctypes.c_int64
+    print(f"--- [ÉXITO] Librería C++ cargada desde: {ruta} ---")
+    _lib = lib
+    return _lib
+
+
+def motores_disponibles():
+    """Motores que se pueden usar aquí, en orden de preferencia."""
+    disponibles = []
+    lib = libreria()
+    if lib is not None and all(hasattr(lib, f) for f in _FUNCIONES_LOTE):
+        disponibles.append("C++")
+    if np is not None:
+        disponibles.append("NumPy")
+    disponibles.append("Python")
+    return disponibles
+
+
+def motor():
+    """Motor con el que se calcula: CALCULOS_MOTOR si está disponible, si no el más rápido."""
+    disponibles = motores_disponibles()
+    forzado = os.getenv("CALCULOS_MOTOR")
+    return forzado if forzado in disponibles else disponibles[0]
+
+
+def _puntero(buffer, tipo):
+    """Puntero al primer elemento de un array.array, sin copiarlo."""
+    return ctypes.cast(buffer.buffer_info()[0], ctypes.POINTER(tipo))
+
+
+def _de_numpy(valores, typecode):
+    return array(typecode, valores.tobytes())
+
+
+# --- Edades ---
+# Fechas como enteros AAAAMMDD: (hoy - nacimiento) // 10000 ya descuenta si aún no
+# llega el cumpleaños. Una fecha 0 (sin dato) da -1.
+
+def _aaaammdd(fecha):
+    return fecha.year * 10000 + fecha.month * 100 + fecha.day if fecha else 0
+
+
+def _edades_nativo(nacimientos, hoy):
+    edades = array("i", bytes(nacimientos.itemsize * len(nacimientos)))
+    if nacimientos:
+        libreria().calcular_edades_cpp(_puntero(nacimientos, ctypes.c_int32), len(nacimientos), hoy,
+                                       _puntero(edades, ctypes.c_int32))
+    return edades
+
+
+def _edades_numpy(nacimientos, hoy):
+    n = np.frombuffer(nacimientos, dtype=np.int32)
+    return _de_numpy(np.where(n > 0, (hoy - n) // 10000, -1).astype(np.int32), "i")
+
+
+def _edades_python(nacimientos, hoy):
+    return array("i", ((hoy - n) // 10000 if n > 0 else -1 for n in nacimientos))
+
+
+_EDADES = {"C++": _edades_nativo, "NumPy": _edades_numpy, "Python": _edades_python}
+
+
+def calcular_edad(nacimiento, hoy=None):
+    """Edad en años cumplidos a `hoy` (por omisión, la fecha actual)."""
+    return calcular_edades([nacimiento], hoy)[0]
+
+
+def calcular_edades(fechas, hoy=None, usar=None):
+    """
+    Edades de una columna de fechas de nacimiento (date o None) en una sola pasada.
+    `usar` fija el motor; por omisión el de motor(). Regresa un array.array('i').
+    """
+    hoy = _aaaammdd(hoy or date.today())
+    nacimientos = array("i", (_aaaammdd(f) for f in fechas))
+    return _EDADES[usar or motor()](nacimientos, hoy)
+
+
+# --- Descuentos y netos de cobros ---
+# Neto = monto × (1 − porcentaje) en centavos exactos: montos en centavos y porcentajes
+# en centésimas (0.10 -> 10). El descuento redondea a la mitad lejos de cero, como
+# dividir_entre_100 de calculos.cpp y ROUND_HALF_UP de Decimal.
+
+def a_centavos(valor):
+    return int((Decimal(valor or 0) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def _netos_nativo(montos, porcentajes):
+    n = len(montos)
+    descuentos = array("q", bytes(8 * n))
+    netos = array("q", bytes(8 * n))
+    total = 0
+    if n:
+        total = libreria().calcular_netos_cpp(_puntero(montos, ctypes.c_int64), _puntero(porcentajes, ctypes.c_int32),
+                                              n, _puntero(descuentos, ctypes.c_int64), _puntero(netos, ctypes.c_int64))
+    return descuentos, netos, total
+
+
+def _netos_numpy(montos, porcentajes):
+    m = np.frombuffer(montos, dtype=np.int64)
+    producto = m * np.frombuffer(porcentajes, dtype=np.int32).astype(np.int64)
+    descuentos = np.where(producto >= 0, (producto + 50) // 100, -((50 - producto) // 100))
+    netos = m - descuentos
+    return _de_numpy(descuentos, "q"), _de_numpy(netos, "q"), int(netos.sum())
+
+
+def _entre_100(valor):
+    return (valor + 50) // 100 if valor >= 0 else -((-valor + 50) // 100)
+
+
+def _netos_python(montos, porcentajes):
+    descuentos = array("q", (_entre_100(m * p) for m, p in zip(montos, porcentajes)))
+    netos = array("q", (m - d for m, d in zip(montos, descuentos)))
+    return descuentos, netos, sum(netos)
+
+
+_NETOS = {"C++": _netos_nativo, "NumPy": _netos_numpy, "Python": _netos_python}
+
+
+def calcular_netos_centavos(montos, porcentajes, usar=None):
+    """
+    Descuento y neto de cada cobro, en centavos. `montos` (centavos) y `porcentajes`
+    (centésimas) son enteros. Regresa (descuentos, netos, total_neto); los dos
+    primeros como array.array('q').
+    """
+    montos = montos if isinstance(montos, array) and montos.typecode == "q" else array("q", montos)
+    porcentajes = porcentajes if isinstance(porcentajes, array) and porcentajes.typecode == "i" \
+        else array("i", porcentajes)
+    if len(montos) != len(porcentajes):
+        raise ValueError("Montos y porcentajes deben tener la misma longitud.")
+    return _NETOS[usar or motor()](montos, porcentajes)
+
+
+def calcular_netos(montos, porcentajes):
+    """Como calcular_netos_centavos pero con Decimal: montos en pesos y porcentajes como 0.10."""
+    descuentos, netos, total = calcular_netos_centavos(
+        [a_centavos(m) for m in montos], [a_centavos(p) for p in porcentajes]
+    )
+    return [Decimal(d) * CENTAVO for d in descuentos], [Decimal(n) * CENTAVO for n in netos], Decimal(total) * CENTAVO
+
+
+def calcular_neto(monto, porcentaje):
+    """(descuento, neto) de un solo cobro, p. ej. el del formulario de Pagos."""
+    descuentos, netos, _ = calcular_netos([monto], [porcentaje])
+    return descuentos[0], netos[0]
+
+
+def _restar_numpy(montos, descuentos):
+    netos = np.frombuffer(montos, dtype=np.int64) - np.frombuffer(descuentos, dtype=np.int64)
+    return _de_numpy(netos, "q"), int(netos.sum())
+
+
+def _restar_python(montos, descuentos):
+    netos = array("q", (m - d for m, d in zip(montos, descuentos)))
+    return netos, sum(netos)
+
+
+def totales_de_cobros(montos, descuentos):
+    """
+    Total (Monto − Descuento) de cada fila de fCobro tal como está guardada, y la suma.
+    Recibe y regresa Decimal; un Descuento NULL cuenta como 0.
+    """
+    montos = array("q", (a_centavos(m) for m in montos))
+    descuentos = array("q", (a_centavos(d) for d in descuentos))
+    # Es una resta: el motor nativo no aporta nada aquí, NumPy sí en columnas grandes
+    netos, total = (_restar_numpy if np is not None else _restar_python)(montos, descuentos)
+    return [Decimal(n) * CENTAVO for n in netos], Decimal(total) * CENTAVO
+
+
+# --- Paridad y velocidad de los motores ---
+
+def _datos_aleatorios(n, semilla, hoy):
+    """Entradas al azar más los casos de borde: sin fecha, 29 de febrero, cumpleaños hoy y mañana,
+    porcentajes de 0 y 100 %, montos negativos y descuentos que caen justo en medio centavo."""
+    azar = random.Random(semilla)
+    cumple = date(hoy.year - 30, hoy.month, 28 if (hoy.month, hoy.day) == (2, 29) else hoy.day)
+    fechas = [None, date(2000, 2, 29), cumple, cumple + timedelta(days=1)]
+    fechas += [hoy - timedelta(days=azar.randint(0, 365 * 90)) if azar.random() > 0.01 else None
+               for _ in range(max(n - len(fechas), 0))]
+    montos = [1, 5, 15, -15, 999999, -1005, 0]
+    porcentajes = [50, 10, 10, 10, 100, 50, 25]
+    montos += [azar.randint(-100000, 50000000) for _ in range(max(n - len(montos), 0))]
+    porcentajes += [azar.randint(0, 100) for _ in range(max(n - len(porcentajes), 0))]
+    return fechas, array("q", montos), array("i", porcentajes)
+
+
+def paridad(n=10000, semilla=7, hoy=None):
+    """
+    Corre todos los motores disponibles sobre las mismas entradas al azar y los
+    compara contra Python (y contra Decimal para los netos). Regresa la lista de
+    diferencias encontradas; vacía si todos coinciden.
+    """
+    hoy = hoy or date.today()
+    fechas, montos, porcentajes = _datos_aleatorios(n, semilla, hoy)
+    diferencias = []
+
+    esperadas = calcular_edades(fechas, hoy, usar="Python")
+    for f, e in zip(fechas, esperadas):
+        if f is not None and e != hoy.year - f.year - ((hoy.month, hoy.day) < (f.month, f.day)):
+            diferencias.append(f"Python: edad {e} para {f}")
+            break
+    esperados = calcular_netos_centavos(montos, porcentajes, usar="Python")
+    for m, p, d in zip(montos, porcentajes, esperados[0]):
+        exacto = (Decimal(m) * Decimal(p) / 100).to_integral_value(rounding=ROUND_HALF_UP)
+        if d != exacto:
+            diferencias.append(f"Python: descuento {d} para monto {m} y {p}%, se esperaba {exacto}")
+            break
+
+    for nombre in motores_disponibles():
+        if nombre == "Python":
+            continue
+        edades = calcular_edades(fechas, hoy, usar=nombre)
+        if edades != esperadas:
+            i = next(i for i, (a, b) in enumerate(zip(edades, esperadas)) if a != b)
+            diferencias.append(f"{nombre}: edad {edades[i]} para {fechas[i]}, Python da {esperadas[i]}")
+        netos = calcular_netos_centavos(montos, porcentajes, usar=nombre)
+        if netos != esperados:
+            diferencias.append(f"{nombre}: los descuentos/netos no coinciden con Python")
+    return diferencias
+
+
+def _medir(funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara los motores de cálculo (C++, NumPy, Python).")
+    parser.add_argument("-n", type=int, default=100000, help="cantidad de personas / cobros")
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--paridad", action="store_true", help="sólo verifica que todos den lo mismo")
+    args = parser.parse_args(argv)
+
+    disponibles = motores_disponibles()
+    print(f"Motores disponibles: {', '.join(disponibles)} (se usa {motor()})")
+    if args.paridad:
+        diferencias = paridad(args.n, args.semilla)
+        for diferencia in diferencias:
+            print(f"ERROR: {diferencia}")
+        print("Todos los motores coinciden." if not diferencias else f"{len(diferencias)} diferencia(s).")
+        return 1 if diferencias else 0
+
+    hoy = date.today()
+    fechas, montos, porcentajes = _datos_aleatorios(args.n, args.semilla, hoy)
+    pruebas = [("Edades", lambda usar: calcular_edades(fechas, hoy, usar)),
+               ("Netos", lambda usar: calcular_netos_centavos(montos, porcentajes, usar))]
+    iguales = True
+    print(f"{args.n} elementos")
+    for titulo, funcion in pruebas:
+        referencia = None
+        for nombre in disponibles:
+            resultado, ms = _medir(funcion, nombre)
+            referencia = resultado if referencia is None else referencia
+            iguales = iguales and resultado == referencia
+            print(f"  {titulo:7} {nombre:30} {ms:10.2f} ms")
+
+    lib = libreria()
+    if lib is not None:
+        # Como se hacía antes: una llamada a la librería por persona
+        nacimientos = [f for f in fechas if f]
+        _, ms = _medir(lambda: [lib.calcular_edad_cpp(f.day, f.month, f.year, hoy.day, hoy.month, hoy.year)
+                                for f in nacimientos])
+        print(f"  {'Edades':7} {'C++ una llamada por persona':30} {ms:10.2f} ms")
+    print("Resultados idénticos." if iguales else "ERROR: los resultados no coinciden.")
+    return 0 if iguales else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+import threading
+import time
+
+
+class CacheCatalogos:
+    """
+    Caché en memoria para catálogos pequeños que casi no cambian (géneros,
+    puestos, tipos de pago...). Cada entrada vence a los `ttl` segundos o
+    cuando se invalida explícitamente tras escribir en su tabla.
+    """
+
+    def __init__(self, ttl=300.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entradas = {}  # clave -> (datos, instante en que vence)
+        self._versiones = {}  # clave -> contador de invalidaciones
+        self._aciertos = {}
+        self._fallos = {}
+        self._invalidaciones = 0
+
+    def obtener(self, clave, cargar):
+        """
+        Regresa los datos de `clave`; si no están o ya vencieron llama a `cargar()`.
+        Si `cargar` lanza una excepción no se guarda nada y la excepción sube.
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and time.monotonic() < entrada[1]:
+                self._aciertos[clave] = self._aciertos.get(clave, 0) + 1
+                return entrada[0]
+            self._fallos[clave] = self._fallos.get(clave, 0) + 1
+            version = self._versiones.get(clave, 0)
+
+        datos = cargar()
+
+        with self._lock:
+            # Si alguien invalidó mientras consultábamos, el resultado podría ser viejo
+            if self._versiones.get(clave, 0) == version:
+                self._entradas[clave] = (datos, time.monotonic() + self.ttl)
+        return datos
+
+    def invalidar(self, clave=None):
+        """Descarta un catálogo (o todos si no se indica)."""
+        with self._lock:
+            claves = [clave] if clave is not None else list(set(self._entradas) | set(self._versiones))
+            for c in claves:
+                self._entradas.pop(c, None)
+                self._versiones[c] = self._versiones.get(c, 0) + 1
+            self._invalidaciones += 1
+
+    def estadisticas(self):
+        with self._lock:
+            aciertos = sum(self._aciertos.values())
+            fallos = sum(self._fallos.values())
+            total = aciertos + fallos
+            return {
+                "aciertos": aciertos,
+                "fallos": fallos,
+                "tasa_aciertos": round(aciertos / total, 3) if total else 0.0,
+                "invalidaciones": self._invalidaciones,
+                "en_cache": sorted(self._entradas),
+                "por_catalogo": {c: {"aciertos": self._aciertos.get(c, 0), "fallos": self._fallos.get(c, 0)}
+                                 for c in sorted(set(self._aciertos) | set(self._fallos))},
+            }
@@ -0,0 +1,132 @@
+"""
+Contraseñas de mUsuario guardadas como scrypt (hashlib, sin dependencias extra):
+
+    scrypt$<n>$<r>$<p>$<sal base64>$<hash base64>
+
+El costo se ajusta con PASSWORD_SCRYPT_N (potencia de 2, por omisión 16384).
+Las filas que aún tienen la contraseña en texto plano se siguen aceptando y
+DatabaseManager.validar_usuario las vuelve a guardar cifradas en cuanto su
+dueño inicia sesión; lo mismo pasa con los hashes de un costo distinto al
+configurado. Para elegir el costo según lo que tarda el login en este equipo:
+
+    python -m db.contrasenas --presupuesto-ms 250
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PREFIJO = "scrypt"
+N_POR_OMISION = 2 ** 14
+R = 8
+P = 1
+LARGO_SAL = 16
+LARGO_HASH = 32
+
+
+def costo_configurado():
+    n = int(os.getenv("PASSWORD_SCRYPT_N", N_POR_OMISION))
+    if n < 2 or n & (n - 1):
+        raise ValueError(f"PASSWORD_SCRYPT_N debe ser potencia de 2 (se recibió {n}).")
+    return n
+
+
+def _derivar(password, sal, n, r, p):
+    # scrypt usa 128 * n * r bytes; maxmem se deja con holgura para que OpenSSL no lo rechace
+    return hashlib.scrypt(password.encode("utf-8"), salt=sal, n=n, r=r, p=p,
+                          maxmem=256 * n * r + 2 ** 20, dklen=LARGO_HASH)
+
+
+def _b64(datos):
+    return base64.b64encode(datos).decode("ascii")
+
+
+def es_hash(valor):
+    return isinstance(valor, str) and valor.startswith(PREFIJO + "$")
+
+
+def generar_hash(password, n=None):
+    n = n or costo_configurado()
+    sal = os.urandom(LARGO_SAL)
+    return f"{PREFIJO}${n}${R}${P}${_b64(sal)}${_b64(_derivar(password, sal, n, R, P))}"
+
+
+def generar_hashes(passwords, n=None):
+    """Varios hashes a la vez (importación). hashlib.scrypt suelta el GIL, así que los hilos sí rinden."""
+    n = n or costo_configurado()
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as hilos:
+        return list(hilos.map(lambda password: generar_hash(password, n), passwords))
+
+
+def verificar(password, almacenado):
+    """
+    Regresa (coincide, hay_que_rehacer). hay_que_rehacer es True si la contraseña
+    coincide pero está guardada en texto plano o con un costo distinto al actual.
+    """
+    if not almacenado:
+        return False, False
+    if not es_hash(almacenado):
+        # Fila anterior al cifrado: comparación exacta (como el BINARY de antes) en tiempo constante
+        coincide = hmac.compare_digest(password.encode("utf-8"), almacenado.encode("utf-8"))
+        return coincide, coincide
+    try:
+        _, n, r, p, sal, esperado = almacenado.split("$")
+        n, r, p = int(n), int(r), int(p)
+        calculado = _derivar(password, base64.b64decode(sal), n, r, p)
+        coincide = hmac.compare_digest(calculado, base64.b64decode(esperado))
+    except ValueError:
+        return False, False
+    return coincide, coincide and (n, r, p) != (costo_configurado(), R, P)
+
+
+_hash_simulado = None
+
+
+def simular_verificacion(password):
+    """Cuando el login no existe se gasta lo mismo que en una verificación real, para no delatar qué logins hay."""
+    global _hash_simulado
+    if _hash_simulado is None:
+        _hash_simulado = generar_hash(os.urandom(LARGO_SAL).hex())
+    verificar(password, _hash_simulado)
+    return False
+
+
+def medir(n, repeticiones=5):
+    """Milisegundos promedio de una verificación con costo n."""
+    almacenado = generar_hash("Medicion#1", n)
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        verificar("Medicion#1", almacenado)
+    return (time.perf_counter() - inicio) * 1000 / repeticiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el costo de scrypt para elegir PASSWORD_SCRYPT_N.")
+    parser.add_argument("--presupuesto-ms", type=float, default=250,
+                        help="lo más que debe tardar la verificación en el login (ms)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    recomendado = None
+    for exponente in range(12, 19):
+        n = 2 ** exponente
+        ms = medir(n, args.repeticiones)
+        dentro = ms <= args.presupuesto_ms
+        print(f"N=2^{exponente:<2} ({n:>6}): {ms:8.1f} ms  {'OK' if dentro else 'excede'}")
+        if dentro:
+            recomendado = n
+        else:
+            break
+    if recomendado is None:
+        print(f"Ningún costo cabe en {args.presupuesto_ms:g} ms; se sugiere no bajar de 2^14.")
+        return 1
+    print(f"\nPASSWORD_SCRYPT_N={recomendado}  (actual: {costo_configurado()})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,92 +1,501 @@
 import pymysql
 import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from .poolConexiones import PoolConexiones
+from .escritorAuditoria import EscritorAuditoria
+from .spoolLocal import SpoolLocal
+from .cacheCatalogos import CacheCatalogos
+from .resolutorNombres import ResolutorNombres
+from .resumenCobros import acumular_cobros
+from . import contrasenas
+from .limitadorLogin import DETALLE_CREDENCIALES_INVALIDAS, DETALLE_LOGIN_EXITOSO
+
+# Códigos de PyMySQL/MariaDB que indican que se perdió el socket con el servidor
+ERRORES_DE_CONEXION = {
+    2003,  # Can't connect to MySQL server
+    2006,  # MySQL server has gone away
+    2013,  # Lost connection to MySQL server during query
+    2055,  # Lost connection to MySQL server at '%s', system error
+    1927,  # Connection was killed (MariaDB)
+}
+
+# Tablas que se pueden guardar en el spool local mientras no hay conexión
+COLUMNAS_SPOOL = {
+    "bitacora_accesos": ("usuario_intento", "direccion_ip", "fecha_hora", "exito", "detalle_evento"),
+    "mErrores": ("mensaje_error", "modulo", "fecha_hora", "usuario_activo", "direccion_ip"),
+}
+
+# Búsquedas por Login. Se definen aquí para que db/verificarIndices.py revise con
+# EXPLAIN exactamente las mismas sentencias. La comparación normal (collation sin
+# distinción de mayúsculas) es la que usa el índice; BINARY sólo filtra la fila ya
+# encontrada para que el login siga siendo exacto. La contraseña ya no se compara
+# en SQL: se trae el hash y se verifica con db/contrasenas.py. El estado de la
+# cuenta lo evalúa el servidor con su propia fecha (ver validar_usuario).
+CONSULTA_VALIDAR_USUARIO = """
+    SELECT
+        u.CvUser,
+        CASE
+            WHEN u.EdoCta = 0 AND u.FecVen < CURDATE() THEN 'caducada'
+            WHEN u.EdoCta = 0 THEN 'deshabilitada'
+            WHEN u.FecVen < CURDATE() THEN 'vencida'
+            WHEN u.FecIni > CURDATE() THEN 'por_activar'
+            ELSE 'activa'
+        END AS Estado,
+        n.DsNombre,
+        ap.DsApellid,
+        am.DsApellid,
+        p.DsPuesto,
+        g.DsGenero,
+        u.Password
+    FROM
+        mUsuario u
+    JOIN mDtsPerson dp ON u.CvPerson = dp.CvPerson
+    JOIN cNombre n ON dp.CvNombre = n.CvNombre
+    JOIN cApellid ap ON dp.CvApePat = ap.CvApellid
+    JOIN cApellid am ON dp.CvApeMat = am.CvApellid
+    LEFT JOIN cPuesto p ON dp.CvPuesto = p.CvPuesto
+    LEFT JOIN cGenero g ON dp.CvGenero = g.CvGenero
+    WHERE
+        u.Login = %s AND BINARY u.Login = %s;
+"""
+CONSULTA_LOGIN_EXISTE = "SELECT CvUser FROM mUsuario WHERE Login = %s;"
+CONSULTA_LOGIN_EXISTE_OTRO = "SELECT CvUser FROM mUsuario WHERE Login = %s AND CvUser != %s;"
+CONSULTA_PASSWORD_USUARIO = "SELECT Password FROM mUsuario WHERE Login = %s AND BINARY Login = %s;"
+SENTENCIA_ACTUALIZAR_PASSWORD = "UPDATE mUsuario SET Password = %s WHERE Login = %s;"
+# Sólo reemplaza el valor que se verificó: si alguien cambió la contraseña mientras tanto, no se pisa
+SENTENCIA_REHACER_PASSWORD = "UPDATE mUsuario SET Password = %s WHERE CvUser = %s AND Password = %s;"
+# Sólo si alguien entra con la cuenta vencida antes de que corra db/desactivarVencidas.py. La
+# condición completa va en el UPDATE: si otra sesión ya la cambió (p. ej. un admin renovó FecVen)
+# no se pisa y rowcount es 0
+SENTENCIA_VENCER_CUENTA = "UPDATE mUsuario SET EdoCta = 0 WHERE CvUser = %s AND EdoCta = 1 AND FecVen < CURDATE();"
+SENTENCIA_AUDITAR_ACCESO = (f"INSERT INTO bitacora_accesos ({', '.join(COLUMNAS_SPOOL['bitacora_accesos'])}) "
+                            f"VALUES (%s, %s, %s, %s, %s);")
+DETALLE_CUENTA_VENCIDA = "Intento fallido: Cuenta vencida (deshabilitada, EdoCta = 0)"
+# Tras reintentar: ¿el commit anterior sí llegó? (usa idx_bitacora_usuario_fecha)
+CONSULTA_AUDITORIA_VENCIDA = ("SELECT 1 FROM bitacora_accesos "
+                              "WHERE usuario_intento = %s AND fecha_hora = %s AND detalle_evento = %s LIMIT 1;")
+# Todas las vencidas de una vez; recorre sólo el rango (EdoCta = 1, FecVen < hoy) de idx_mUsuario_EdoCta_FecVen
+SENTENCIA_DESACTIVAR_VENCIDAS = "UPDATE mUsuario SET EdoCta = 0 WHERE EdoCta = 1 AND FecVen < CURDATE();"
+
+# Personas con sus datos de contacto; la tabla del módulo y la exportación usan la misma
+CONSULTA_PERSONAS = """
+    SELECT u.CvUser,
+           u.Login,
+           CONCAT(n.DsNombre, ' ', ap.DsApellid, ' ', am.DsApellid) AS NombreCompleto,
+           tp.DsTpPerson                                            AS Tipo,
+           p.DsPuesto                                               AS Puesto,
+           dp.E_mail,
+           dp.Telefono,
+           IF(u.EdoCta, 'True', 'False')                            AS EdoCta,
+           dp.FecNac
+    FROM mUsuario u
+             JOIN mDtsPerson dp ON u.CvPerson = dp.CvPerson
+             JOIN cNombre n ON dp.CvNombre = n.CvNombre
+             JOIN cApellid ap ON dp.CvApePat = ap.CvApellid
+             JOIN cApellid am ON dp.CvApeMat = am.CvApellid
+             LEFT JOIN cTpPerso tp ON dp.CvTpPerso = tp.CvTpPerson
+             LEFT JOIN cPuesto p ON dp.CvPuesto = p.CvPuesto
+    ORDER BY NombreCompleto;
+"""
+
+# Historial completo de cobros para exportar, en el orden del módulo de Pagos
+CONSULTA_COBROS_EXPORTACION = """
+    SELECT f.CvCobro, f.FechaCobro, f.Tipo, f.Monto, f.Descuento, d.DsDescuento, f.Estado,
+           CONCAT(n.DsNombre, ' ', ap.DsApellid) AS NombreAlumno, f.CvUsuario
+    FROM fCobro f
+    JOIN mUsuario u ON f.CvUsuario = u.CvUser
+    JOIN mDtsPerson dp ON u.CvPerson = dp.CvPerson
+    JOIN cNombre n ON dp.CvNombre = n.CvNombre
+    JOIN cApellid ap ON dp.CvApePat = ap.CvApellid
+    LEFT JOIN cDescuentos d ON f.CvDescuento = d.CvDescuento
+    ORDER BY f.FechaCobro DESC, f.CvCobro DESC;
+"""
+
+# Se toma el cobro en exclusiva antes de restar su aporte al resumen, para que dos
+# cambios simultáneos al mismo cobro no lo resten dos veces (sólo dentro de begin())
+SENTENCIA_BLOQUEAR_COBRO = "SELECT CvCobro FROM fCobro WHERE CvCobro = %s FOR UPDATE;"
+
+# Agrupaciones del histograma de la bitácora (DATE_FORMAT de MariaDB; %% por los parámetros de PyMySQL)
+FORMATOS_HISTOGRAMA_BITACORA = {"hora": "%%Y-%%m-%%d %%H", "dia": "%%Y-%%m-%%d", "mes": "%%Y-%%m"}
+
+
 class DatabaseManager:
 
-    def __init__(self, host, database, user, password):
-        self.connection = None
+    # Segundos que el servidor espera a que el cliente lea en iterar_bloques (net_write_timeout)
+    TIEMPO_ESPERA_STREAMING = 600
+
+    def __init__(self, host, database, user, password, pool_min=1, pool_max=5, directorio_spool="spool",
+                 ttl_catalogos=300.0):
+        self.pool = None
         self.host = host
         self.database = database
         self.user = user
         self.password = password
+        self.pool_min = pool_min
+        self.pool_max = pool_max
+
+        # Reconexión con espera exponencial
+        self.intentos_conexion = 3
+        self.reintentos_lectura = 2
+        self.espera_base = 0.25
+        self.espera_maxima = 30.0
+        self._lock_reconexion = threading.Lock()
+        self._fallos_consecutivos = 0
+        self._proximo_intento = 0.0
+        self._reconectando = False
+
+        # La bitácora se escribe en lotes desde un hilo aparte; si no hay
+        # conexión, bitácora y errores se guardan en un spool local
+        self.spool = SpoolLocal(directorio_spool)
+        self.auditoria = EscritorAuditoria(self._insertar_lote_bitacora)
+
+        # Catálogos que casi no cambian (cGenero, cPuesto, cTpPerso, cTiposPago, cDescuentos)
+        self.cache_catalogos = CacheCatalogos(ttl=ttl_catalogos)
+        # Nombre/apellido -> clave en cNombre/cApellid
+        self.nombres = ResolutorNombres()
+        # (innodb_autoinc_lock_mode, auto_increment_increment), se consulta una vez
+        self._autoinc = None
+
         self.connect()
 
     def connect(self):
-        """Establece la conexión con la base de datos usando PyMySQL."""
-        try:
-            self.connection = pymysql.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                database=self.database,
-                autocommit=True,
-                # Esto permite que execute acepte %s como placeholder igual que el anterior
-                cursorclass=pymysql.cursors.Cursor
+        """Crea el pool de conexiones hacia la base de datos usando PyMySQL."""
+        try:
+            self.pool = PoolConexiones(
+                self._crear_conexion,
+                min_conexiones=self.pool_min,
+                max_conexiones=self.pool_max
             )
+            self._fallos_consecutivos = 0
             if self.is_connected():
                 print("Conexión exitosa a MariaDB (vía PyMySQL)")
+                if self.spool.hay_pendientes():
+                    threading.Thread(target=self._reproducir_spool, name="ReenvioSpool", daemon=True).start()
         except pymysql.Error as e:
             print(f"Error al conectar con MariaDB: {e}")
             logging.error(f"Error al conectar con MariaDB: {e}")
-            self.connection = None
+            self.pool = None
+            self._fallos_consecutivos += 1
+            self._proximo_intento = time.monotonic() + self._calcular_espera(self._fallos_consecutivos)
+
+    def _crear_conexion(self):
+        """
+        Abre una conexión nueva; si el servidor no responde reintenta con espera exponencial.
+        En el hilo de la GUI (ya arrancado el pool) se intenta una sola vez: los reintentos
+        con espera quedan para los hilos de EjecutorConsultas, la reconexión de fondo y _leer.
+        """
+        intentos = self.intentos_conexion
+        if self.pool is not None and threading.current_thread() is threading.main_thread():
+            intentos = 1
+        for intento in range(intentos):
+            try:
+                return pymysql.connect(
+                    host=self.host,
+                    user=self.user,
+                    password=self.password,
+                    database=self.database,
+                    autocommit=True,
+                    connect_timeout=5,
+                    # Esto permite que execute acepte %s como placeholder igual que el anterior
+                    cursorclass=pymysql.cursors.Cursor
+                )
+            except pymysql.err.OperationalError as e:
+                if intento + 1 >= intentos or not self._es_error_de_conexion(e):
+                    raise
+                espera = self._calcular_espera(intento + 1)
+                logging.warning(f"Reintentando conexión con MariaDB en {espera:.2f}s: {e}")
+                time.sleep(espera)
+
+    def _calcular_espera(self, intento):
+        return min(self.espera_base * (2 ** (intento - 1)), self.espera_maxima)
+
+    @staticmethod
+    def _es_error_de_conexion(error):
+        if isinstance(error, pymysql.err.InterfaceError):
+            return True
+        return bool(error.args) and error.args[0] in ERRORES_DE_CONEXION
 
     def is_connected(self):
-        """Verifica si la conexión está abierta (Compatible con PyMySQL)."""
-        if self.connection and self.connection.open:
+        """
+        Indica si el pool de conexiones está disponible, sin esperar a la red. Si el
+        arranque falló y ya pasó la espera exponencial, programa la reconexión en un
+        hilo de fondo; mientras tanto se sigue respondiendo False.
+        """
+        if self.pool and self.pool.esta_abierto():
             return True
+        if self.pool is None and time.monotonic() >= self._proximo_intento:
+            with self._lock_reconexion:
+                if not self._reconectando:
+                    self._reconectando = True
+                    threading.Thread(target=self._reconectar, name="ReconexionBD", daemon=True).start()
         return False
 
-    def validar_usuario(self, login, password):
-        if not self.is_connected():
-            return None
+    def _reconectar(self):
+        """Corre en un hilo de fondo; connect() deja programado el siguiente intento si vuelve a fallar."""
+        try:
+            if self.pool is None:
+                self.connect()
+        finally:
+            with self._lock_reconexion:
+                self._reconectando = False
 
-        cursor = self.connection.cursor()
-        query = """
-                    SELECT
-                        u.CvUser, u.EdoCta, u.FecIni, u.FecVen,
-                        n.DsNombre, 
-                        ap.DsApellid, 
-                        am.DsApellid,
-                        p.DsPuesto,
-                        g.DsGenero
-                    FROM
-                        mUsuario u
-                    JOIN mDtsPerson dp ON u.CvPerson = dp.CvPerson
-                    JOIN cNombre n ON dp.CvNombre = n.CvNombre
-                    JOIN cApellid ap ON dp.CvApePat = ap.CvApellid
-                    JOIN cApellid am ON dp.CvApeMat = am.CvApellid
-                    LEFT JOIN cPuesto p ON dp.CvPuesto = p.CvPuesto
-                    LEFT JOIN cGenero g ON dp.CvGenero = g.CvGenero
-                    WHERE
-                        BINARY u.Login = %s AND BINARY u.Password = %s;
-                """
+    def _conexion(self):
+        """Presta una conexión del pool: with self._conexion() as conexion: ..."""
+        return self.pool.conexion()
 
+    def _leer(self, query, params=None, uno=False, cursor_class=None):
+        """
+        Ejecuta una consulta de solo lectura. Como es idempotente, si la conexión
+        se cayó a mitad de camino se reintenta con otra conexión del pool.
+        """
+        intento = 0
+        while True:
+            try:
+                with self._conexion() as conexion, conexion.cursor(cursor_class) as cursor:
+                    cursor.execute(query, params)
+                    return cursor.fetchone() if uno else cursor.fetchall()
+            except pymysql.Error as e:
+                intento += 1
+                if intento > self.reintentos_lectura or not self._es_error_de_conexion(e):
+                    raise
+                espera = self._calcular_espera(intento)
+                logging.warning(f"Lectura reintentada ({intento}) tras perder la conexión: {e}")
+                time.sleep(espera)
+
+    def iterar_bloques(self, query, params=None, tam_bloque=1000):
+        """
+        Genera el resultado de `query` en listas de hasta `tam_bloque` filas con un
+        cursor sin búfer (SSCursor): el servidor manda las filas conforme se leen, así
+        que la memoria no crece con el tamaño del resultado. La conexión queda
+        ocupada hasta agotar o cerrar el generador. No se reintenta (parte del
+        resultado ya se entregó): los errores se propagan.
+        """
+        if not self.is_connected():
+            raise pymysql.err.OperationalError(0, "No hay conexión con la base de datos.")
+        conexion = self.pool.obtener()
+        completo = False
         try:
-            cursor.execute(query, (login, password))
-            resultado = cursor.fetchone()
+            cursor = conexion.cursor(pymysql.cursors.SSCursor)
+            # Mientras se escribe el archivo el servidor espera; que no corte el envío
+            # (se queda así en la conexión del pool, sólo alarga ese límite)
+            cursor.execute("SET SESSION net_write_timeout = %s", (self.TIEMPO_ESPERA_STREAMING,))
+            cursor.execute(query, params)
+            while True:
+                bloque = cursor.fetchmany(tam_bloque)
+                if not bloque:
+                    break
+                yield bloque
+            cursor.close()
+            completo = True
+        finally:
+            # Si se canceló o falló a medias, cerrar el cursor obligaría a leer y tirar el
+            # resto del resultado; se descarta la conexión y el pool abre otra
+            self.pool.liberar(conexion, descartar=not completo)
 
-            if resultado is None:
-                return -1
-            return resultado
+    def _reportar_fallo_escritura(self, operacion, error):
+        """
+        Las escrituras no se reintentan: si el socket se cayó no sabemos si el
+        servidor alcanzó a aplicarla, así que se deja constancia en el log.
+        """
+        if self._es_error_de_conexion(error):
+            logging.error(f"Conexión perdida durante {operacion}; la escritura no se reintentó "
+                          f"y pudo no haberse aplicado: {error}")
+        else:
+            logging.error(f"Error en {operacion}: {error}")
+
+    def get_estadisticas_pool(self):
+        """Conexiones en uso, libres y tiempos de espera del pool."""
+        if not self.pool:
+            return {}
+        return self.pool.estadisticas()
+
+    def get_estadisticas_auditoria(self):
+        """Eventos de bitácora encolados, escritos, descartados y fallidos."""
+        return self.auditoria.estadisticas()
+
+    def vaciar_auditoria(self, timeout=5.0):
+        """Espera a que la bitácora pendiente quede escrita (p. ej. al cerrar sesión)."""
+        return self.auditoria.vaciar(timeout)
+
+    def get_estadisticas_cache(self):
+        """Aciertos y fallos de la caché de catálogos y de la LRU de nombres."""
+        estadisticas = self.cache_catalogos.estadisticas()
+        estadisticas["nombres"] = self.nombres.estadisticas()
+        return estadisticas
+
+    def invalidar_catalogo(self, tabla=None):
+        """Hay que llamarlo después de escribir en una tabla de catálogo (None = todas)."""
+        self.cache_catalogos.invalidar(tabla)
+        self.nombres.invalidar(tabla)
+
+    def get_estadisticas_spool(self):
+        """Segmentos pendientes y filas guardadas/reenviadas del spool local."""
+        return self.spool.estadisticas()
+
+    def cerrar(self):
+        """Escribe la bitácora pendiente y cierra todas las conexiones (al salir de la aplicación)."""
+        self.auditoria.detener()
+        self.spool.cerrar()
+        if self.pool:
+            self.pool.cerrar()
+
+    def _insertar_filas(self, tabla, filas):
+        """INSERT de múltiples filas en una tabla del spool (bitácora o errores)."""
+        columnas = COLUMNAS_SPOOL[tabla]
+        # executemany reescribe esto como INSERT ... VALUES (...),(...),...
+        query = (f"INSERT INTO {tabla} ({', '.join(columnas)}) "
+                 f"VALUES ({', '.join(['%s'] * len(columnas))})")
+        with self._conexion() as conexion, conexion.cursor() as cursor:
+            cursor.executemany(query, filas)
+            conexion.commit()
+
+    def _reproducir_spool(self):
+        """Reenvía en bloque lo guardado sin conexión. Corre en un hilo de fondo."""
+        try:
+            reenviadas = self.spool.reproducir(self._insertar_filas)
+            if reenviadas:
+                print(f"Spool local: {reenviadas} registros reenviados a la base de datos.")
+        except Exception as e:
+            logging.error(f"Error al reenviar el spool local: {e}")
 
+    def validar_usuario(self, login, password, ip_address="192.168.0.225"):
+        """
+        Busca al usuario sólo por Login y verifica la contraseña con scrypt, que
+        tarda a propósito: se llama desde un hilo de trabajo, no desde la GUI.
+        Regresa (CvUser, Estado, nombre, ap. paterno, ap. materno, puesto, género),
+        -1 si las credenciales no coinciden o None si falla la BD.
+
+        Estado lo calcula el servidor en la misma consulta: 'activa', 'por_activar',
+        'deshabilitada', 'caducada' o 'vencida'. Una cuenta 'vencida' (aún no la
+        alcanzó db/desactivarVencidas.py) se deshabilita aquí mismo con su renglón de
+        bitácora en la misma transacción. Si otra sesión la cambió antes, el estado es
+        'vencida_sin_cambio' (no se escribió nada); si la BD falla, 'vencida_error'.
+        Las contraseñas en texto plano o con otro costo se vuelven a guardar cifradas.
+        """
+        if not self.is_connected():
+            return None
+
+        try:
+            resultado = self._leer(CONSULTA_VALIDAR_USUARIO, (login, login), uno=True)
         except pymysql.Error as e:
             print(f"ERROR EN LA CONSULTA DE VALIDACIÓN: {e}")
             logging.error(f"Error en validar_usuario (Login: {login}): {e}")
             return None
-        finally:
-            cursor.close()
+
+        if resultado is None:
+            contrasenas.simular_verificacion(password)
+            return -1
+        *datos, almacenado = resultado
+        coincide, rehacer = contrasenas.verificar(password, almacenado)
+        if not coincide:
+            return -1
+        if rehacer:
+            self._rehacer_password(datos[0], almacenado, password)
+        if datos[1] == 'vencida':
+            desactivadas = self._vencer_cuenta(datos[0], login, ip_address)
+            if desactivadas is None:
+                datos[1] = 'vencida_error'
+            elif desactivadas == 0:
+                datos[1] = 'vencida_sin_cambio'
+        return tuple(datos)
+
+    def verificar_password(self, login, password):
+        """True/False según la contraseña actual de `login`; None si falla la BD. También usa scrypt."""
+        if not self.is_connected():
+            return None
+        try:
+            resultado = self._leer(CONSULTA_PASSWORD_USUARIO, (login, login), uno=True)
+        except pymysql.Error as e:
+            print(f"ERROR AL VERIFICAR PASSWORD: {e}")
+            return None
+        if resultado is None:
+            return contrasenas.simular_verificacion(password)
+        return contrasenas.verificar(password, resultado[0])[0]
+
+    def _vencer_cuenta(self, cv_user, login, ip_address):
+        """
+        Deshabilita la cuenta con un solo UPDATE condicional y, si cambió, escribe su
+        renglón de bitácora en la misma transacción. Regresa el rowcount (0 si otra
+        sesión ya la cambió) o None si falla. Como la condición va en el UPDATE y la
+        bitácora se confirma con él, se puede reintentar tras perder la conexión.
+
+        Si se perdió la respuesta del commit, el reintento ya no cambia nada (rowcount 0);
+        para no confundirlo con otra sesión se busca el renglón de bitácora de este mismo
+        intento (misma fecha_hora, fijada antes del primer intento).
+        """
+        # Sin microsegundos: fecha_hora es DATETIME y la búsqueda compara el valor exacto
+        fecha_hora = datetime.now().replace(microsecond=0)
+        intento = 0
+        while True:
+            try:
+                with self._conexion() as conexion, conexion.cursor() as cursor:
+                    conexion.begin()
+                    cursor.execute(SENTENCIA_VENCER_CUENTA, (cv_user,))
+                    desactivadas = cursor.rowcount
+                    if desactivadas:
+                        cursor.execute(SENTENCIA_AUDITAR_ACCESO,
+                                       (login, ip_address, fecha_hora, 0, DETALLE_CUENTA_VENCIDA))
+                    elif intento > 0:
+                        cursor.execute(CONSULTA_AUDITORIA_VENCIDA, (login, fecha_hora, DETALLE_CUENTA_VENCIDA))
+                        if cursor.fetchone() is not None:
+                            desactivadas = 1  # Lo hizo el intento anterior; su bitácora ya está escrita
+                    conexion.commit()
+                return desactivadas
+            except pymysql.Error as e:
+                intento += 1
+                if intento > self.reintentos_lectura or not self._es_error_de_conexion(e):
+                    print(f"ERROR AL ACTUALIZAR: {e}")
+                    self._reportar_fallo_escritura(f"validar_usuario (vencer CvUser: {cv_user})", e)
+                    return None
+                logging.warning(f"Desactivación de cuenta vencida reintentada ({intento}): {e}")
+                time.sleep(self._calcular_espera(intento))
+
+    def _rehacer_password(self, cv_user, almacenado, password):
+        try:
+            with self._conexion() as conexion, conexion.cursor() as cursor:
+                cursor.execute(SENTENCIA_REHACER_PASSWORD, (contrasenas.generar_hash(password), cv_user, almacenado))
+        except pymysql.Error as e:
+            # No impide el login: se vuelve a intentar la próxima vez
+            logging.error(f"No se pudo cifrar la contraseña de CvUser {cv_user}: {e}")
+
+    def contar_cuentas_vencidas(self):
+        """Cuántas cuentas activas ya pasaron su FecVen (lo que desactivar_cuentas_vencidas cambiaría)."""
+        return self._leer("SELECT COUNT(*) FROM mUsuario WHERE EdoCta = 1 AND FecVen < CURDATE();", uno=True)[0]
+
+    def desactivar_cuentas_vencidas(self, admin_login="desactivarVencidas", ip_address="192.168.0.225"):
+        """
+        Deshabilita en un solo UPDATE todas las cuentas activas con FecVen anterior a
+        hoy (según el servidor) y escribe el resumen en la bitácora en la misma
+        transacción, así no queda un cambio sin su renglón de auditoría. Regresa cuántas
+        cambiaron. Los errores de la BD se propagan (lo corre db/desactivarVencidas.py).
+        """
+        with self._conexion() as conexion, conexion.cursor() as cursor:
+            conexion.begin()
+            cursor.execute(SENTENCIA_DESACTIVAR_VENCIDAS)
+            desactivadas = cursor.rowcount
+            if desactivadas:
+                cursor.execute(SENTENCIA_AUDITAR_ACCESO,
+                               (admin_login, ip_address, datetime.now(), 1,
+                                f"AUDITORIA BD: {desactivadas} cuentas vencidas deshabilitadas (EdoCta = 0)"))
+            conexion.commit()
+        return desactivadas
 
     def actualizar_estado_cuenta(self, cv_user, nuevo_estado):
+        """`nuevo_estado` es True (activa) o False; EdoCta es TINYINT(1) desde V010."""
         if not self.is_connected():
             print("Error: No hay conexión a la base de datos.")
             return False
 
-        cursor = self.connection.cursor()
         query = "UPDATE mUsuario SET EdoCta = %s WHERE CvUser = %s;"
         try:
-            cursor.execute(query, (nuevo_estado, cv_user))
-            self.connection.commit()
+            with self._conexion() as conexion, conexion.cursor() as cursor:
+                cursor.execute(query, (1 if nuevo_estado else 0, cv_user))
+                conexion.commit()
+                actualizado = cursor.rowcount > 0
 
-            if cursor.rowcount > 0:
+            if actualizado:
                 print(f"Estado actualizado para CvUser {cv_user} a '{nuevo_estado}'")
                 return True
             else:
@@ -95,74 +504,176 @@ class DatabaseManager:
 
         except pymysql.Error as e:
             print(f"ERROR AL ACTUALIZAR: {e}")
-            logging.error(f"Error en actualizar_estado_cuenta (CvUser: {cv_user}): {e}")
-            self.connection.rollback()
+            self._reportar_fallo_escritura(f"actualizar_estado_cuenta (CvUser: {cv_user})", e)
             return False
-        finally:
-            cursor.close()
 
     def registrar_acceso(self, usuario_intento, exito, detalle_evento, ip_address="192.168.0.225"):
+        """
+        Encola el evento para bitacora_accesos y regresa de inmediato; la fecha se
+        toma al momento del evento y el INSERT se hace en lote en segundo plano.
+        """
+        datos = (usuario_intento, ip_address, datetime.now(), 1 if exito else 0, detalle_evento)
+        return self.auditoria.encolar(datos)
+
+    def _insertar_lote_bitacora(self, filas):
+        """
+        Escribe varios eventos con un solo INSERT de múltiples filas. Se llama desde
+        el hilo de auditoría; si no hay conexión el lote se guarda en el spool local.
+        """
         if not self.is_connected():
             print("Error no hay conexion en la base de datos para la bitacora.")
-            return False
-
-        cursor = self.connection.cursor()
-        query = """
-        INSERT INTO bitacora_accesos
-            (usuario_intento, direccion_ip, fecha_hora, exito, detalle_evento)
-        VALUES
-            (%s, %s, NOW(), %s, %s);"""
+            self.spool.agregar("bitacora_accesos", filas)
+            return
 
         try:
-            datos = (usuario_intento, ip_address, 1 if exito else 0, detalle_evento)
-            cursor.execute(query, datos)
-            self.connection.commit()
-            return True
+            self._insertar_filas("bitacora_accesos", filas)
         except pymysql.Error as e:
             print(f"Error en mostrar en bitacora: {e}")
-            return False
-        finally:
-            cursor.close()
+            if not self._es_error_de_conexion(e):
+                self._reportar_fallo_escritura("registrar_acceso", e)
+                raise
+            self.spool.agregar("bitacora_accesos", filas)
+            return
+
+        # Si hubo eventos guardados mientras no había conexión, es momento de reenviarlos
+        if self.spool.hay_pendientes():
+            self._reproducir_spool()
 
-    def verificar_password_existente(self, nuevo_password):
+    # --- Consulta de la bitácora (módulo de Auditoría) ---
+
+    @staticmethod
+    def _filtro_bitacora(desde, hasta, usuario=None, exito=None, ip=None):
+        """
+        WHERE común a las consultas de la bitácora. El rango sobre fecha_hora va sin
+        funciones para que MariaDB descarte las particiones mensuales que no toca y
+        use el índice compuesto del filtro (usuario, ip o éxito + fecha_hora).
+        """
+        condiciones = ["fecha_hora >= %s", "fecha_hora < %s"]
+        params = [desde, hasta]
+        if usuario:
+            condiciones.append("usuario_intento = %s")
+            params.append(usuario)
+        if ip:
+            condiciones.append("direccion_ip = %s")
+            params.append(ip)
+        if exito is not None:
+            condiciones.append("exito = %s")
+            params.append(1 if exito else 0)
+        return condiciones, params
+
+    def buscar_bitacora(self, desde, hasta, usuario=None, exito=None, ip=None, limite=500, despues_de=None):
+        """
+        Una página de eventos con desde <= fecha_hora < hasta, más recientes primero.
+        `despues_de` es la tupla (fecha_hora, id_acceso) de la última fila ya cargada;
+        con None se obtiene la primera página.
+        """
         if not self.is_connected():
-            return True
+            return []
 
-        cursor = self.connection.cursor()
-        query = "SELECT CvUser FROM mUsuario WHERE Password = %s;"
+        condiciones, params = self._filtro_bitacora(desde, hasta, usuario, exito, ip)
+        if despues_de is not None:
+            fecha, id_acceso = despues_de
+            condiciones.append("(fecha_hora < %s OR (fecha_hora = %s AND id_acceso < %s))")
+            params.extend([fecha, fecha, id_acceso])
+        params.append(limite)
+
+        query = f"""
+        SELECT id_acceso, fecha_hora, usuario_intento, direccion_ip, exito, detalle_evento
+        FROM bitacora_accesos
+        WHERE {' AND '.join(condiciones)}
+        ORDER BY fecha_hora DESC, id_acceso DESC
+        LIMIT %s;
+        """
+        try:
+            return self._leer(query, tuple(params))
+        except pymysql.Error as e:
+            print(f"Error al consultar la bitácora: {e}")
+            return []
 
+    def get_resumen_bitacora(self, desde, hasta, usuario=None, exito=None, ip=None):
+        """Totales del filtro calculados en el servidor: eventos, fallidos, usuarios e IPs distintas."""
+        if not self.is_connected():
+            return None
+
+        condiciones, params = self._filtro_bitacora(desde, hasta, usuario, exito, ip)
+        query = f"""
+        SELECT COUNT(*), COALESCE(SUM(exito = 0), 0),
+               COUNT(DISTINCT usuario_intento), COUNT(DISTINCT direccion_ip)
+        FROM bitacora_accesos
+        WHERE {' AND '.join(condiciones)};
+        """
         try:
-            cursor.execute(query, (nuevo_password,))
-            resultado = cursor.fetchone()
-            return resultado is not None
+            fila = self._leer(query, tuple(params), uno=True)
+            return {"eventos": fila[0], "fallidos": int(fila[1]), "usuarios": fila[2], "ips": fila[3]}
         except pymysql.Error as e:
-            print(f"ERROR AL VERIFICAR PASSWORD: {e}")
-            return True
-        finally:
-            cursor.close()
+            print(f"Error al resumir la bitácora: {e}")
+            return None
+
+    def get_histograma_bitacora(self, desde, hasta, usuario=None, exito=None, ip=None, unidad="dia"):
+        """
+        [(periodo, eventos, fallidos)] agrupado en el servidor por 'hora', 'dia' o 'mes';
+        el periodo es texto ('2025-03-14 09', '2025-03-14' o '2025-03').
+        """
+        if not self.is_connected():
+            return []
+
+        formato = FORMATOS_HISTOGRAMA_BITACORA[unidad]
+        condiciones, params = self._filtro_bitacora(desde, hasta, usuario, exito, ip)
+        query = f"""
+        SELECT DATE_FORMAT(fecha_hora, '{formato}') AS periodo, COUNT(*), COALESCE(SUM(exito = 0), 0)
+        FROM bitacora_accesos
+        WHERE {' AND '.join(condiciones)}
+        GROUP BY periodo
+        ORDER BY periodo;
+        """
+        try:
+            return [(periodo, total, int(fallidos)) for periodo, total, fallidos in self._leer(query, tuple(params))]
+        except pymysql.Error as e:
+            print(f"Error al obtener el histograma de la bitácora: {e}")
+            return []
+
+    def get_intentos_login(self, ventana_seg):
+        """
+        (usuario, ip, fecha_hora, exito) de los logins correctos y con contraseña incorrecta
+        de los últimos `ventana_seg` segundos, en orden, para sembrar LimitadorLogin al arrancar.
+        """
+        if not self.is_connected():
+            return []
+
+        query = """
+        SELECT usuario_intento, direccion_ip, fecha_hora, exito
+        FROM bitacora_accesos
+        WHERE fecha_hora >= %s AND detalle_evento IN (%s, %s)
+        ORDER BY fecha_hora, id_acceso;
+        """
+        desde = datetime.now() - timedelta(seconds=ventana_seg)
+        try:
+            return self._leer(query, (desde, DETALLE_CREDENCIALES_INVALIDAS, DETALLE_LOGIN_EXITOSO))
+        except pymysql.Error as e:
+            print(f"Error al leer los intentos de login recientes: {e}")
+            return []
 
     def actualizar_password(self, login_usuario, nuevo_password):
         if not self.is_connected():
             print("Error: No hay conexión a la base de datos.")
             return False
 
-        cursor = self.connection.cursor()
-        query = "UPDATE mUsuario SET Password = %s WHERE Login = %s;"
         try:
-            cursor.execute(query, (nuevo_password, login_usuario))
-            self.connection.commit()
+            hash_nuevo = contrasenas.generar_hash(nuevo_password)
+            with self._conexion() as conexion, conexion.cursor() as cursor:
+                cursor.execute(SENTENCIA_ACTUALIZAR_PASSWORD, (hash_nuevo, login_usuario))
+                conexion.commit()
+                actualizado = cursor.rowcount > 0
 
             detalle_evento = "AUDITORIA SEGURIDAD: Cambio de contraseña exitoso."
             self.registrar_acceso(login_usuario, True, detalle_evento)
 
-            return cursor.rowcount > 0
+            return actualizado
 
         except pymysql.Error as e:
             print(f"ERROR AL ACTUALIZAR PASSWORD: {e}")
-            self.connection.rollback()
+            self._reportar_fallo_escritura(f"actualizar_password (Login: {login_usuario})", e)
             return False
-        finally:
-            cursor.close()
 
     # --- Pagos ---
     def get_pagos_por_usuario(self, cv_user):
@@ -181,15 +692,11 @@ class DatabaseManager:
         WHERE f.CvUsuario = %s
         ORDER BY f.FechaCobro DESC;
         """
-        cursor = self.connection.cursor()
         try:
-            cursor.execute(query, (cv_user,))
-            return cursor.fetchall()
+            return self._leer(query, (cv_user,))
         except pymysql.Error as e:
             print(f"Error al obtener pagos por usuario: {e}")
             return []
-        finally:
-            cursor.close()
 
     def get_todos_los_pagos(self):
         if not self.is_connected():
@@ -206,15 +713,68 @@ class DatabaseManager:
         JOIN cApellid ap ON dp.CvApePat = ap.CvApellid
         ORDER BY f.FechaCobro DESC;
         """
-        cursor = self.connection.cursor()
         try:
-            cursor.execute(query)
-            return cursor.fetchall()
+            return self._leer(query)
         except pymysql.Error as e:
             print(f"Error al obtener todos los pagos: {e}")
             return []
-        finally:
-            cursor.close()
+
+    def get_pagos_pagina(self, limite=200, despues_de=None, cv_user=None, nombre=None, estado=None):
+        """
+        Regresa una página de cobros ordenada por (FechaCobro, CvCobro) descendente.
+        `despues_de` es la tupla (FechaCobro, CvCobro) de la última fila ya cargada;
+        con None se obtiene la primera página. Si se da `cv_user` sólo trae sus cobros
+        (sin la columna CvUsuario, igual que get_pagos_por_usuario). La última columna
+        siempre es el CvDescuento aplicado. `nombre` (parte del nombre del alumno) y
+        `estado` filtran en el servidor junto con la llave, así cada página trae
+        `limite` cobros que sí cumplen el filtro sobre todo el historial.
+        """
+        if not self.is_connected():
+            return []
+
+        columnas = """
+            f.CvCobro, f.FechaCobro, f.Tipo, f.Monto, f.Descuento, f.Estado,
+            CONCAT(n.DsNombre, ' ', ap.DsApellid) AS NombreAlumno"""
+        condiciones = []
+        params = []
+        if cv_user is not None:
+            condiciones.append("f.CvUsuario = %s")
+            params.append(cv_user)
+        else:
+            columnas += ",\n            f.CvUsuario"
+        columnas += ",\n            f.CvDescuento"
+        if nombre:
+            # Mismo texto que la columna Alumno; % y _ se buscan tal cual
+            patron = nombre.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            condiciones.append("CONCAT(n.DsNombre, ' ', ap.DsApellid) LIKE %s")
+            params.append(f"%{patron}%")
+        if estado:
+            condiciones.append("f.Estado = %s")
+            params.append(estado)
+        if despues_de is not None:
+            fecha, cv_cobro = despues_de
+            # Forma expandida de (FechaCobro, CvCobro) < (%s, %s) para que use el índice
+            condiciones.append("(f.FechaCobro < %s OR (f.FechaCobro = %s AND f.CvCobro < %s))")
+            params.extend([fecha, fecha, cv_cobro])
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        params.append(limite)
+
+        query = f"""
+        SELECT {columnas}
+        FROM fCobro f
+        JOIN mUsuario u ON f.CvUsuario = u.CvUser
+        JOIN mDtsPerson dp ON u.CvPerson = dp.CvPerson
+        JOIN cNombre n ON dp.CvNombre = n.CvNombre
+        JOIN cApellid ap ON dp.CvApePat = ap.CvApellid
+        {where}
+        ORDER BY f.FechaCobro DESC, f.CvCobro DESC
+        LIMIT %s;
+        """
+        try:
+            return self._leer(query, tuple(params))
+        except pymysql.Error as e:
+            print(f"Error al obtener página de pagos: {e}")
+            return []
 
     def get_alumnos_para_combobox(self):
         if not self.is_connected():
@@ -232,86 +792,85 @@ class DatabaseManager:
         WHERE tp.DsTpPerson = 'Alumno'
         ORDER BY NombreCompleto;
         """
-        cursor = self.connection.cursor()
         try:
-            cursor.execute(query)
-            return cursor.fetchall()
+            return self._leer(query)
         except pymysql.Error as e:
             print(f"Error al obtener la lista de alumnos: {e}")
             return []
-        finally:
-            cursor.close()
 
-    def add_pago(self, cv_usuario, fecha, tipo, monto, descuento, estado, admin_login):
+    def add_pago(self, cv_usuario, fecha, tipo, monto, descuento, estado, admin_login, cv_descuento=None):
+        """`monto` y `descuento` como Decimal; `cv_descuento` es la entrada de cDescuentos aplicada."""
         if not self.is_connected():
             return False
         query = """
-                INSERT INTO fCobro (CvUsuario, FechaCobro, Tipo, Monto, Descuento, Estado)
-                VALUES (%s, %s, %s, %s, %s, %s);
+                INSERT INTO fCobro (CvUsuario, FechaCobro, Tipo, Monto, Descuento, CvDescuento, Estado)
+                VALUES (%s, %s, %s, %s, %s, %s, %s);
                 """
-        cursor = self.connection.cursor()
         try:
-            cursor.execute(query, (cv_usuario, fecha, tipo, monto, descuento, estado))
-            self.connection.commit()
+            with self._conexion() as conexion, conexion.cursor() as cursor:
+                # El pool abre en autocommit: sin begin() el cobro y su aporte al resumen se
+                # confirmarían por separado. Si algo falla, el pool hace rollback de ambos.
+                conexion.begin()
+                cursor.execute(query, (cv_usuario, fecha, tipo, monto, descuento, cv_descuento, estado))
+                nuevo_pago_id = cursor.lastrowid
+                acumular_cobros(cursor, [nuevo_pago_id], 1)
+                conexion.commit()
 
-            nuevo_pago_id = cursor.lastrowid
             detalle_evento = f"AUDITORIA BD: INSERT en fCobro. ID: {nuevo_pago_id}, Alumno ID: {cv_usuario}"
             self.registrar_acceso(admin_login, True, detalle_evento)
 
             return True
         except pymysql.Error as e:
             print(f"Error al añadir pago {e}")
-            self.connection.rollback()
+            self._reportar_fallo_escritura("add_pago", e)
             return False
-        finally:
-            cursor.close()
 
     def get_tipos_pago(self):
         if not self.is_connected():
             return []
         query = "SELECT CvTipoPago, DsTipoPago, Monto FROM cTiposPago ORDER BY DsTipoPago;"
-        cursor = self.connection.cursor()
         try:
-            cursor.execute(query)
-            return cursor.fetchall()
+            return self.cache_catalogos.obtener("cTiposPago", lambda: self._leer(query))
         except pymysql.Error as e:
             print(f"Error al obtener tipos de pago: {e}")
             return []
-        finally:
-            cursor.close()
 
     def get_descuentos(self):
         if not self.is_connected():
             return []
         query = "SELECT CvDescuento, DsDescuento, Porcentaje FROM cDescuentos ORDER BY Porcentaje;"
-        cursor = self.connection.cursor()
         try:
-            cursor.execute(query)
-            return cursor.fetchall()
+            return self.cache_catalogos.obtener("cDescuentos", lambda: self._leer(query))
         except pymysql.Error as e:
             print(f"Error al obtener descuentos: {e}")
             return []
-        finally:
-            cursor.close()
 
-    def update_pago(self, cv_cobro, cv_usuario, fecha, tipo, monto, descuento, estado, admin_login):
+    def update_pago(self, cv_cobro, cv_usuario, fecha, tipo, monto, descuento, estado, admin_login,
+                    cv_descuento=None):
         if not self.is_connected():
             return False
 
         query = """
                 UPDATE fCobro
-                SET CvUsuario  = %s,
-                    FechaCobro = %s,
-                    Tipo       = %s,
-                    Monto      = %s,
-                    Descuento  = %s,
-                    Estado     = %s
+                SET CvUsuario   = %s,
+                    FechaCobro  = %s,
+                    Tipo        = %s,
+                    Monto       = %s,
+                    Descuento   = %s,
+                    CvDescuento = %s,
+                    Estado      = %s
                 WHERE CvCobro = %s;
                 """
-        cursor = self.connection.cursor()
         try:
-            cursor.execute(query, (cv_usuario, fecha, tipo, monto, descuento, estado, cv_cobro))
-            self.connection.commit()
+            with self._conexion() as conexion, conexion.cursor() as cursor:
+                # El resumen pierde lo que aportaba el cobro y recibe lo que aporta con los datos nuevos,
+                # todo en una transacción: el FOR UPDATE retiene el cobro hasta el commit
+                conexion.begin()
+                cursor.execute(SENTENCIA_BLOQUEAR_COBRO, (cv_cobro,))
+                acumular_cobros(cursor, [cv_cobro], -1)
+                cursor.execute(query, (cv_usuario, fecha, tipo, monto, descuento, cv_descuento, estado, cv_cobro))
+                acumular_cobros(cursor, [cv_cobro], 1)
+                conexion.commit()
 
             detalle_evento = f"AUDITORIA BD: UPDATE en fCobro. ID: {cv_cobro}"
             self.registrar_acceso(admin_login, True, detalle_evento)
@@ -319,20 +878,21 @@ class DatabaseManager:
             return True
         except pymysql.Error as e:
             print(f"Error al actualizar pago: {e}")
-            self.connection.rollback()
+            self._reportar_fallo_escritura(f"update_pago (ID: {cv_cobro})", e)
             return False
-        finally:
-            cursor.close()
 
     def delete_pago(self, cv_cobro, admin_login):
         if not self.is_connected():
             return False
 
         query = "DELETE FROM fCobro WHERE CvCobro = %s;"
-        cursor = self.connection.cursor()
         try:
-            cursor.execute(query, (cv_cobro,))
-            self.connection.commit()
+            with self._conexion() as conexion, conexion.cursor() as cursor:
+                conexion.begin()
+                cursor.execute(SENTENCIA_BLOQUEAR_COBRO, (cv_cobro,))
+                acumular_cobros(cursor, [cv_cobro], -1)
+                cursor.execute(query, (cv_cobro,))
+                conexion.commit()
 
             detalle_evento = f"AUDITORIA BD: DELETE en fCobro. ID: {cv_cobro}"
             self.registrar_acceso(admin_login, True, detalle_evento)
@@ -340,143 +900,294 @@ class DatabaseManager:
             return True
         except pymysql.Error as e:
             print(f"Error al eliminar pago: {e}")
-            self.connection.rollback()
+            self._reportar_fallo_escritura(f"delete_pago (ID: {cv_cobro})", e)
             return False
-        finally:
-            cursor.close()
+
+    def get_saldos_por_alumno(self, solo_con_pendiente=True, limite=None):
+        """
+        "Quién debe qué": totales por alumno desde fResumenCobro (una fila por alumno
+        y mes, en vez de todos sus cobros), de mayor a menor adeudo. Regresa
+        [(CvUsuario, NombreAlumno, Facturado, Descuento, Pagado, Pendiente)].
+        """
+        if not self.is_connected():
+            return []
+        having = "HAVING SUM(r.Pendiente) > 0" if solo_con_pendiente else ""
+        params = ()
+        limit = ""
+        if limite is not None:
+            limit = "LIMIT %s"
+            params = (limite,)
+        query = f"""
+        SELECT
+            r.CvUsuario,
+            CONCAT(n.DsNombre, ' ', ap.DsApellid) AS NombreAlumno,
+            SUM(r.Facturado), SUM(r.Descuento), SUM(r.Pagado), SUM(r.Pendiente)
+        FROM fResumenCobro r
+        JOIN mUsuario u ON r.CvUsuario = u.CvUser
+        JOIN mDtsPerson dp ON u.CvPerson = dp.CvPerson
+        JOIN cNombre n ON dp.CvNombre = n.CvNombre
+        JOIN cApellid ap ON dp.CvApePat = ap.CvApellid
+        GROUP BY r.CvUsuario, NombreAlumno
+        {having}
+        ORDER BY SUM(r.Pendiente) DESC
+        {limit};
+        """
+        try:
+            return self._leer(query, params or None)
+        except pymysql.Error as e:
+            print(f"Error al obtener saldos por alumno: {e}")
+            return []
+
+    def get_totales_cobros(self):
+        """Totales de toda la escuela: (Facturado, Descuento, Pagado, Pendiente, AlumnosConAdeudo)."""
+        if not self.is_connected():
+            return None
+        query = """
+        SELECT COALESCE(SUM(Facturado), 0), COALESCE(SUM(Descuento), 0), COALESCE(SUM(Pagado), 0),
+               COALESCE(SUM(Pendiente), 0), COUNT(DISTINCT IF(Pendiente > 0, CvUsuario, NULL))
+        FROM fResumenCobro;
+        """
+        try:
+            return self._leer(query, uno=True)
+        except pymysql.Error as e:
+            print(f"Error al obtener los totales de cobros: {e}")
+            return None
+
+    def get_gasto_descuentos(self, desde, hasta):
+        """
+        Monto descontado por cada entrada de cDescuentos en cobros con
+        desde <= FechaCobro < hasta: [(DsDescuento, Cobros, MontoDescontado)].
+        """
+        if not self.is_connected():
+            return []
+        query = """
+        SELECT d.DsDescuento, COUNT(f.CvCobro), COALESCE(SUM(f.Descuento), 0)
+        FROM cDescuentos d
+        LEFT JOIN fCobro f
+            ON f.CvDescuento = d.CvDescuento AND f.FechaCobro >= %s AND f.FechaCobro < %s
+        GROUP BY d.CvDescuento, d.DsDescuento
+        ORDER BY COALESCE(SUM(f.Descuento), 0) DESC;
+        """
+        try:
+            return self._leer(query, (desde, hasta))
+        except pymysql.Error as e:
+            print(f"Error al obtener el gasto por descuento: {e}")
+            return []
+
+    def get_resumen_mensual_cobros(self, desde, hasta):
+        """
+        Totales de la escuela por mes con desde <= Periodo < hasta (fechas). Regresa
+        [(Periodo, Alumnos, Cobros, Facturado, Descuento, Pagado, Pendiente)].
+        """
+        if not self.is_connected():
+            return []
+        query = """
+        SELECT Periodo, COUNT(*), SUM(Cobros), SUM(Facturado), SUM(Descuento), SUM(Pagado), SUM(Pendiente)
+        FROM fResumenCobro
+        WHERE Periodo >= %s AND Periodo < %s
+        GROUP BY Periodo
+        ORDER BY Periodo;
+        """
+        try:
+            return self._leer(query, (desde, hasta))
+        except pymysql.Error as e:
+            print(f"Error al obtener el resumen mensual de cobros: {e}")
+            return []
+
+    # --- FACTURACIÓN MENSUAL (db/facturacion.py) ---
+
+    def get_candidatos_facturacion(self, periodo, tipo):
+        """
+        Para el mes que empieza en `periodo` (date, día 1) regresa (Monto del tipo en
+        cTiposPago, [(CvUser, CvDescuento, Porcentaje)]) con los alumnos activos ese mes
+        que aún no tienen un cobro de `tipo` en él. El descuento es el del último cobro
+        del mismo tipo del alumno (CvDescuento NULL y porcentaje 0 si no tiene).
+        Los errores de la BD se propagan.
+        """
+        fila = self._leer("SELECT Monto FROM cTiposPago WHERE DsTipoPago = %s;", (tipo,), uno=True)
+        if fila is None:
+            raise ValueError(f"No existe el tipo de pago '{tipo}' en cTiposPago.")
+        siguiente = (periodo.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+        query = """
+        SELECT c.CvUser, d.CvDescuento, COALESCE(d.Porcentaje, 0)
+        FROM (
+            SELECT u.CvUser,
+                   (SELECT m.CvDescuento
+                    FROM fCobro m
+                    WHERE m.CvUsuario = u.CvUser AND m.Tipo = %s
+                    ORDER BY m.FechaCobro DESC, m.CvCobro DESC
+                    LIMIT 1) AS CvDescuento
+            FROM mUsuario u
+            JOIN mDtsPerson dp ON u.CvPerson = dp.CvPerson
+            JOIN cTpPerso tp ON dp.CvTpPerso = tp.CvTpPerson
+            WHERE tp.DsTpPerson = 'Alumno'
+              AND u.EdoCta = 1 AND u.FecIni < %s AND u.FecVen >= %s
+              AND NOT EXISTS (
+                  SELECT 1 FROM fCobro f
+                  WHERE f.CvUsuario = u.CvUser AND f.Tipo = %s
+                    AND (f.Periodo = %s OR (f.FechaCobro >= %s AND f.FechaCobro < %s))
+              )
+        ) AS c
+        LEFT JOIN cDescuentos d ON d.CvDescuento = c.CvDescuento
+        ORDER BY c.CvUser;
+        """
+        params = (tipo, siguiente, periodo, tipo, periodo, periodo, siguiente)
+        return fila[0], self._leer(query, params)
+
+    def add_cobros_facturados(self, periodo, tipo, filas, tam_lote=1000):
+        """
+        Inserta los cobros generados para un periodo en una sola transacción, en
+        INSERT IGNORE de hasta `tam_lote` filas. `filas` es [(CvUsuario, FechaCobro,
+        Monto, Descuento, CvDescuento)]. La llave única (CvUsuario, Tipo, Periodo)
+        hace que lo que ya se facturó (p. ej. otra corrida a la vez) se omita en vez
+        de duplicarse.
+        Actualiza fResumenCobro en la misma transacción. Los errores se propagan;
+        la bitácora la escribe el llamador. Regresa cuántos cobros se insertaron.
+        """
+        marcador = "(%s, %s, %s, %s, %s, %s, 'Pendiente', %s)"
+        with self._conexion() as conexion, conexion.cursor() as cursor:
+            conexion.begin()
+            cursor.execute("SELECT COALESCE(MAX(CvCobro), 0) FROM fCobro;")
+            ultimo_previo = cursor.fetchone()[0]
+
+            insertados = 0
+            for i in range(0, len(filas), tam_lote):
+                bloque = filas[i:i + tam_lote]
+                cursor.execute(
+                    "INSERT IGNORE INTO fCobro (CvUsuario, FechaCobro, Tipo, Monto, Descuento, CvDescuento, "
+                    f"Estado, Periodo) VALUES {', '.join([marcador] * len(bloque))}",
+                    [v for cv_usuario, fecha, monto, descuento, cv_descuento in bloque
+                     for v in (cv_usuario, fecha, tipo, monto, descuento, cv_descuento, periodo)]
+                )
+                insertados += cursor.rowcount
+
+            # Los ids de un INSERT IGNORE no son consecutivos si se omitió alguna fila: se leen
+            cursor.execute("SELECT CvCobro FROM fCobro WHERE Periodo = %s AND Tipo = %s AND CvCobro > %s;",
+                           (periodo, tipo, ultimo_previo))
+            nuevos = [fila[0] for fila in cursor.fetchall()]
+            for i in range(0, len(nuevos), tam_lote):
+                acumular_cobros(cursor, nuevos[i:i + tam_lote], 1)
+            conexion.commit()
+        return insertados
 
     # --- FUNCIONES PARA MÓDULO DE PERSONAS ---
 
-    def _get_catalog_data(self, query):
+    def _get_catalog_data(self, tabla, query):
+        """Lee un catálogo pasando por la caché; los errores no se guardan en ella."""
         if not self.is_connected():
             return []
-        cursor = self.connection.cursor()
         try:
-            cursor.execute(query)
-            return cursor.fetchall()
+            return self.cache_catalogos.obtener(tabla, lambda: self._leer(query))
         except pymysql.Error as e:
             print(f"Error al obtener catálogo: {e}")
             return []
-        finally:
-            cursor.close()
 
     def get_generos(self):
-        return self._get_catalog_data("SELECT CvGenero, DsGenero FROM cGenero ORDER BY DsGenero")
+        return self._get_catalog_data("cGenero", "SELECT CvGenero, DsGenero FROM cGenero ORDER BY DsGenero")
 
     def get_puestos(self):
-        return self._get_catalog_data("SELECT CvPuesto, DsPuesto FROM cPuesto ORDER BY DsPuesto")
+        return self._get_catalog_data("cPuesto", "SELECT CvPuesto, DsPuesto FROM cPuesto ORDER BY DsPuesto")
 
     def get_tipos_persona(self):
-        return self._get_catalog_data("SELECT CvTpPerson, DsTpPerson FROM cTpPerso ORDER BY DsTpPerson")
+        return self._get_catalog_data("cTpPerso", "SELECT CvTpPerson, DsTpPerson FROM cTpPerso ORDER BY DsTpPerson")
 
     def get_all_personas_info(self):
         if not self.is_connected():
             return []
-
-        query = """
-                SELECT u.CvUser,
-                       u.Login,
-                       CONCAT(n.DsNombre, ' ', ap.DsApellid, ' ', am.DsApellid) AS NombreCompleto,
-                       tp.DsTpPerson                                            AS Tipo,
-                       p.DsPuesto                                               AS Puesto,
-                       dp.E_mail,
-                       dp.Telefono,
-                       u.EdoCta
-                FROM mUsuario u
-                         JOIN mDtsPerson dp ON u.CvPerson = dp.CvPerson
-                         JOIN cNombre n ON dp.CvNombre = n.CvNombre
-                         JOIN cApellid ap ON dp.CvApePat = ap.CvApellid
-                         JOIN cApellid am ON dp.CvApeMat = am.CvApellid
-                         LEFT JOIN cTpPerso tp ON dp.CvTpPerso = tp.CvTpPerson
-                         LEFT JOIN cPuesto p ON dp.CvPuesto = p.CvPuesto
-                ORDER BY NombreCompleto;
-                """
-        cursor = self.connection.cursor()
         try:
-            cursor.execute(query)
-            return cursor.fetchall()
+            return self._leer(CONSULTA_PERSONAS)
         except pymysql.Error as e:
             print(f"Error al obtener toda la info de personas: {e}")
             return []
-        finally:
-            cursor.close()
 
-    def _get_or_create_catalog_id(self, cursor, tabla, pk_col, ds_col, valor_str):
-        cursor.execute(f"SELECT {pk_col} FROM {tabla} WHERE {ds_col} = %s", (valor_str,))
-        resultado = cursor.fetchone()
+    # --- EXPORTACIÓN (db/exportador.py) ---
 
-        if resultado:
-            return resultado[0]
-        else:
-            cursor.execute(f"INSERT INTO {tabla} ({ds_col}) VALUES (%s)", (valor_str,))
-            return cursor.lastrowid
+    def contar_exportacion(self, tabla):
+        """Filas que tendrá la exportación de "pagos" o "personas" (para el avance). Los errores se propagan."""
+        query = {"pagos": "SELECT COUNT(*) FROM fCobro;", "personas": "SELECT COUNT(*) FROM mUsuario;"}[tabla]
+        return self._leer(query, uno=True)[0]
+
+    def iterar_exportacion(self, tabla, tam_bloque=1000):
+        """
+        Bloques de la exportación de "pagos" (CONSULTA_COBROS_EXPORTACION) o
+        "personas" (CONSULTA_PERSONAS), leídos con iterar_bloques.
+        """
+        query = {"pagos": CONSULTA_COBROS_EXPORTACION, "personas": CONSULTA_PERSONAS}[tabla]
+        return self.iterar_bloques(query, tam_bloque=tam_bloque)
+
+    def _resolver_nombres_persona(self, cursor, datos_persona):
+        """Claves de cNombre/cApellid para una persona, creando las que falten."""
+        nombres = self.nombres.resolver(cursor, "cNombre", [datos_persona['Nombre']])
+        apellidos = self.nombres.resolver(cursor, "cApellid", [datos_persona['ApePat'], datos_persona['ApeMat']])
+        resueltos = {"cNombre": nombres, "cApellid": apellidos}
+        return (nombres[datos_persona['Nombre']], apellidos[datos_persona['ApePat']],
+                apellidos[datos_persona['ApeMat']], resueltos)
+
+    def _recordar_nombres(self, resueltos):
+        """Tras el commit, los nombres resueltos ya se pueden servir desde la LRU."""
+        for tabla, por_valor in resueltos.items():
+            self.nombres.recordar(tabla, por_valor)
 
     def check_login_exists(self, login, current_user_id=None):
         if not self.is_connected():
             return True
 
-        cursor = self.connection.cursor()
         try:
             if current_user_id:
-                query = "SELECT CvUser FROM mUsuario WHERE Login = %s AND CvUser != %s;"
-                cursor.execute(query, (login, current_user_id))
+                resultado = self._leer(CONSULTA_LOGIN_EXISTE_OTRO, (login, current_user_id), uno=True)
             else:
-                query = "SELECT CvUser FROM mUsuario WHERE Login = %s;"
-                cursor.execute(query, (login,))
+                resultado = self._leer(CONSULTA_LOGIN_EXISTE, (login,), uno=True)
 
-            return cursor.fetchone() is not None
+            return resultado is not None
         except pymysql.Error as e:
             print(f"Error al verificar login: {e}")
             return True
-        finally:
-            cursor.close()
 
     def add_persona_y_usuario(self, datos_persona, datos_usuario, admin_login):
         if not self.is_connected():
             return False
 
-        cursor = self.connection.cursor()
-        try:
-            self.connection.begin()  # Inicio de transacción en PyMySQL
-
-            # 1. Catálogos
-            cv_nombre = self._get_or_create_catalog_id(cursor, "cNombre", "CvNombre", "DsNombre",
-                                                       datos_persona['Nombre'])
-            cv_apepat = self._get_or_create_catalog_id(cursor, "cApellid", "CvApellid", "DsApellid",
-                                                       datos_persona['ApePat'])
-            cv_apemat = self._get_or_create_catalog_id(cursor, "cApellid", "CvApellid", "DsApellid",
-                                                       datos_persona['ApeMat'])
-
-            # 2. Insertar en mDtsPerson
-            query_person = """
-                           INSERT INTO mDtsPerson
-                           (CvNombre, CvApePat, CvApeMat, FecNac, E_mail, Telefono,
-                            CvGenero, CvPuesto, CvTpPerso,
-                            CvGdoAca, CvAficion, CvDirecc, CvDepto,
-                            RedSoc, Edad) 
-                           VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, 1, 1, 1, 1, %s, %s);
-                           """
-            cursor.execute(query_person, (
-                cv_nombre, cv_apepat, cv_apemat,
-                datos_persona['FecNac'], datos_persona['E_mail'], datos_persona['Telefono'],
-                datos_persona['CvGenero'], datos_persona['CvPuesto'], datos_persona['CvTpPerso'],
-                datos_persona['RedSoc'], datos_persona['Edad']
-            ))
-            cv_person_nuevo = cursor.lastrowid
-
-            # 3. Insertar en mUsuario
-            query_user = """
-                         INSERT INTO mUsuario
-                             (CvPerson, Login, Password, FecIni, FecVen, EdoCta)
-                         VALUES (%s, %s, %s, %s, %s, %s);
-                         """
-            cursor.execute(query_user, (
-                cv_person_nuevo,
-                datos_usuario['Login'], datos_usuario['Password'],
-                datos_usuario['FecIni'], datos_usuario['FecVen'], datos_usuario['EdoCta']
-            ))
-
-            self.connection.commit()
+        try:
+            # El hash se calcula antes de abrir la transacción para no retener candados mientras tanto
+            hash_password = contrasenas.generar_hash(datos_usuario['Password'])
+            with self._conexion() as conexion, conexion.cursor() as cursor:
+                conexion.begin()  # Inicio de transacción en PyMySQL
+
+                # 1. Catálogos (nombre y apellidos en una consulta por tabla)
+                cv_nombre, cv_apepat, cv_apemat, resueltos = self._resolver_nombres_persona(cursor, datos_persona)
+
+                # 2. Insertar en mDtsPerson
+                query_person = """
+                               INSERT INTO mDtsPerson
+                               (CvNombre, CvApePat, CvApeMat, FecNac, E_mail, Telefono,
+                                CvGenero, CvPuesto, CvTpPerso,
+                                CvGdoAca, CvAficion, CvDirecc, CvDepto,
+                                RedSoc, Edad) 
+                               VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, 1, 1, 1, 1, %s, %s);
+                               """
+                cursor.execute(query_person, (
+                    cv_nombre, cv_apepat, cv_apemat,
+                    datos_persona['FecNac'], datos_persona['E_mail'], datos_persona['Telefono'],
+                    datos_persona['CvGenero'], datos_persona['CvPuesto'], datos_persona['CvTpPerso'],
+                    datos_persona['RedSoc'], datos_persona['Edad']
+                ))
+                cv_person_nuevo = cursor.lastrowid
+
+                # 3. Insertar en mUsuario
+                query_user = """
+                             INSERT INTO mUsuario
+                                 (CvPerson, Login, Password, FecIni, FecVen, EdoCta)
+                             VALUES (%s, %s, %s, %s, %s, %s);
+                             """
+                cursor.execute(query_user, (
+                    cv_person_nuevo,
+                    datos_usuario['Login'], hash_password,
+                    datos_usuario['FecIni'], datos_usuario['FecVen'], datos_usuario['EdoCta']
+                ))
+
+                conexion.commit()
+            self._recordar_nombres(resueltos)
 
             detalle_evento = f"AUDITORIA BD: INSERT en mDtsPerson (ID: {cv_person_nuevo}) y mUsuario (Login: {datos_usuario['Login']})"
             self.registrar_acceso(admin_login, True, detalle_evento)
@@ -485,10 +1196,82 @@ class DatabaseManager:
 
         except pymysql.Error as e:
             print(f"Error en la transacción de añadir persona: {e}")
-            self.connection.rollback()
+            self._reportar_fallo_escritura("add_persona_y_usuario", e)
             return False
-        finally:
-            cursor.close()
+
+    # --- IMPORTACIÓN MASIVA DE PERSONAS ---
+
+    def _paso_autoincremento(self, cursor):
+        """
+        Regresa el incremento entre ids de un INSERT de varias filas, o None si
+        el servidor no garantiza ids consecutivos (innodb_autoinc_lock_mode = 2).
+        """
+        if self._autoinc is None:
+            cursor.execute("SELECT @@innodb_autoinc_lock_mode, @@auto_increment_increment")
+            modo, incremento = cursor.fetchone()
+            self._autoinc = (int(modo), int(incremento))
+        modo, incremento = self._autoinc
+        return None if modo == 2 else incremento
+
+    def get_logins_existentes(self, logins):
+        """Cuáles de `logins` ya están registrados en mUsuario (los errores de la BD se propagan)."""
+        existentes = set()
+        logins = list(logins)
+        for i in range(0, len(logins), 500):
+            bloque = logins[i:i + 500]
+            query = f"SELECT Login FROM mUsuario WHERE Login IN ({', '.join(['%s'] * len(bloque))})"
+            existentes.update(fila[0] for fila in self._leer(query, bloque))
+        return existentes
+
+    def add_personas_en_lote(self, personas):
+        """
+        Inserta varias personas con su usuario en una sola transacción.
+        `personas` es una lista de (datos_persona, datos_usuario) con las mismas
+        claves que en add_persona_y_usuario. A diferencia de éste, un error de la
+        BD se propaga (para que el importador aísle la fila culpable) y la
+        bitácora la escribe el llamador, un resumen por lote.
+        Regresa los CvPerson creados, en el mismo orden.
+        """
+        # Los hashes se calculan en paralelo y antes de abrir la transacción
+        hashes = contrasenas.generar_hashes([u['Password'] for _, u in personas])
+        columnas = ("(CvNombre, CvApePat, CvApeMat, FecNac, E_mail, Telefono, CvGenero, CvPuesto, CvTpPerso, "
+                    "CvGdoAca, CvAficion, CvDirecc, CvDepto, RedSoc, Edad)")
+        marcador = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, 1, 1, 1, 1, %s, %s)"
+
+        with self._conexion() as conexion, conexion.cursor() as cursor:
+            conexion.begin()
+
+            nombres = self.nombres.resolver(cursor, "cNombre", [p['Nombre'] for p, _ in personas])
+            apellidos = self.nombres.resolver(cursor, "cApellid",
+                                              [a for p, _ in personas for a in (p['ApePat'], p['ApeMat'])])
+            filas = [(nombres[p['Nombre']], apellidos[p['ApePat']], apellidos[p['ApeMat']],
+                      p['FecNac'], p['E_mail'], p['Telefono'],
+                      p['CvGenero'], p['CvPuesto'], p['CvTpPerso'],
+                      p['RedSoc'], p['Edad']) for p, _ in personas]
+
+            paso = self._paso_autoincremento(cursor)
+            if paso is not None:
+                # Un solo INSERT multi-fila: los ids son lastrowid, lastrowid + paso, ...
+                cursor.execute(f"INSERT INTO mDtsPerson {columnas} VALUES {', '.join([marcador] * len(filas))}",
+                               [valor for fila in filas for valor in fila])
+                ids = [cursor.lastrowid + i * paso for i in range(len(filas))]
+            else:
+                ids = []
+                for fila in filas:
+                    cursor.execute(f"INSERT INTO mDtsPerson {columnas} VALUES {marcador}", fila)
+                    ids.append(cursor.lastrowid)
+
+            # executemany de un INSERT ... VALUES también se envía como una sola sentencia multi-fila
+            cursor.executemany(
+                "INSERT INTO mUsuario (CvPerson, Login, Password, FecIni, FecVen, EdoCta) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                [(cv_person, u['Login'], hash_password, u['FecIni'], u['FecVen'], u['EdoCta'])
+                 for cv_person, (_, u), hash_password in zip(ids, personas, hashes)]
+            )
+            conexion.commit()
+
+        self._recordar_nombres({"cNombre": nombres, "cApellid": apellidos})
+        return ids
 
     def get_persona_info_by_id(self, cv_user):
         if not self.is_connected():
@@ -506,7 +1289,6 @@ class DatabaseManager:
                        dp.CvPuesto,
                        dp.CvTpPerso,
                        u.Login,
-                       u.Password,
                        u.FecIni,
                        u.FecVen,
                        u.EdoCta
@@ -517,71 +1299,65 @@ class DatabaseManager:
                          JOIN cApellid am ON dp.CvApeMat = am.CvApellid
                 WHERE u.CvUser = %s;
                 """
-        # IMPORTANTE: Usamos DictCursor para obtener resultados como diccionario
-        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
         try:
-            cursor.execute(query, (cv_user,))
-            return cursor.fetchone()
+            # IMPORTANTE: Usamos DictCursor para obtener resultados como diccionario
+            return self._leer(query, (cv_user,), uno=True, cursor_class=pymysql.cursors.DictCursor)
         except pymysql.Error as e:
             print(f"Error al obtener datos de la persona: {e}")
             return None
-        finally:
-            cursor.close()
 
     def update_persona_y_usuario(self, cv_user, cv_person, datos_persona, datos_usuario, admin_login):
+        """Si datos_usuario['Password'] viene vacío se conserva la contraseña actual."""
         if not self.is_connected():
             return False
 
-        cursor = self.connection.cursor()
-        try:
-            self.connection.begin()
-
-            cv_nombre = self._get_or_create_catalog_id(cursor, "cNombre", "CvNombre", "DsNombre",
-                                                       datos_persona['Nombre'])
-            cv_apepat = self._get_or_create_catalog_id(cursor, "cApellid", "CvApellid", "DsApellid",
-                                                       datos_persona['ApePat'])
-            cv_apemat = self._get_or_create_catalog_id(cursor, "cApellid", "CvApellid", "DsApellid",
-                                                       datos_persona['ApeMat'])
-
-            query_person = """
-                           UPDATE mDtsPerson
-                           SET CvNombre  = %s,
-                               CvApePat  = %s,
-                               CvApeMat  = %s,
-                               FecNac    = %s,
-                               E_mail    = %s,
-                               Telefono  = %s,
-                               CvGenero  = %s,
-                               CvPuesto  = %s,
-                               CvTpPerso = %s,
-                               Edad      = %s,
-                               RedSoc    = %s
-                           WHERE CvPerson = %s;
-                           """
-            cursor.execute(query_person, (
-                cv_nombre, cv_apepat, cv_apemat,
-                datos_persona['FecNac'], datos_persona['E_mail'], datos_persona['Telefono'],
-                datos_persona['CvGenero'], datos_persona['CvPuesto'], datos_persona['CvTpPerso'],
-                datos_persona['Edad'], datos_persona['RedSoc'],
-                cv_person
-            ))
-
-            query_user = """
-                         UPDATE mUsuario
-                         SET Login    = %s,
-                             Password = %s,
-                             FecIni   = %s,
-                             FecVen   = %s,
-                             EdoCta   = %s
-                         WHERE CvUser = %s;
-                         """
-            cursor.execute(query_user, (
-                datos_usuario['Login'], datos_usuario['Password'],
-                datos_usuario['FecIni'], datos_usuario['FecVen'], datos_usuario['EdoCta'],
-                cv_user
-            ))
-
-            self.connection.commit()
+        try:
+            hash_password = contrasenas.generar_hash(datos_usuario['Password']) if datos_usuario.get('Password') else None
+            with self._conexion() as conexion, conexion.cursor() as cursor:
+                conexion.begin()
+
+                cv_nombre, cv_apepat, cv_apemat, resueltos = self._resolver_nombres_persona(cursor, datos_persona)
+
+                query_person = """
+                               UPDATE mDtsPerson
+                               SET CvNombre  = %s,
+                                   CvApePat  = %s,
+                                   CvApeMat  = %s,
+                                   FecNac    = %s,
+                                   E_mail    = %s,
+                                   Telefono  = %s,
+                                   CvGenero  = %s,
+                                   CvPuesto  = %s,
+                                   CvTpPerso = %s,
+                                   Edad      = %s,
+                                   RedSoc    = %s
+                               WHERE CvPerson = %s;
+                               """
+                cursor.execute(query_person, (
+                    cv_nombre, cv_apepat, cv_apemat,
+                    datos_persona['FecNac'], datos_persona['E_mail'], datos_persona['Telefono'],
+                    datos_persona['CvGenero'], datos_persona['CvPuesto'], datos_persona['CvTpPerso'],
+                    datos_persona['Edad'], datos_persona['RedSoc'],
+                    cv_person
+                ))
+
+                query_user = """
+                             UPDATE mUsuario
+                             SET Login    = %s,
+                                 Password = COALESCE(%s, Password),
+                                 FecIni   = %s,
+                                 FecVen   = %s,
+                                 EdoCta   = %s
+                             WHERE CvUser = %s;
+                             """
+                cursor.execute(query_user, (
+                    datos_usuario['Login'], hash_password,
+                    datos_usuario['FecIni'], datos_usuario['FecVen'], datos_usuario['EdoCta'],
+                    cv_user
+                ))
+
+                conexion.commit()
+            self._recordar_nombres(resueltos)
 
             detalle_evento = f"AUDITORIA BD: UPDATE en mDtsPerson (ID: {cv_person}) y mUsuario (ID: {cv_user})"
             self.registrar_acceso(admin_login, True, detalle_evento)
@@ -590,37 +1366,34 @@ class DatabaseManager:
 
         except pymysql.Error as e:
             print(f"Error en la transacción de actualizar persona: {e}")
-            self.connection.rollback()
+            self._reportar_fallo_escritura(f"update_persona_y_usuario (CvUser: {cv_user})", e)
             return False
-        finally:
-            cursor.close()
 
     def delete_persona_y_usuario(self, cv_user_a_borrar, admin_login):
         if not self.is_connected():
             return False
 
-        cursor = self.connection.cursor()
-        cv_person = None
-        login_borrado = None
-        try:
-            cursor.execute("SELECT CvPerson, Login FROM mUsuario WHERE CvUser = %s", (cv_user_a_borrar,))
-            resultado = cursor.fetchone()
-            if resultado:
-                cv_person = resultado[0]
-                login_borrado = resultado[1]
-            else:
-                print(f"No se encontró CvPerson para CvUser {cv_user_a_borrar}")
-                return False
-        except pymysql.Error as e:
-            print(f"Error al buscar CvPerson: {e}")
-            return False
-
         try:
-            self.connection.begin()
-
-            # Al borrar la persona, el usuario se borra por cascada
-            cursor.execute("DELETE FROM mDtsPerson WHERE CvPerson = %s;", (cv_person,))
-            self.connection.commit()
+            with self._conexion() as conexion, conexion.cursor() as cursor:
+                try:
+                    cursor.execute("SELECT CvPerson, Login FROM mUsuario WHERE CvUser = %s", (cv_user_a_borrar,))
+                    resultado = cursor.fetchone()
+                except pymysql.Error as e:
+                    print(f"Error al buscar CvPerson: {e}")
+                    return False
+
+                if resultado:
+                    cv_person = resultado[0]
+                    login_borrado = resultado[1]
+                else:
+                    print(f"No se encontró CvPerson para CvUser {cv_user_a_borrar}")
+                    return False
+
+                conexion.begin()
+
+                # Al borrar la persona, el usuario se borra por cascada
+                cursor.execute("DELETE FROM mDtsPerson WHERE CvPerson = %s;", (cv_person,))
+                conexion.commit()
 
             detalle_evento = f"AUDITORIA BD: DELETE en mDtsPerson (ID: {cv_person}) y mUsuario (Login: {login_borrado})"
             self.registrar_acceso(admin_login, True, detalle_evento)
@@ -629,42 +1402,33 @@ class DatabaseManager:
 
         except pymysql.Error as e:
             print(f"Error en la transacción de eliminar persona: {e}")
-            self.connection.rollback()
+            self._reportar_fallo_escritura(f"delete_persona_y_usuario (CvUser: {cv_user_a_borrar})", e)
             return False
-        finally:
-            cursor.close()
 
     def registrar_error(self, mensaje_error, modulo, usuario_activo="Desconocido", ip_address="192.168.0.225"):
+        fila = (str(mensaje_error), modulo, datetime.now(), usuario_activo, ip_address)
         if not self.is_connected():
             print(f"Fallo crítico: No se pudo guardar el error en BD: {mensaje_error}")
+            self.spool.agregar("mErrores", [fila])
             return False
 
-        cursor = self.connection.cursor()
-        query = """
-            INSERT INTO mErrores (mensaje_error, modulo, fecha_hora, usuario_activo, direccion_ip)
-            VALUES (%s, %s, NOW(), %s, %s);
-        """
         try:
-            cursor.execute(query, (str(mensaje_error), modulo, usuario_activo, ip_address))
-            self.connection.commit()
+            self._insertar_filas("mErrores", [fila])
             return True
         except pymysql.Error as e:
             print(f"Error al registrar en mErrores: {e}")
+            self._reportar_fallo_escritura("registrar_error", e)
+            if self._es_error_de_conexion(e):
+                self.spool.agregar("mErrores", [fila])
             return False
-        finally:
-            cursor.close()
 
     def get_catalogo_dinamico(self, nombre_tabla, col_id, col_desc):
         if not self.is_connected():
             return []
 
         query = f"SELECT {col_id}, {col_desc} FROM {nombre_tabla} ORDER BY {col_desc};"
-        cursor = self.connection.cursor()
         try:
-            cursor.execute(query)
-            return cursor.fetchall()
+            return self._leer(query)
         except pymysql.Error as e:
             print(f"Error al obtener catálogo dinámico ({nombre_tabla}): {e}")
             return []
-        finally:
-            cursor.close()
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""
+Deshabilita (EdoCta = 0) todas las cuentas cuya FecVen ya pasó, en un solo UPDATE
+que recorre el índice (EdoCta, FecVen). Pensado para el programador de tareas una
+vez al día, poco después de medianoche (desde PracticaC4_1/):
+
+    python -m db.desactivarVencidas
+    python -m db.desactivarVencidas --dry-run     sólo cuenta cuántas cambiarían
+
+El login sigue deshabilitando una cuenta vencida si alguien entra antes de que
+corra, pero ya no es el único que lo hace.
+"""
+import argparse
+import logging
+import os
+import sys
+
+import pymysql
+
+from .databaseManager import DatabaseManager
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Deshabilita las cuentas vencidas.")
+    parser.add_argument("--admin", default="desactivarVencidas", help="usuario que queda en la bitácora")
+    parser.add_argument("--dry-run", action="store_true", help="cuenta sin modificar")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    db_manager = DatabaseManager(
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME'),
+        pool_max=1
+    )
+    try:
+        if args.dry_run:
+            print(f"Cuentas vencidas por deshabilitar: {db_manager.contar_cuentas_vencidas()}")
+        else:
+            print(f"Cuentas deshabilitadas: {db_manager.desactivar_cuentas_vencidas(args.admin)}")
+        return 0
+    except pymysql.Error as e:
+        print(f"ERROR: {e}")
+        logging.error(f"Desactivación de cuentas vencidas fallida: {e}")
+        return 1
+    finally:
+        db_manager.cerrar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import queue
+import threading
+import time
+import logging
+
+
+class _Vaciado:
+    """Marca que se mete en la cola para pedir que se escriba todo lo pendiente."""
+
+    def __init__(self):
+        self.listo = threading.Event()
+
+
+_DETENER = object()
+
+
+class EscritorAuditoria:
+    """
+    Cola acotada de eventos de auditoría que un hilo en segundo plano vacía
+    en lotes: cada N eventos o cada M milisegundos, lo que ocurra primero.
+    La escritura real la hace `escribir_lote(filas)`, que recibe una lista de tuplas.
+    """
+
+    def __init__(self, escribir_lote, tam_lote=50, intervalo_ms=500, capacidad=5000):
+        self._escribir_lote = escribir_lote
+        self.tam_lote = tam_lote
+        self.intervalo = intervalo_ms / 1000.0
+        self._cola = queue.Queue(maxsize=capacidad)
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._detenido = False
+
+        self._encolados = 0
+        self._escritos = 0
+        self._descartados = 0
+        self._fallidos = 0
+        self._lotes = 0
+
+    def encolar(self, fila):
+        """Agrega un evento sin bloquear; si el búfer está lleno el evento se descarta."""
+        if self._detenido:
+            return False
+        self._asegurar_hilo()
+        try:
+            self._cola.put_nowait(fila)
+        except queue.Full:
+            with self._lock:
+                self._descartados += 1
+            logging.warning("Búfer de auditoría lleno: evento descartado.")
+            return False
+        with self._lock:
+            self._encolados += 1
+        return True
+
+    def vaciar(self, timeout=5.0):
+        """Bloquea hasta que todo lo encolado hasta ahora se haya escrito (o venza el tiempo)."""
+        if self._hilo is None or not self._hilo.is_alive():
+            return True
+        marca = _Vaciado()
+        try:
+            self._cola.put(marca, timeout=timeout)
+        except queue.Full:
+            return False
+        return marca.listo.wait(timeout)
+
+    def detener(self, timeout=5.0):
+        """Escribe lo pendiente y termina el hilo (al cerrar la aplicación)."""
+        if self._detenido:
+            return
+        self.vaciar(timeout)
+        self._detenido = True
+        if self._hilo is not None and self._hilo.is_alive():
+            try:
+                self._cola.put(_DETENER, timeout=timeout)
+            except queue.Full:
+                pass
+            self._hilo.join(timeout)
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "encolados": self._encolados,
+                "escritos": self._escritos,
+                "pendientes": self._cola.qsize(),
+                "descartados": self._descartados,
+                "fallidos": self._fallidos,
+                "lotes": self._lotes,
+            }
+
+    # --- Internos ---
+
+    def _asegurar_hilo(self):
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._ejecutar, name="EscritorAuditoria", daemon=True)
+                self._hilo.start()
+
+    def _ejecutar(self):
+        lote = []
+        marcas = []
+        limite = None
+        while True:
+            espera = None if limite is None else max(0.0, limite - time.monotonic())
+            try:
+                elemento = self._cola.get(timeout=espera)
+            except queue.Empty:
+                elemento = None
+
+            if elemento is _DETENER:
+                self._escribir(lote)
+                return
+            if isinstance(elemento, _Vaciado):
+                marcas.append(elemento)
+            elif elemento is not None:
+                lote.append(elemento)
+                if limite is None:
+                    limite = time.monotonic() + self.intervalo
+
+            vencido = limite is not None and time.monotonic() >= limite
+            if marcas or vencido or len(lote) >= self.tam_lote:
+                self._escribir(lote)
+                lote = []
+                limite = None
+                for marca in marcas:
+                    marca.listo.set()
+                marcas = []
+
+    def _escribir(self, lote):
+        if not lote:
+            return
+        try:
+            self._escribir_lote(lote)
+            with self._lock:
+                self._escritos += len(lote)
+                self._lotes += 1
+        except Exception as e:
+            with self._lock:
+                self._fallidos += len(lote)
+            logging.error(f"No se pudo escribir un lote de {len(lote)} eventos de auditoría: {e}")
@@ -0,0 +1,261 @@
+"""
+Exportación de Pagos (todo fCobro) y Personas a CSV, XLSX o PDF. Las filas se
+leen del servidor por bloques con un cursor sin búfer y cada bloque se escribe
+al archivo antes de pedir el siguiente, así que la memoria no depende de
+cuántos cobros tenga la escuela. Desde la aplicación se usa con los botones
+"Exportar" de Pagos y Personas; también se puede correr (desde PracticaC4_1/):
+
+    python -m db.exportador pagos cobros.csv
+    python -m db.exportador personas personas.xlsx
+
+XLSX necesita openpyxl y PDF necesita reportlab (pip install openpyxl reportlab).
+"""
+import argparse
+import csv
+import logging
+import os
+import sys
+from datetime import date, datetime
+
+import pymysql
+
+from cpp.calculos import calcular_edades, totales_de_cobros
+from .databaseManager import DatabaseManager
+
+try:
+    import openpyxl  # Opcional: sólo se necesita para exportar .xlsx
+except ImportError:
+    openpyxl = None
+
+try:
+    from reportlab.lib.pagesizes import letter, landscape  # Opcional: sólo para .pdf
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.pdfgen import canvas
+except ImportError:
+    canvas = None
+
+ENCABEZADOS = {
+    "pagos": ["ID Cobro", "Fecha", "Tipo", "Monto", "Descuento", "Total", "Descuento aplicado", "Estado",
+              "Alumno", "ID Usuario"],
+    "personas": ["ID Usuario", "Login", "Nombre Completo", "Tipo", "Puesto", "E-mail", "Telefono", "EdoCta",
+                 "Fecha Nac.", "Edad"],
+}
+
+TITULOS = {"pagos": "Pagos", "personas": "Personas"}
+
+
+def _texto(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, datetime):
+        return valor.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return str(valor)
+
+
+# --- Columnas calculadas (un bloque a la vez, igual que las tablas de la aplicación) ---
+
+def _completar_pagos(bloque):
+    # (CvCobro, FechaCobro, Tipo, Monto, Descuento, DsDescuento, Estado, Alumno, CvUsuario)
+    totales, _ = totales_de_cobros([f[3] for f in bloque], [f[4] for f in bloque])
+    return [f[:5] + (total,) + f[5:] for f, total in zip(bloque, totales)]
+
+
+def _completar_personas(bloque):
+    edades = calcular_edades([f[8] for f in bloque])
+    return [f + (edad,) for f, edad in zip(bloque, edades)]
+
+
+_COMPLETAR = {"pagos": _completar_pagos, "personas": _completar_personas}
+
+
+# --- Formatos de salida ---
+
+class _EscritorCSV:
+    def __init__(self, ruta, titulo, encabezados):
+        # utf-8-sig: Excel reconoce los acentos al abrirlo directamente
+        self.archivo = open(ruta, "w", newline="", encoding="utf-8-sig")
+        self.escritor = csv.writer(self.archivo)
+        self.escritor.writerow(encabezados)
+
+    def escribir(self, filas):
+        self.escritor.writerows([_texto(v) for v in fila] for fila in filas)
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+class _EscritorXLSX:
+    def __init__(self, ruta, titulo, encabezados):
+        # write_only: openpyxl manda cada fila a un temporal en vez de guardar la hoja en memoria
+        self.ruta = ruta
+        self.libro = openpyxl.Workbook(write_only=True)
+        self.hoja = self.libro.create_sheet(titulo)
+        self.hoja.append(encabezados)
+
+    def escribir(self, filas):
+        for fila in filas:
+            self.hoja.append(fila)
+
+    def cerrar(self):
+        self.libro.save(self.ruta)
+
+
+class _EscritorPDF:
+    """
+    Tabla simple en hojas carta horizontales con el encabezado en cada página.
+    reportlab guarda cada página ya comprimida hasta cerrar el archivo: la memoria
+    crece con el número de páginas, no con el resultado completo en Python.
+    """
+
+    MARGEN = 36
+    ALTO_FILA = 12
+    TAM_LETRA = 7
+
+    def __init__(self, ruta, titulo, encabezados):
+        self.titulo = titulo
+        self.encabezados = encabezados
+        self.ancho, self.alto = landscape(letter)
+        self.ancho_columna = (self.ancho - 2 * self.MARGEN) / len(encabezados)
+        self.lienzo = canvas.Canvas(ruta, pagesize=(self.ancho, self.alto), pageCompression=1)
+        self.pagina = 0
+        self._nueva_pagina()
+
+    def _nueva_pagina(self):
+        if self.pagina:
+            self.lienzo.showPage()
+        self.pagina += 1
+        self.y = self.alto - self.MARGEN
+        self.lienzo.setFont("Helvetica-Bold", 10)
+        self.lienzo.drawString(self.MARGEN, self.y, f"{self.titulo} - página {self.pagina}")
+        self.y -= 2 * self.ALTO_FILA
+        self._fila(self.encabezados, "Helvetica-Bold")
+
+    def _fila(self, valores, fuente="Helvetica"):
+        self.lienzo.setFont(fuente, self.TAM_LETRA)
+        for i, valor in enumerate(valores):
+            texto = _texto(valor)
+            while texto and stringWidth(texto, fuente, self.TAM_LETRA) > self.ancho_columna - 4:
+                texto = texto[:-1]
+            self.lienzo.drawString(self.MARGEN + i * self.ancho_columna, self.y, texto)
+        self.y -= self.ALTO_FILA
+
+    def escribir(self, filas):
+        for fila in filas:
+            if self.y < self.MARGEN:
+                self._nueva_pagina()
+            self._fila(fila)
+
+    def cerrar(self):
+        self.lienzo.save()
+
+
+_ESCRITORES = {".csv": _EscritorCSV, ".xlsx": _EscritorXLSX, ".pdf": _EscritorPDF}
+
+
+def formatos_disponibles():
+    """Extensiones que se pueden exportar con lo que está instalado."""
+    return [".csv"] + ([".xlsx"] if openpyxl is not None else []) + ([".pdf"] if canvas is not None else [])
+
+
+class Exportador:
+    def __init__(self, db_manager, tam_bloque=1000):
+        self.db = db_manager
+        self.tam_bloque = tam_bloque
+
+    def exportar(self, tabla, ruta, admin_login=None, progreso=None, cancelado=None):
+        """
+        Exporta "pagos" o "personas" a `ruta` (el formato sale de la extensión).
+        `progreso(filas_escritas, total)` se llama tras cada bloque y `cancelado()`
+        se consulta entre bloques; si se cancela no queda archivo a medias.
+        Regresa un resumen con los conteos.
+        """
+        extension = os.path.splitext(ruta)[1].lower()
+        if extension not in _ESCRITORES:
+            raise ValueError(f"Formato no soportado: '{extension}'. Use .csv, .xlsx o .pdf.")
+        if extension not in formatos_disponibles():
+            modulo = "openpyxl" if extension == ".xlsx" else "reportlab"
+            raise ValueError(f"Para exportar archivos {extension} instale {modulo} (pip install {modulo}).")
+        if not self.db.is_connected():
+            raise pymysql.err.OperationalError(0, "No hay conexión con la base de datos.")
+
+        total = self.db.contar_exportacion(tabla)
+        completar = _COMPLETAR[tabla]
+        # Se escribe a un temporal y se renombra al final: un archivo con el nombre pedido siempre está completo
+        temporal = ruta + ".tmp"
+        escritas = 0
+        cancelada = False
+        bloques = self.db.iterar_exportacion(tabla, self.tam_bloque)
+        try:
+            escritor = _ESCRITORES[extension](temporal, TITULOS[tabla], ENCABEZADOS[tabla])
+            try:
+                for bloque in bloques:
+                    escritor.escribir(completar(bloque))
+                    escritas += len(bloque)
+                    if progreso:
+                        progreso(escritas, max(total, escritas))
+                    if cancelado and cancelado():
+                        cancelada = True
+                        break
+            finally:
+                escritor.cerrar()
+        except BaseException:
+            self._borrar(temporal)
+            raise
+        finally:
+            bloques.close()
+
+        if cancelada:
+            self._borrar(temporal)
+        else:
+            os.replace(temporal, ruta)
+            if admin_login:
+                self.db.registrar_acceso(
+                    admin_login, True,
+                    f"AUDITORIA APP: Exportación de {TITULOS[tabla]} a {extension}: {escritas} filas"
+                )
+        return {"tabla": tabla, "ruta": ruta, "filas": escritas, "cancelado": cancelada}
+
+    @staticmethod
+    def _borrar(ruta):
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Exporta Pagos o Personas a CSV, XLSX o PDF.")
+    parser.add_argument("tabla", choices=sorted(ENCABEZADOS))
+    parser.add_argument("ruta", help="archivo de salida (.csv, .xlsx o .pdf)")
+    parser.add_argument("--admin", default="exportacion", help="usuario que queda en la bitácora")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    db_manager = DatabaseManager(
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME'),
+        pool_max=1
+    )
+    try:
+        resumen = Exportador(db_manager).exportar(
+            args.tabla, args.ruta, args.admin,
+            progreso=lambda escritas, total: print(f"\r{escritas}/{total} filas", end="", flush=True)
+        )
+        print(f"\nExportadas {resumen['filas']} filas a {resumen['ruta']}")
+        return 0
+    except (pymysql.Error, ValueError, OSError) as e:
+        print(f"\nERROR: {e}")
+        logging.error(f"Exportación fallida: {e}")
+        return 1
+    finally:
+        db_manager.cerrar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Generación de cobros recurrentes (Mensualidad) para todos los alumnos activos.
+Desde la aplicación se usa con el botón "Generar mensualidades" del módulo de
+Pagos; también se puede correr (desde PracticaC4_1/):
+
+    python -m db.facturacion 2025-11               factura noviembre de 2025
+    python -m db.facturacion 2025-11 --dry-run     sólo muestra cuántos y cuánto
+
+Volver a correrla para el mismo mes no duplica nada: los alumnos que ya tienen
+el cobro de ese mes se omiten.
+"""
+import argparse
+import logging
+import os
+import sys
+from datetime import date
+from decimal import Decimal
+
+import pymysql
+
+from cpp.calculos import calcular_netos
+from .databaseManager import DatabaseManager
+
+
+def periodo_desde_texto(texto):
+    """'2025-11' -> date(2025, 11, 1)."""
+    anio, mes = texto.strip().split("-")
+    return date(int(anio), int(mes), 1)
+
+
+class GeneradorCobros:
+    def __init__(self, db_manager, tam_lote=1000):
+        self.db = db_manager
+        self.tam_lote = tam_lote
+
+    def generar(self, periodo, admin_login, tipo="Mensualidad", fecha_cobro=None, dry_run=False):
+        """
+        Factura `tipo` del mes de `periodo` a cada alumno activo que aún no lo tenga:
+        Monto de cTiposPago menos el descuento de su último cobro de ese tipo.
+        Escribe una sola entrada de bitácora. Regresa un resumen con los conteos.
+        """
+        if not self.db.is_connected():
+            raise pymysql.err.OperationalError(0, "No hay conexión con la base de datos.")
+        periodo = periodo.replace(day=1)
+        fecha_cobro = fecha_cobro or periodo
+
+        monto, candidatos = self.db.get_candidatos_facturacion(periodo, tipo)
+        # Descuento y neto en centavos exactos, todos los alumnos en una sola llamada a la librería
+        montos = [Decimal(monto)] * len(candidatos)
+        descuentos, netos, total = calcular_netos(montos, [porcentaje for _, _, porcentaje in candidatos])
+        filas = [(cv_usuario, fecha_cobro, montos[i], descuentos[i], cv_descuento)
+                 for i, (cv_usuario, cv_descuento, _) in enumerate(candidatos)]
+        descuento_total = sum(descuentos, Decimal("0.00"))
+
+        resumen = {"periodo": periodo, "tipo": tipo, "candidatos": len(filas), "insertados": 0,
+                   "monto_neto": total, "descuento": descuento_total}
+        if dry_run or not filas:
+            return resumen
+
+        resumen["insertados"] = self.db.add_cobros_facturados(periodo, tipo, filas, self.tam_lote)
+        self.db.registrar_acceso(
+            admin_login, True,
+            f"AUDITORIA BD: Facturación de {tipo} {periodo:%Y-%m}. "
+            f"INSERT en fCobro: {resumen['insertados']} de {len(filas)} alumnos, neto {total}"
+        )
+        return resumen
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Genera los cobros recurrentes de un mes.")
+    parser.add_argument("periodo", help="mes a facturar, AAAA-MM")
+    parser.add_argument("--tipo", default="Mensualidad", help="DsTipoPago de cTiposPago")
+    parser.add_argument("--admin", default="facturacion", help="usuario que queda en la bitácora")
+    parser.add_argument("--dry-run", action="store_true", help="calcula sin insertar")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    db_manager = DatabaseManager(
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME'),
+        pool_max=1
+    )
+    try:
+        resumen = GeneradorCobros(db_manager).generar(
+            periodo_desde_texto(args.periodo), args.admin, args.tipo, dry_run=args.dry_run
+        )
+        print(f"{resumen['tipo']} {resumen['periodo']:%Y-%m}: {resumen['candidatos']} alumno(s) por facturar, "
+              f"neto {resumen['monto_neto']}, descuento {resumen['descuento']}.")
+        if not args.dry_run:
+            print(f"Cobros insertados: {resumen['insertados']}")
+        return 0
+    except (pymysql.Error, ValueError) as e:
+        print(f"ERROR: {e}")
+        logging.error(f"Facturación fallida: {e}")
+        return 1
+    finally:
+        db_manager.cerrar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
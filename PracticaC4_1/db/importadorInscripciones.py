@@ -0,0 +1,295 @@
+import csv
+import json
+import os
+import logging
+from datetime import date, datetime
+
+import pymysql
+
+from .resolutorNombres import normalizar
+
+try:
+    import openpyxl  # Opcional: sólo se necesita para importar .xlsx
+except ImportError:
+    openpyxl = None
+
+# Encabezados esperados en el archivo (los opcionales pueden faltar o venir vacíos)
+COLUMNAS_REQUERIDAS = ("Nombre", "ApePat", "ApeMat", "FecNac", "E_mail", "Genero", "Puesto", "TipoPersona",
+                       "Login", "Password")
+COLUMNAS_OPCIONALES = ("Telefono", "FecIni", "FecVen", "EdoCta")
+
+# Largo máximo de las columnas en bdPracticaC4_1.sql
+LARGOS_MAXIMOS = {"Nombre": 30, "ApePat": 30, "ApeMat": 30, "E_mail": 100, "Telefono": 20, "Login": 45,
+                  "Password": 255}
+
+# Texto del archivo -> valor de mUsuario.EdoCta (TINYINT(1))
+VALORES_EDOCTA = {"true": 1, "1": 1, "si": 1, "activo": 1,
+                  "false": 0, "0": 0, "no": 0, "inactivo": 0}
+
+
+def leer_filas(ruta):
+    """Genera (número de fila en el archivo, dict) sin cargar todo el archivo en memoria."""
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == ".csv":
+        with open(ruta, newline="", encoding="utf-8-sig") as archivo:
+            lector = csv.DictReader(archivo)
+            for numero, fila in enumerate(lector, start=2):
+                yield numero, fila
+    elif extension == ".xlsx":
+        if openpyxl is None:
+            raise ValueError("Para importar archivos .xlsx instale openpyxl (pip install openpyxl).")
+        libro = openpyxl.load_workbook(ruta, read_only=True, data_only=True)
+        try:
+            filas = libro.active.iter_rows(values_only=True)
+            encabezados = [str(c).strip() if c is not None else "" for c in next(filas, ())]
+            for numero, valores in enumerate(filas, start=2):
+                if all(v is None for v in valores):
+                    continue
+                yield numero, dict(zip(encabezados, valores))
+        finally:
+            libro.close()
+    else:
+        raise ValueError(f"Formato no soportado: {extension} (use .csv o .xlsx).")
+
+
+def _fecha(valor):
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    texto = str(valor).strip()
+    for formato in ("%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            pass
+    raise ValueError(f"fecha inválida '{texto}' (use AAAA-MM-DD o DD/MM/AAAA)")
+
+
+def _un_anio_despues(fecha):
+    try:
+        return fecha.replace(year=fecha.year + 1)
+    except ValueError:  # 29 de febrero
+        return fecha.replace(year=fecha.year + 1, day=28)
+
+
+class ImportadorInscripciones:
+    """
+    Carga personas y usuarios desde un CSV/XLSX: valida cada fila, agrupa las
+    válidas en lotes y cada lote se inserta en una transacción con INSERTs de
+    varias filas. Las filas con error se anotan en `<archivo>.errores.csv` y el
+    avance se guarda en `<archivo>.progreso.json` para poder reanudar.
+    """
+
+    def __init__(self, db_manager, tam_lote=500):
+        self.db = db_manager
+        self.tam_lote = tam_lote
+
+    def importar(self, ruta, admin_login, progreso=None, cancelado=None):
+        """
+        Importa `ruta`. `progreso(filas_leidas, insertadas, rechazadas)` se llama
+        tras cada lote y `cancelado()` se consulta entre lotes.
+        Regresa un resumen con los conteos y la ruta del archivo de errores.
+        """
+        if not self.db.is_connected():
+            raise pymysql.err.OperationalError(0, "No hay conexión con la base de datos.")
+
+        ruta_progreso = ruta + ".progreso.json"
+        ruta_errores = ruta + ".errores.csv"
+        estado = self._cargar_progreso(ruta, ruta_progreso)
+        reanudado = estado["ultima_fila"] > 0
+
+        self._catalogos = {
+            "Genero": self._indice_catalogo(self.db.get_generos()),
+            "Puesto": self._indice_catalogo(self.db.get_puestos()),
+            "TipoPersona": self._indice_catalogo(self.db.get_tipos_persona()),
+        }
+        self._logins_vistos = set()
+
+        with open(ruta_errores, "a" if reanudado else "w", newline="", encoding="utf-8") as archivo_errores:
+            errores = csv.writer(archivo_errores)
+            if not reanudado:
+                errores.writerow(["Fila", "Login", "Error"])
+
+            lote = []
+            filas_leidas = 0
+            for numero, fila in leer_filas(ruta):
+                if numero <= estado["ultima_fila"]:
+                    continue
+                filas_leidas += 1
+                lote.append((numero, fila))
+                if len(lote) >= self.tam_lote:
+                    self._procesar_lote(lote, admin_login, estado, errores, ruta_progreso)
+                    archivo_errores.flush()
+                    lote = []
+                    if progreso:
+                        progreso(filas_leidas, estado["insertadas"], estado["rechazadas"])
+                    if cancelado and cancelado():
+                        estado["cancelado"] = True
+                        break
+            else:
+                if lote:
+                    self._procesar_lote(lote, admin_login, estado, errores, ruta_progreso)
+                    if progreso:
+                        progreso(filas_leidas, estado["insertadas"], estado["rechazadas"])
+
+        if not estado.get("cancelado") and os.path.exists(ruta_progreso):
+            # Terminado: la próxima vez el mismo archivo empieza desde cero
+            os.remove(ruta_progreso)
+
+        return {
+            "insertadas": estado["insertadas"],
+            "rechazadas": estado["rechazadas"],
+            "lotes": estado["lotes"],
+            "reanudado": reanudado,
+            "cancelado": bool(estado.get("cancelado")),
+            "archivo_errores": ruta_errores if estado["rechazadas"] else None,
+        }
+
+    # --- Lotes ---
+
+    def _procesar_lote(self, lote, admin_login, estado, errores, ruta_progreso):
+        validas = []
+        rechazadas = []
+        for numero, fila in lote:
+            try:
+                validas.append((numero, self._validar(fila)))
+            except ValueError as e:
+                rechazadas.append((numero, fila.get("Login"), str(e)))
+
+        # Logins repetidos contra la BD, en una sola consulta por lote
+        if validas:
+            existentes = {normalizar(l) for l in self.db.get_logins_existentes(u["Login"] for _, (_, u) in validas)}
+            repetidas = [v for v in validas if normalizar(v[1][1]["Login"]) in existentes]
+            rechazadas.extend((numero, u["Login"], "el login ya existe") for numero, (_, u) in repetidas)
+            validas = [v for v in validas if normalizar(v[1][1]["Login"]) not in existentes]
+
+        insertadas = self._insertar(validas, rechazadas)
+
+        for numero, login, mensaje in sorted(rechazadas, key=lambda r: r[0]):
+            errores.writerow([numero, login or "", mensaje])
+
+        estado["insertadas"] += insertadas
+        estado["rechazadas"] += len(rechazadas)
+        estado["lotes"] += 1
+        estado["ultima_fila"] = lote[-1][0]
+        self._guardar_progreso(estado, ruta_progreso)
+
+        detalle = (f"AUDITORIA BD: IMPORTACION lote {estado['lotes']} (filas {lote[0][0]}-{lote[-1][0]}): "
+                   f"{insertadas} personas insertadas, {len(rechazadas)} rechazadas")
+        self.db.registrar_acceso(admin_login, True, detalle)
+
+    def _insertar(self, validas, rechazadas):
+        """Inserta el lote completo; si falla, fila por fila para saber cuál es la culpable."""
+        if not validas:
+            return 0
+        try:
+            self.db.add_personas_en_lote([datos for _, datos in validas])
+            return len(validas)
+        except pymysql.Error as e:
+            if self.db._es_error_de_conexion(e):
+                # Sin conexión no tiene caso seguir: el avance queda en el último lote confirmado
+                raise
+            if len(validas) == 1:
+                numero, (_, u) = validas[0]
+                rechazadas.append((numero, u["Login"], f"error de BD: {e}"))
+                return 0
+            logging.warning(f"Lote de importación revertido, se reintenta fila por fila: {e}")
+        return sum(self._insertar([v], rechazadas) for v in validas)
+
+    # --- Validación ---
+
+    def _validar(self, fila):
+        """Convierte una fila del archivo en (datos_persona, datos_usuario) o lanza ValueError."""
+        valores = {}
+        for columna in COLUMNAS_REQUERIDAS + COLUMNAS_OPCIONALES:
+            valor = fila.get(columna)
+            valores[columna] = valor.strip() if isinstance(valor, str) else valor
+            if columna in COLUMNAS_REQUERIDAS and valores[columna] in (None, ""):
+                raise ValueError(f"falta '{columna}'")
+        for columna, largo in LARGOS_MAXIMOS.items():
+            if valores.get(columna) is not None and len(str(valores[columna])) > largo:
+                raise ValueError(f"'{columna}' excede {largo} caracteres")
+        if "@" not in str(valores["E_mail"]):
+            raise ValueError(f"e-mail inválido '{valores['E_mail']}'")
+
+        login = str(valores["Login"])
+        clave_login = normalizar(login)
+        if clave_login in self._logins_vistos:
+            raise ValueError("login repetido dentro del archivo")
+
+        fec_nac = _fecha(valores["FecNac"])
+        hoy = date.today()
+        fec_ini = _fecha(valores["FecIni"]) if valores["FecIni"] else hoy
+        fec_ven = _fecha(valores["FecVen"]) if valores["FecVen"] else _un_anio_despues(fec_ini)
+        if fec_ven < fec_ini:
+            raise ValueError("FecVen es anterior a FecIni")
+
+        edo_cta = VALORES_EDOCTA.get(str(valores["EdoCta"] or "true").strip().lower())
+        if edo_cta is None:
+            raise ValueError(f"EdoCta inválido '{valores['EdoCta']}'")
+
+        catalogo = {col: self._buscar_catalogo(col, valores[col]) for col in ("Genero", "Puesto", "TipoPersona")}
+        self._logins_vistos.add(clave_login)
+
+        datos_persona = {
+            "Nombre": str(valores["Nombre"]),
+            "ApePat": str(valores["ApePat"]),
+            "ApeMat": str(valores["ApeMat"]),
+            "FecNac": fec_nac.isoformat(),
+            "E_mail": str(valores["E_mail"]),
+            "Telefono": str(valores["Telefono"] or ""),
+            "CvGenero": catalogo["Genero"],
+            "CvPuesto": catalogo["Puesto"],
+            "CvTpPerso": catalogo["TipoPersona"],
+            "Edad": hoy.year - fec_nac.year - ((hoy.month, hoy.day) < (fec_nac.month, fec_nac.day)),
+            "RedSoc": "N/A"
+        }
+        datos_usuario = {
+            "Login": login,
+            "Password": str(valores["Password"]),
+            "FecIni": fec_ini.isoformat(),
+            "FecVen": fec_ven.isoformat(),
+            "EdoCta": edo_cta
+        }
+        return datos_persona, datos_usuario
+
+    @staticmethod
+    def _indice_catalogo(filas):
+        indice = {}
+        for cv, ds in filas:
+            indice[normalizar(str(ds))] = cv
+            indice[str(cv)] = cv
+        return indice
+
+    def _buscar_catalogo(self, columna, valor):
+        cv = self._catalogos[columna].get(normalizar(str(valor)))
+        if cv is None:
+            raise ValueError(f"{columna} desconocido '{valor}'")
+        return cv
+
+    # --- Progreso ---
+
+    @staticmethod
+    def _firma(ruta):
+        info = os.stat(ruta)
+        return {"archivo": os.path.abspath(ruta), "tamano": info.st_size, "modificado": info.st_mtime}
+
+    def _cargar_progreso(self, ruta, ruta_progreso):
+        estado = dict(self._firma(ruta), ultima_fila=0, insertadas=0, rechazadas=0, lotes=0)
+        try:
+            with open(ruta_progreso, encoding="utf-8") as archivo:
+                guardado = json.load(archivo)
+        except (OSError, ValueError):
+            return estado
+        # Si el archivo cambió desde la última vez, el avance guardado ya no aplica
+        if all(guardado.get(k) == estado[k] for k in ("archivo", "tamano", "modificado")):
+            estado.update(guardado)
+        return estado
+
+    @staticmethod
+    def _guardar_progreso(estado, ruta_progreso):
+        temporal = ruta_progreso + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump({k: v for k, v in estado.items() if k != "cancelado"}, archivo)
+        os.replace(temporal, ruta_progreso)
@@ -0,0 +1,257 @@
+"""
+Límite de intentos de login fallidos (lo usa LoginWindow). Para revisar que se
+comporta como se espera (desde PracticaC4_1/):
+
+    python -m db.limitadorLogin
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+# Detalles con los que LoginWindow registra una contraseña incorrecta y un login correcto;
+# son los únicos eventos que cuentan al reconstruir los contadores desde bitacora_accesos
+DETALLE_CREDENCIALES_INVALIDAS = "Intento fallido Credenciales invalidas"
+DETALLE_LOGIN_EXITOSO = "Login exitoso"
+
+
+class LimitadorLogin:
+    """
+    Limita los intentos de login fallidos por login y, si se pide, por IP con una
+    ventana deslizante, sin tocar la BD. Tras `libres` fallos cada intento debe
+    esperar el doble que el anterior (hasta `retraso_max`); al llegar al máximo de
+    fallos dentro de la ventana la clave queda bloqueada `bloqueo_seg`.
+    Un login correcto limpia el contador de ese login y le quita un fallo al de la IP.
+
+    El límite por IP viene apagado (max_fallos_ip=None): la IP que conoce la
+    aplicación es la del equipo donde corre, no la de cada persona, así que en una
+    recepción compartida un contador por IP bloquearía a todos por los errores de
+    unos cuantos. Sólo conviene activarlo si cada usuario entra desde su propio equipo.
+
+    Los contadores viven en memoria; con `ruta` además se guardan en un JSON
+    para sobrevivir a un reinicio, y `sembrar()` los reconstruye de la bitácora.
+    """
+
+    def __init__(self, ventana_seg=900, max_fallos_login=5, max_fallos_ip=None, bloqueo_seg=900,
+                 libres=2, retraso_base=1.0, retraso_max=30.0, ruta=None, max_claves=10000):
+        self.ventana_seg = ventana_seg
+        self.maximos = {"login": max_fallos_login, "ip": max_fallos_ip}
+        self.bloqueo_seg = bloqueo_seg
+        self.libres = libres
+        self.retraso_base = retraso_base
+        self.retraso_max = retraso_max
+        self.ruta = ruta
+        self.max_claves = max_claves
+        self._lock = threading.Lock()
+        self._fallos = {}  # "login:ana" / "ip:10.0.0.5" -> deque de instantes (time.time())
+        self._bloqueos = {}  # clave -> instante en que termina el bloqueo
+        self._rechazados = 0
+        self._cargado = False
+        if ruta:
+            self._cargar()
+
+    def _claves(self, login, ip):
+        # El Login usa collation sin distinción de mayúsculas: "Ana" y "ana" son la misma cuenta
+        claves = [("login", f"login:{(login or '').strip().lower()}")]
+        if ip and self.maximos["ip"] is not None:
+            claves.append(("ip", f"ip:{ip}"))
+        return claves
+
+    def espera(self, login, ip=None):
+        """Segundos que faltan para poder intentar (0 = se puede intentar ya)."""
+        ahora = time.time()
+        espera = 0.0
+        with self._lock:
+            for tipo, clave in self._claves(login, ip):
+                fallos = self._vigentes(clave, ahora)
+                bloqueo = self._bloqueos.get(clave, 0)
+                if bloqueo > ahora:
+                    espera = max(espera, bloqueo - ahora)
+                elif len(fallos) > self.libres:
+                    retraso = min(self.retraso_base * 2 ** (len(fallos) - self.libres - 1), self.retraso_max)
+                    espera = max(espera, fallos[-1] + retraso - ahora)
+            if espera > 0:
+                self._rechazados += 1
+        return max(espera, 0.0)
+
+    def registrar_fallo(self, login, ip=None):
+        """Cuenta un fallo; regresa True si con éste la cuenta o la IP quedaron bloqueadas."""
+        with self._lock:
+            bloqueo_nuevo = self._contar_fallo(login, ip, time.time())
+            self._guardar()
+        return bloqueo_nuevo
+
+    def registrar_exito(self, login, ip=None):
+        with self._lock:
+            if self._limpiar(login, ip):
+                self._guardar()
+
+    def sembrar(self, intentos):
+        """
+        Reconstruye los contadores con (usuario, ip, fecha_hora, exito) de la bitácora,
+        en orden cronológico (DatabaseManager.get_intentos_login), para que reiniciar
+        la aplicación no reinicie los contadores. Si ya se cargaron de `ruta` no hace
+        nada: los fallos de la bitácora ya están contados ahí.
+        """
+        with self._lock:
+            if self._cargado:
+                return
+            for usuario, ip, fecha_hora, exito in intentos or []:
+                if exito:
+                    self._limpiar(usuario, ip)
+                else:
+                    self._contar_fallo(usuario, ip, fecha_hora.timestamp())
+            self._guardar()
+
+    def estadisticas(self):
+        ahora = time.time()
+        with self._lock:
+            return {
+                "claves": len(self._fallos),
+                "bloqueadas": sum(1 for fin in self._bloqueos.values() if fin > ahora),
+                "rechazados": self._rechazados,
+            }
+
+    # --- Internos (con el lock tomado) ---
+
+    def _contar_fallo(self, login, ip, ahora):
+        bloqueo_nuevo = False
+        for tipo, clave in self._claves(login, ip):
+            fallos = self._vigentes(clave, ahora)
+            fallos.append(ahora)
+            self._fallos[clave] = fallos
+            if len(fallos) >= self.maximos[tipo] and self._bloqueos.get(clave, 0) <= ahora:
+                self._bloqueos[clave] = ahora + self.bloqueo_seg
+                bloqueo_nuevo = True
+        self._podar(ahora)
+        return bloqueo_nuevo
+
+    def _limpiar(self, login, ip=None):
+        """Borra el contador del login y le quita a la IP su fallo más reciente."""
+        claves = self._claves(login, ip)
+        clave = claves[0][1]
+        habia_fallos = self._fallos.pop(clave, None) is not None
+        habia_bloqueo = self._bloqueos.pop(clave, None) is not None
+        for _, clave_ip in claves[1:]:
+            fallos_ip = self._fallos.get(clave_ip)
+            if fallos_ip:
+                fallos_ip.pop()
+                habia_fallos = True
+        return habia_fallos or habia_bloqueo
+
+    def _vigentes(self, clave, ahora):
+        fallos = self._fallos.get(clave, deque())
+        while fallos and fallos[0] <= ahora - self.ventana_seg:
+            fallos.popleft()
+        return fallos
+
+    def _podar(self, ahora):
+        """Quita las claves sin fallos vigentes ni bloqueo; un ataque con logins al azar no debe crecer sin límite."""
+        if len(self._fallos) <= self.max_claves:
+            return
+        for clave in list(self._fallos):
+            if not self._vigentes(clave, ahora) and self._bloqueos.get(clave, 0) <= ahora:
+                del self._fallos[clave]
+                self._bloqueos.pop(clave, None)
+        # Si sigue lleno, se descartan las claves cuyo último fallo es más viejo
+        sobrantes = len(self._fallos) - self.max_claves
+        if sobrantes > 0:
+            for clave in sorted(self._fallos, key=lambda c: self._fallos[c][-1] if self._fallos[c] else 0)[:sobrantes]:
+                del self._fallos[clave]
+
+    def _guardar(self):
+        if not self.ruta:
+            return
+        ahora = time.time()
+        estado = {
+            "fallos": {c: list(f) for c, f in self._fallos.items() if f},
+            "bloqueos": {c: fin for c, fin in self._bloqueos.items() if fin > ahora},
+        }
+        temporal = self.ruta + ".tmp"
+        try:
+            with open(temporal, "w", encoding="utf-8") as archivo:
+                json.dump(estado, archivo)
+            os.replace(temporal, self.ruta)
+        except OSError as e:
+            logging.error(f"No se pudieron guardar los contadores de login en {self.ruta}: {e}")
+
+    def _cargar(self):
+        try:
+            with open(self.ruta, encoding="utf-8") as archivo:
+                estado = json.load(archivo)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning(f"Contadores de login ilegibles en {self.ruta}, se empieza de cero: {e}")
+            return
+        ahora = time.time()
+        for clave, instantes in estado.get("fallos", {}).items():
+            vigentes = deque(t for t in sorted(instantes) if t > ahora - self.ventana_seg)
+            if vigentes:
+                self._fallos[clave] = vigentes
+        self._bloqueos = {c: fin for c, fin in estado.get("bloqueos", {}).items() if fin > ahora}
+        self._cargado = True
+
+
+def comprobar():
+    """Escenarios que el limitador debe cumplir; regresa la lista de los que fallaron."""
+    errores = []
+    ip = "10.0.0.5"
+
+    # Recepción compartida: 20 personas distintas se equivocan desde el mismo equipo
+    limitador = LimitadorLogin()
+    for i in range(20):
+        limitador.registrar_fallo(f"usuario{i}", ip)
+    if limitador.espera("ana", ip) > 0:
+        errores.append("con el límite por IP apagado, otro login en la misma IP quedó bloqueado")
+
+    # Con el límite por IP activo, otros logins en la IP siguen entrando mientras no se llegue al máximo
+    limitador = LimitadorLogin(max_fallos_ip=20, libres=100)
+    for i in range(19):
+        limitador.registrar_fallo(f"usuario{i}", ip)
+    if limitador.espera("ana", ip) > 0:
+        errores.append("con 19 de 20 fallos en la IP, otro login quedó bloqueado")
+    limitador.registrar_exito("ana", ip)
+    if limitador.registrar_fallo("usuario19", ip):
+        errores.append("un login correcto no le quitó un fallo al contador de la IP")
+
+    # El login que se equivoca sí se bloquea, y sólo él
+    limitador = LimitadorLogin(bloqueo_seg=900)
+    for _ in range(5):
+        limitador.registrar_fallo("pepe", ip)
+    if limitador.espera("pepe", ip) < 800:
+        errores.append("5 fallos del mismo login no lo bloquearon")
+    if limitador.espera("ana", ip) > 0:
+        errores.append("el bloqueo de un login alcanzó a otro en la misma IP")
+    limitador.registrar_exito("pepe", ip)
+    if limitador.espera("pepe", ip) > 0:
+        errores.append("un login correcto no limpió el contador del login")
+
+    # Lo guardado en disco y la bitácora no reviven un bloqueo por IP apagado
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "contadores.json")
+        limitador = LimitadorLogin(max_fallos_ip=20, ruta=ruta)
+        for i in range(20):
+            limitador.registrar_fallo(f"usuario{i}", ip)
+        if LimitadorLogin(ruta=ruta).espera("ana", ip) > 0:
+            errores.append("los contadores guardados bloquearon por IP con el límite apagado")
+    return errores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Revisa el comportamiento del limitador de logins.")
+    parser.parse_args(argv)
+    errores = comprobar()
+    for error in errores:
+        print(f"ERROR: {error}")
+    print("El limitador se comporta como se espera." if not errores else f"{len(errores)} escenario(s) fallaron.")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Mide la latencia del login contra la BD configurada en .env. Compara el flujo
+actual (DatabaseManager.validar_usuario: una sola consulta que ya trae el estado
+de la cuenta evaluado por el servidor) con el anterior (la misma búsqueda
+trayendo EdoCta/FecIni/FecVen, el estado evaluado en Python y, si la cuenta
+venció, un UPDATE aparte con actualizar_estado_cuenta). Uso (desde PracticaC4_1/):
+
+    python -m db.medirLogin LOGIN PASSWORD -n 50
+
+Son logins reales: una cuenta vencida queda deshabilitada (con su renglón de
+bitácora) igual que si se intentara entrar desde la ventana. La verificación de la contraseña
+(scrypt) cuesta lo mismo en ambos flujos; se muestra aparte para restarla.
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+from datetime import date
+
+import pymysql
+
+from . import contrasenas
+from .databaseManager import DatabaseManager
+
+CONSULTA_ANTERIOR = """
+    SELECT
+        u.CvUser, u.EdoCta, u.FecIni, u.FecVen,
+        n.DsNombre, ap.DsApellid, am.DsApellid, p.DsPuesto, g.DsGenero,
+        u.Password
+    FROM
+        mUsuario u
+    JOIN mDtsPerson dp ON u.CvPerson = dp.CvPerson
+    JOIN cNombre n ON dp.CvNombre = n.CvNombre
+    JOIN cApellid ap ON dp.CvApePat = ap.CvApellid
+    JOIN cApellid am ON dp.CvApeMat = am.CvApellid
+    LEFT JOIN cPuesto p ON dp.CvPuesto = p.CvPuesto
+    LEFT JOIN cGenero g ON dp.CvGenero = g.CvGenero
+    WHERE
+        u.Login = %s AND BINARY u.Login = %s;
+"""
+
+
+def flujo_anterior(db_manager, login, password):
+    fila = db_manager._leer(CONSULTA_ANTERIOR, (login, login), uno=True)
+    if fila is None or not contrasenas.verificar(password, fila[-1])[0]:
+        return -1
+    cv_user, edocta, fecini, fecven = fila[:4]
+    hoy = date.today()
+    if hoy > fecven and edocta:
+        db_manager.actualizar_estado_cuenta(cv_user, False)
+    return fila[:-1], hoy < fecini
+
+
+def _medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return statistics.median(tiempos), tiempos[max(0, int(len(tiempos) * 0.95) - 1)]
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Compara la latencia del login actual contra el anterior.")
+    parser.add_argument("login")
+    parser.add_argument("password")
+    parser.add_argument("-n", "--repeticiones", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    db_manager = DatabaseManager(
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME'),
+        pool_max=1
+    )
+    try:
+        resultado = db_manager.validar_usuario(args.login, args.password)
+        if resultado is None:
+            print("ERROR: no se pudo consultar la base de datos.")
+            return 1
+        if resultado == -1:
+            print("ERROR: credenciales inválidas; se necesita un login real para medir.")
+            return 1
+        print(f"Estado de la cuenta según el servidor: {resultado[1]}")
+
+        flujos = [
+            ("anterior (fechas en Python)", lambda: flujo_anterior(db_manager, args.login, args.password)),
+            ("actual (estado en el servidor)", lambda: db_manager.validar_usuario(args.login, args.password)),
+        ]
+        print(f"{'flujo':<32}{'mediana ms':>12}{'p95 ms':>10}")
+        for nombre, funcion in flujos:
+            mediana, p95 = _medir(funcion, args.repeticiones)
+            print(f"{nombre:<32}{mediana:>12.2f}{p95:>10.2f}")
+        print(f"{'  de eso, scrypt':<32}{contrasenas.medir(contrasenas.costo_configurado()):>12.2f}")
+        return 0
+    except (pymysql.Error, ValueError) as e:
+        print(f"ERROR: {e}")
+        logging.error(f"Medición de login fallida: {e}")
+        return 1
+    finally:
+        db_manager.cerrar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+-- -----------------------------------------------------
+-- V001: Índices para las búsquedas frecuentes de DatabaseManager
+-- Aplica sobre una base creada con una versión anterior de bdPracticaC4_1.sql.
+-- Se puede ejecutar más de una vez (IF NOT EXISTS). Se aplica con:
+--   python -m db.migrador
+-- Después de aplicarla:  python -m db.verificarIndices
+-- -----------------------------------------------------
+
+-- Login es único bajo la collation de la tabla (utf8_general_ci): 'Alan' y 'alan'
+-- se consideran el mismo, igual que en check_login_exists. Si este índice falla
+-- por duplicados, revíselos antes con:
+--   SELECT Login, COUNT(*) FROM mUsuario GROUP BY Login HAVING COUNT(*) > 1;
+CREATE UNIQUE INDEX IF NOT EXISTS `uq_mUsuario_Login` ON `mUsuario` (`Login`);
+
+-- verificar_password_existente busca por Password
+CREATE INDEX IF NOT EXISTS `idx_mUsuario_Password` ON `mUsuario` (`Password`);
+
+-- Resolución de nombres y apellidos (ResolutorNombres)
+--   SELECT DsNombre, COUNT(*) FROM cNombre GROUP BY DsNombre HAVING COUNT(*) > 1;
+CREATE UNIQUE INDEX IF NOT EXISTS `uq_cNombre_DsNombre` ON `cNombre` (`DsNombre`);
+CREATE UNIQUE INDEX IF NOT EXISTS `uq_cApellid_DsApellid` ON `cApellid` (`DsApellid`);
+
+-- Paginación de la tabla de pagos (get_pagos_pagina). fCobro crece todo el año:
+-- el índice se construye en línea, sin bloquear los cobros que se registren mientras tanto.
+CREATE INDEX IF NOT EXISTS `idx_fCobro_fecha` ON `fCobro` (`FechaCobro` DESC, `CvCobro` DESC)
+  ALGORITHM=INPLACE LOCK=NONE;
+CREATE INDEX IF NOT EXISTS `idx_fCobro_usuario_fecha` ON `fCobro` (`CvUsuario`, `FechaCobro` DESC, `CvCobro` DESC)
+  ALGORITHM=INPLACE LOCK=NONE;
@@ -0,0 +1,10 @@
+-- -----------------------------------------------------
+-- V002: Columna `direccion_ip` en bitacora_accesos
+-- registrar_acceso la llena desde el principio, pero bdPracticaC4_1.sql no la creaba.
+-- Al final de la tabla y nullable para que MariaDB la agregue sin copiar la tabla
+-- (ALGORITHM=INPLACE permite también INSTANT); LOCK=NONE deja seguir escribiendo.
+-- -----------------------------------------------------
+
+ALTER TABLE `bitacora_accesos`
+  ADD COLUMN IF NOT EXISTS `direccion_ip` VARCHAR(45) NULL,
+  ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,16 @@
+-- -----------------------------------------------------
+-- V003: Tabla `mErrores`
+-- registrar_error escribe en ella, pero bdPracticaC4_1.sql no la creaba.
+-- -----------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS `mErrores` (
+  `id_error` INT NOT NULL AUTO_INCREMENT,
+  `mensaje_error` TEXT NOT NULL,
+  `modulo` VARCHAR(100) NOT NULL,
+  `fecha_hora` DATETIME NOT NULL,
+  `usuario_activo` VARCHAR(100) NOT NULL,
+  `direccion_ip` VARCHAR(45) NULL,
+  PRIMARY KEY (`id_error`),
+  INDEX `idx_mErrores_fecha` (`fecha_hora` ASC)
+) ENGINE = InnoDB
+COMMENT = 'Errores de la aplicación (DatabaseManager.registrar_error).';
@@ -0,0 +1,83 @@
+"""
+V004: bitacora_accesos particionada por mes sobre fecha_hora.
+
+Convertir la tabla con ALTER ... PARTITION BY la copiaría completa bloqueando
+las escrituras. En su lugar se crea la tabla nueva ya particionada, se copia
+por bloques de id_acceso, se intercambian los nombres con un RENAME atómico y
+se copian las filas que llegaron durante el proceso. La tabla original queda
+como bitacora_accesos_previa para borrarla a mano cuando se haya revisado.
+"""
+from datetime import date
+
+from db.retencionBitacora import TABLA, definiciones_mensuales, sumar_meses
+
+TAM_BLOQUE = 10000
+COLUMNAS = "id_acceso, usuario_intento, fecha_hora, exito, detalle_evento, direccion_ip"
+
+
+def _ya_particionada(cursor):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL", (TABLA,))
+    return cursor.fetchone()[0] > 0
+
+
+def _sql_tabla_nueva(desde, hasta, auto_increment):
+    particiones = ",\n  ".join(definiciones_mensuales(desde, hasta))
+    # La PK debe incluir la columna de partición
+    return f"""
+CREATE TABLE {TABLA}_nueva (
+  id_acceso INT NOT NULL AUTO_INCREMENT,
+  usuario_intento VARCHAR(100) NOT NULL,
+  fecha_hora DATETIME NOT NULL,
+  exito BOOLEAN NOT NULL,
+  detalle_evento VARCHAR(255) NOT NULL,
+  direccion_ip VARCHAR(45) NULL,
+  PRIMARY KEY (id_acceso, fecha_hora),
+  INDEX idx_bitacora_fecha (fecha_hora),
+  INDEX idx_bitacora_usuario_fecha (usuario_intento, fecha_hora)
+) ENGINE = InnoDB AUTO_INCREMENT = {auto_increment}
+PARTITION BY RANGE COLUMNS (fecha_hora) (
+  {particiones}
+)"""
+
+
+def _copiar_desde(cursor, origen, destino, ultimo_id):
+    """Copia por bloques las filas con id mayor a `ultimo_id`; regresa el último id copiado."""
+    while True:
+        cursor.execute(f"SELECT MAX(id_acceso) FROM (SELECT id_acceso FROM {origen} WHERE id_acceso > %s "
+                       f"ORDER BY id_acceso LIMIT {TAM_BLOQUE}) AS bloque", (ultimo_id,))
+        hasta = cursor.fetchone()[0]
+        if hasta is None:
+            return ultimo_id
+        cursor.execute(f"INSERT IGNORE INTO {destino} ({COLUMNAS}) SELECT {COLUMNAS} FROM {origen} "
+                       f"WHERE id_acceso > %s AND id_acceso <= %s", (ultimo_id, hasta))
+        ultimo_id = hasta
+
+
+def describir():
+    return __doc__.strip()
+
+
+def aplicar(conexion):
+    with conexion.cursor() as cursor:
+        if _ya_particionada(cursor):
+            print(f"  {TABLA} ya está particionada.")
+            return
+
+        cursor.execute(f"SELECT MIN(fecha_hora), COALESCE(MAX(id_acceso), 0) FROM {TABLA}")
+        mas_antigua, max_id = cursor.fetchone()
+        desde = (mas_antigua.date() if mas_antigua else date.today())
+        hasta = sumar_meses(date.today(), 3)
+
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLA}_nueva")
+        # Holgura en el AUTO_INCREMENT para que lo que llegue durante la copia no choque
+        cursor.execute(_sql_tabla_nueva(desde, hasta, max_id + 100000))
+
+        ultimo = _copiar_desde(cursor, TABLA, f"{TABLA}_nueva", 0)
+        cursor.execute(f"RENAME TABLE {TABLA} TO {TABLA}_previa, {TABLA}_nueva TO {TABLA}")
+        # Lo que se escribió entre el último bloque y el RENAME
+        _copiar_desde(cursor, f"{TABLA}_previa", TABLA, ultimo)
+    conexion.commit()
+    print(f"  La tabla original quedó como {TABLA}_previa; bórrela cuando haya revisado la nueva.")
+    print("  Programe python -m db.retencionBitacora una vez al mes para crear y retirar particiones.")
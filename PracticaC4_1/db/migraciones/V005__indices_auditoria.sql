@@ -0,0 +1,11 @@
+-- -----------------------------------------------------
+-- V005: Índices para los filtros del módulo de Auditoría
+-- (DatabaseManager.buscar_bitacora / get_resumen_bitacora / get_histograma_bitacora).
+-- Cada filtro va con fecha_hora al final para que el rango de fechas se resuelva
+-- dentro del mismo índice; el de usuario (idx_bitacora_usuario_fecha) lo creó V004.
+-- -----------------------------------------------------
+
+CREATE INDEX IF NOT EXISTS `idx_bitacora_ip_fecha` ON `bitacora_accesos` (`direccion_ip`, `fecha_hora`)
+  ALGORITHM=INPLACE LOCK=NONE;
+CREATE INDEX IF NOT EXISTS `idx_bitacora_exito_fecha` ON `bitacora_accesos` (`exito`, `fecha_hora`)
+  ALGORITHM=INPLACE LOCK=NONE;
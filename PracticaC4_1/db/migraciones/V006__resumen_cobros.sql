@@ -0,0 +1,41 @@
+-- -----------------------------------------------------
+-- V006: Resumen de cobros por alumno y por mes.
+-- DatabaseManager lo actualiza junto con cada alta, cambio o baja en fCobro.
+-- Para revisarlo o reconstruirlo:  python -m db.resumenCobros [--reparar | --reconstruir]
+-- -----------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS `fResumenCobro` (
+  `CvUsuario` INT NOT NULL,
+  `Periodo` DATE NOT NULL COMMENT 'Primer día del mes.',
+  `Cobros` INT NOT NULL DEFAULT 0,
+  `Facturado` DECIMAL(12,2) NOT NULL DEFAULT 0,
+  `Descuento` DECIMAL(12,2) NOT NULL DEFAULT 0,
+  `Pagado` DECIMAL(12,2) NOT NULL DEFAULT 0,
+  `Pendiente` DECIMAL(12,2) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`CvUsuario`, `Periodo`),
+  INDEX `idx_fResumenCobro_periodo` (`Periodo`),
+  CONSTRAINT `fk_fResumenCobro_mUsuario`
+    FOREIGN KEY (`CvUsuario`)
+    REFERENCES `mUsuario` (`CvUser`)
+    ON DELETE CASCADE
+    ON UPDATE CASCADE
+) ENGINE = InnoDB
+COMMENT = 'Totales de fCobro por alumno y mes (neto = Monto - Descuento).';
+
+-- Carga inicial desde los cobros existentes; si se vuelve a correr, reemplaza los totales
+INSERT INTO `fResumenCobro` (CvUsuario, Periodo, Cobros, Facturado, Descuento, Pagado, Pendiente)
+SELECT f.CvUsuario,
+       DATE_SUB(f.FechaCobro, INTERVAL DAYOFMONTH(f.FechaCobro) - 1 DAY),
+       COUNT(*),
+       SUM(f.Monto),
+       SUM(COALESCE(f.Descuento, 0)),
+       SUM(IF(f.Estado = 'Pagado', f.Monto - COALESCE(f.Descuento, 0), 0)),
+       SUM(IF(f.Estado = 'Pagado', 0, f.Monto - COALESCE(f.Descuento, 0)))
+FROM fCobro f
+GROUP BY f.CvUsuario, DATE_SUB(f.FechaCobro, INTERVAL DAYOFMONTH(f.FechaCobro) - 1 DAY)
+ON DUPLICATE KEY UPDATE
+  fResumenCobro.Cobros = VALUES(Cobros),
+  fResumenCobro.Facturado = VALUES(Facturado),
+  fResumenCobro.Descuento = VALUES(Descuento),
+  fResumenCobro.Pagado = VALUES(Pagado),
+  fResumenCobro.Pendiente = VALUES(Pendiente);
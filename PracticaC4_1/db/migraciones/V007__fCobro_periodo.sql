@@ -0,0 +1,14 @@
+-- -----------------------------------------------------
+-- V007: Periodo facturado en fCobro (db/facturacion.py)
+-- Los cobros que genera la facturación mensual llevan el mes al que
+-- corresponden; la llave única impide facturar dos veces el mismo mes aunque
+-- dos sesiones la corran a la vez. Los cobros capturados a mano quedan con
+-- Periodo NULL, que no choca con la llave.
+-- -----------------------------------------------------
+
+ALTER TABLE `fCobro`
+  ADD COLUMN IF NOT EXISTS `Periodo` DATE NULL COMMENT 'Mes facturado (día 1); sólo cobros generados.',
+  ALGORITHM=INPLACE, LOCK=NONE;
+
+CREATE UNIQUE INDEX IF NOT EXISTS `uq_fCobro_usuario_tipo_periodo` ON `fCobro` (`CvUsuario`, `Tipo`, `Periodo`)
+  ALGORITHM=INPLACE LOCK=NONE;
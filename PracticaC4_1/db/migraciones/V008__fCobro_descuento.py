@@ -0,0 +1,63 @@
+"""
+V008: Descuento aplicado en fCobro.
+
+El cobro guarda la entrada de cDescuentos que se le aplicó, además del importe.
+Antes había que deducirla de ROUND(Descuento / Monto, 2), que no distingue dos
+descuentos con el mismo porcentaje y falla con redondeos.
+
+La columna, el índice y la llave foránea se agregan en línea (INPLACE, LOCK=NONE).
+Los cobros existentes se llenan por bloques de CvCobro confirmando cada bloque,
+para no tener bloqueado todo el historial de fCobro durante un solo UPDATE.
+"""
+TAM_BLOQUE = 5000
+
+# Cobros existentes: la entrada con ese porcentaje (la de menor clave si hay varias);
+# los que no coinciden con ninguna se quedan en NULL
+SENTENCIA_RELLENAR = """
+UPDATE fCobro f
+JOIN (SELECT Porcentaje, MIN(CvDescuento) AS CvDescuento FROM cDescuentos GROUP BY Porcentaje) AS d
+  ON f.Monto > 0 AND ROUND(COALESCE(f.Descuento, 0) / f.Monto, 2) = d.Porcentaje
+SET f.CvDescuento = d.CvDescuento
+WHERE f.CvDescuento IS NULL AND f.CvCobro > %s AND f.CvCobro <= %s
+"""
+
+
+def _rellenar(cursor, conexion):
+    """Copia por bloques de CvCobro; regresa cuántos cobros quedaron con CvDescuento."""
+    cursor.execute("SELECT COALESCE(MAX(CvCobro), 0) FROM fCobro")
+    maximo = cursor.fetchone()[0]
+    cambiados = 0
+    for desde in range(0, maximo, TAM_BLOQUE):
+        cursor.execute(SENTENCIA_RELLENAR, (desde, desde + TAM_BLOQUE))
+        cambiados += cursor.rowcount
+        # Un bloque por transacción: los candados duran lo que tarda un bloque, no la tabla entera
+        conexion.commit()
+    return cambiados
+
+
+def describir():
+    return __doc__.strip()
+
+
+def aplicar(conexion):
+    with conexion.cursor() as cursor:
+        cursor.execute("ALTER TABLE fCobro "
+                       "ADD COLUMN IF NOT EXISTS CvDescuento INT NULL "
+                       "COMMENT 'Entrada de cDescuentos aplicada (NULL si no hay).', "
+                       "ALGORITHM=INPLACE, LOCK=NONE")
+        cursor.execute("CREATE INDEX IF NOT EXISTS fk_fCobro_cDescuentos_idx ON fCobro (CvDescuento) "
+                       "ALGORITHM=INPLACE LOCK=NONE")
+
+        print(f"  {_rellenar(cursor, conexion)} cobros asociados a su entrada de cDescuentos.")
+
+        # Con las revisiones de llaves foráneas apagadas el FK se agrega en línea (sin copiar la
+        # tabla); los valores ya son claves de cDescuentos porque salen del relleno anterior
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        try:
+            cursor.execute("ALTER TABLE fCobro "
+                           "ADD CONSTRAINT fk_fCobro_cDescuentos FOREIGN KEY IF NOT EXISTS (CvDescuento) "
+                           "REFERENCES cDescuentos (CvDescuento) ON DELETE SET NULL ON UPDATE CASCADE, "
+                           "ALGORITHM=INPLACE, LOCK=NONE")
+        finally:
+            cursor.execute("SET SESSION foreign_key_checks = 1")
+    conexion.commit()
@@ -0,0 +1,8 @@
+-- -----------------------------------------------------
+-- V009: Las contraseñas se guardan como hash scrypt (db/contrasenas.py) y el
+-- login se busca sólo por uq_mUsuario_Login; ya nadie busca por Password, así
+-- que el índice de V001 sólo encarecía cada cambio de contraseña.
+-- Las filas en texto plano se cifran solas al iniciar sesión.
+-- -----------------------------------------------------
+
+DROP INDEX IF EXISTS `idx_mUsuario_Password` ON `mUsuario` ALGORITHM=INPLACE LOCK=NONE;
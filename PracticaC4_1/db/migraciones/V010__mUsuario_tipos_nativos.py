@@ -0,0 +1,112 @@
+"""
+V010: mUsuario.FecIni/FecVen pasan de VARCHAR(30) a DATE y EdoCta de 'True'/'False'
+a TINYINT(1), con el índice (EdoCta, FecVen) para db/desactivarVencidas.py.
+
+Sin reescribir la tabla de golpe: se agregan columnas nuevas (FecIni_d, FecVen_d,
+EdoCta_b) con triggers que las mantienen al día en cada INSERT/UPDATE, se llenan
+por bloques de CvUser confirmando cada bloque y una segunda pasada revisa que no
+haya quedado nada atrás. El paso final corre con mUsuario bloqueada para
+escritura (LOCK TABLES ... WRITE): se quitan los triggers, una última pasada
+alcanza lo que se escribió mientras tanto y un solo ALTER quita las columnas de
+texto y renombra las nuevas, así nunca hay un trigger apuntando a columnas que
+ya no existen. El candado dura lo que tardan esa pasada y el ALTER. Si alguna
+fecha no se puede interpretar la migración se detiene antes de tocar las
+originales; al volver a migrar los triggers se crean de nuevo.
+"""
+TAM_BLOQUE = 5000
+FORMATO_FECHA = "%Y-%m-%d"
+
+VALORES_NUEVOS = ("FecIni_d = STR_TO_DATE(FecIni, %s), FecVen_d = STR_TO_DATE(FecVen, %s), "
+                  "EdoCta_b = (EdoCta = 'True')")
+
+# Mantienen las columnas nuevas al día mientras la aplicación sigue escribiendo las de texto
+TRIGGERS = {
+    "trg_mUsuario_tipos_ins": "BEFORE INSERT",
+    "trg_mUsuario_tipos_upd": "BEFORE UPDATE",
+}
+
+# Filas cuyas columnas nuevas no coinciden con las de texto (nuevas o modificadas durante el respaldo)
+DESACTUALIZADAS = ("NOT (FecIni_d <=> STR_TO_DATE(FecIni, %s) AND FecVen_d <=> STR_TO_DATE(FecVen, %s) "
+                   "AND EdoCta_b <=> (EdoCta = 'True'))")
+
+
+def _tipo_columna(cursor, columna):
+    cursor.execute("SELECT DATA_TYPE FROM information_schema.COLUMNS "
+                   "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'mUsuario' AND COLUMN_NAME = %s", (columna,))
+    fila = cursor.fetchone()
+    return fila[0].lower() if fila else None
+
+
+def _rellenar(cursor, conexion, solo_desactualizadas=False):
+    """Copia por bloques de CvUser; regresa cuántas filas cambió."""
+    condicion = f" AND {DESACTUALIZADAS}" if solo_desactualizadas else ""
+    extra = (FORMATO_FECHA, FORMATO_FECHA) if solo_desactualizadas else ()
+    cursor.execute("SELECT COALESCE(MAX(CvUser), 0) FROM mUsuario")
+    maximo = cursor.fetchone()[0]
+    cambiadas = 0
+    for desde in range(0, maximo, TAM_BLOQUE):
+        cursor.execute(f"UPDATE mUsuario SET {VALORES_NUEVOS} WHERE CvUser > %s AND CvUser <= %s{condicion}",
+                       (FORMATO_FECHA, FORMATO_FECHA, desde, desde + TAM_BLOQUE) + extra)
+        cambiadas += cursor.rowcount
+        # Un bloque por transacción: los candados duran lo que tarda un bloque, no la tabla entera
+        conexion.commit()
+    return cambiadas
+
+
+def _revisar_fechas(cursor):
+    cursor.execute("SELECT CvUser, FecIni, FecVen FROM mUsuario "
+                   "WHERE FecIni_d IS NULL OR FecVen_d IS NULL ORDER BY CvUser LIMIT 20")
+    invalidas = cursor.fetchall()
+    if invalidas:
+        detalle = ", ".join(f"CvUser {cv} ('{ini}', '{ven}')" for cv, ini, ven in invalidas)
+        raise ValueError(f"fechas que no son AAAA-MM-DD, corríjalas y vuelva a migrar: {detalle}")
+
+
+def describir():
+    return __doc__.strip()
+
+
+def aplicar(conexion):
+    with conexion.cursor() as cursor:
+        if _tipo_columna(cursor, "FecVen") == "date":
+            # Por si quedaron triggers de una versión anterior de esta migración
+            for nombre in TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+            print("  mUsuario ya tiene FecIni/FecVen como DATE.")
+            return
+
+        cursor.execute("ALTER TABLE mUsuario "
+                       "ADD COLUMN IF NOT EXISTS FecIni_d DATE NULL, "
+                       "ADD COLUMN IF NOT EXISTS FecVen_d DATE NULL, "
+                       "ADD COLUMN IF NOT EXISTS EdoCta_b TINYINT(1) NULL, "
+                       "ALGORITHM=INPLACE, LOCK=NONE")
+        for nombre, momento in TRIGGERS.items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+            cursor.execute(f"CREATE TRIGGER {nombre} {momento} ON mUsuario FOR EACH ROW SET "
+                           f"NEW.FecIni_d = STR_TO_DATE(NEW.FecIni, '{FORMATO_FECHA}'), "
+                           f"NEW.FecVen_d = STR_TO_DATE(NEW.FecVen, '{FORMATO_FECHA}'), "
+                           f"NEW.EdoCta_b = (NEW.EdoCta = 'True')")
+
+        print(f"  {_rellenar(cursor, conexion)} usuarios copiados a las columnas nuevas.")
+        print(f"  {_rellenar(cursor, conexion, solo_desactualizadas=True)} usuarios corregidos en la segunda pasada.")
+
+        _revisar_fechas(cursor)
+
+        # Sin escrituras entre quitar los triggers y renombrar: lo que llegue espera al UNLOCK
+        cursor.execute("LOCK TABLES mUsuario WRITE")
+        try:
+            for nombre in TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+            print(f"  {_rellenar(cursor, conexion, solo_desactualizadas=True)} usuarios corregidos con la tabla bloqueada.")
+            _revisar_fechas(cursor)
+            cursor.execute("ALTER TABLE mUsuario "
+                           "DROP COLUMN FecIni, DROP COLUMN FecVen, DROP COLUMN EdoCta, "
+                           "CHANGE COLUMN FecIni_d FecIni DATE NOT NULL, "
+                           "CHANGE COLUMN FecVen_d FecVen DATE NOT NULL, "
+                           "CHANGE COLUMN EdoCta_b EdoCta TINYINT(1) NOT NULL DEFAULT 1, "
+                           "ADD INDEX idx_mUsuario_EdoCta_FecVen (EdoCta, FecVen), "
+                           "ALGORITHM=INPLACE, LOCK=SHARED")
+        finally:
+            cursor.execute("UNLOCK TABLES")
+    conexion.commit()
+    print("  Programe python -m db.desactivarVencidas una vez al día (p. ej. a las 00:05).")
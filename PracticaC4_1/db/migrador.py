@@ -0,0 +1,311 @@
+"""
+Aplica en orden las migraciones de db/migraciones/ y lleva el registro en la
+tabla `schema_version`. Uso (desde PracticaC4_1/):
+
+    python -m db.migrador              aplica las pendientes
+    python -m db.migrador --dry-run    sólo muestra lo que haría
+    python -m db.migrador --estado     lista aplicadas y pendientes
+
+Archivos: V<número>__<descripción>.sql (sentencias separadas por ';', admite
+DELIMITER) o .py con una función `aplicar(conexion)` y opcionalmente
+`describir()` para el dry-run.
+"""
+import argparse
+import hashlib
+import importlib.util
+import logging
+import os
+import re
+import sys
+import time
+
+import pymysql
+
+DIRECTORIO_MIGRACIONES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migraciones")
+_PATRON_ARCHIVO = re.compile(r"^V(\d+)__(.+)\.(sql|py)$")
+
+# Tablas grandes: un ALTER sobre ellas sin LOCK=NONE dejaría en espera cobros y bitácora
+TABLAS_EN_LINEA = ("fCobro", "bitacora_accesos")
+
+# Error 1205 (lock wait timeout): otra sesión tiene la tabla; se reintenta en vez de hacer fila
+ERROR_ESPERA_CANDADO = 1205
+
+SQL_TABLA_VERSIONES = """
+CREATE TABLE IF NOT EXISTS schema_version (
+  version INT NOT NULL,
+  descripcion VARCHAR(200) NOT NULL,
+  checksum CHAR(64) NOT NULL,
+  aplicada_en DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  duracion_ms INT NOT NULL,
+  PRIMARY KEY (version)
+) ENGINE = InnoDB
+"""
+
+
+class ErrorMigracion(Exception):
+    """Checksum alterado, archivo mal formado o sentencia que falló."""
+
+
+class Migracion:
+    def __init__(self, ruta):
+        nombre = os.path.basename(ruta)
+        coincidencia = _PATRON_ARCHIVO.match(nombre)
+        if not coincidencia:
+            raise ErrorMigracion(f"Nombre de migración inválido: {nombre}")
+        self.ruta = ruta
+        self.nombre = nombre
+        self.version = int(coincidencia.group(1))
+        self.descripcion = coincidencia.group(2).replace("_", " ")
+        self.tipo = coincidencia.group(3)
+        with open(ruta, "rb") as archivo:
+            self.contenido = archivo.read()
+        self.checksum = hashlib.sha256(self.contenido).hexdigest()
+
+    def sentencias(self):
+        return dividir_sentencias(self.contenido.decode("utf-8"))
+
+    def modulo(self):
+        spec = importlib.util.spec_from_file_location(f"migracion_v{self.version:03d}", self.ruta)
+        modulo = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modulo)
+        if not hasattr(modulo, "aplicar"):
+            raise ErrorMigracion(f"{self.nombre} no define aplicar(conexion).")
+        return modulo
+
+
+def dividir_sentencias(texto):
+    """
+    Separa un script SQL en sentencias respetando comillas, comentarios y la
+    directiva DELIMITER del cliente mysql (para procedimientos y triggers).
+    """
+    sentencias = []
+    delimitador = ";"
+    actual = []
+    i = 0
+    n = len(texto)
+    inicio_linea = True
+    while i < n:
+        if inicio_linea:
+            fin = texto.find("\n", i)
+            linea = texto[i:] if fin == -1 else texto[i:fin]
+            if linea.strip().upper().startswith("DELIMITER ") and not "".join(actual).strip():
+                delimitador = linea.strip().split(None, 1)[1]
+                i = n if fin == -1 else fin + 1
+                continue
+        c = texto[i]
+        inicio_linea = False
+        if c in ("'", '"', "`"):
+            j = i + 1
+            while j < n:
+                if texto[j] == "\\" and c != "`":
+                    j += 2
+                    continue
+                if texto[j] == c:
+                    if j + 1 < n and texto[j + 1] == c:
+                        j += 2
+                        continue
+                    break
+                j += 1
+            actual.append(texto[i:j + 1])
+            i = j + 1
+        elif texto.startswith("--", i) or c == "#":
+            fin = texto.find("\n", i)
+            i = n if fin == -1 else fin
+        elif texto.startswith("/*", i):
+            fin = texto.find("*/", i + 2)
+            i = n if fin == -1 else fin + 2
+        elif texto.startswith(delimitador, i):
+            sentencia = "".join(actual).strip()
+            if sentencia:
+                sentencias.append(sentencia)
+            actual = []
+            i += len(delimitador)
+        else:
+            actual.append(c)
+            if c == "\n":
+                inicio_linea = True
+            i += 1
+    sentencia = "".join(actual).strip()
+    if sentencia:
+        sentencias.append(sentencia)
+    return sentencias
+
+
+def advertencias_en_linea(sentencia):
+    """Avisa si un ALTER/CREATE INDEX sobre una tabla grande no pide LOCK=NONE."""
+    texto = " ".join(sentencia.split()).upper()
+    if not (texto.startswith("ALTER TABLE") or texto.startswith("CREATE INDEX")
+            or texto.startswith("CREATE UNIQUE INDEX")):
+        return []
+    tablas = [t for t in TABLAS_EN_LINEA if re.search(rf"\b`?{t.upper()}`?\b", texto)]
+    if tablas and "LOCK=NONE" not in texto.replace(" = ", "=").replace(" ", ""):
+        return [f"sentencia sobre {', '.join(tablas)} sin LOCK=NONE: puede bloquear escrituras mientras corre"]
+    return []
+
+
+class Migrador:
+    def __init__(self, conexion, directorio=DIRECTORIO_MIGRACIONES, lock_wait_timeout=5, reintentos=5):
+        self.conexion = conexion
+        self.directorio = directorio
+        # Cuánto espera un ALTER por el candado de metadatos antes de rendirse (y reintentar).
+        # Mientras espera, las consultas nuevas sobre la tabla se forman detrás de él.
+        self.lock_wait_timeout = lock_wait_timeout
+        self.reintentos = reintentos
+
+    def migraciones(self):
+        nombres = sorted(n for n in os.listdir(self.directorio) if _PATRON_ARCHIVO.match(n))
+        migraciones = [Migracion(os.path.join(self.directorio, n)) for n in nombres]
+        migraciones.sort(key=lambda m: m.version)
+        versiones = [m.version for m in migraciones]
+        repetidas = {v for v in versiones if versiones.count(v) > 1}
+        if repetidas:
+            raise ErrorMigracion(f"Versiones repetidas en {self.directorio}: {sorted(repetidas)}")
+        return migraciones
+
+    def aplicadas(self):
+        with self.conexion.cursor() as cursor:
+            cursor.execute(SQL_TABLA_VERSIONES)
+            cursor.execute("SELECT version, checksum FROM schema_version")
+            return dict(cursor.fetchall())
+
+    def pendientes(self):
+        """Migraciones por aplicar; falla si una ya aplicada cambió desde entonces."""
+        aplicadas = self.aplicadas()
+        pendientes = []
+        for migracion in self.migraciones():
+            checksum = aplicadas.get(migracion.version)
+            if checksum is None:
+                pendientes.append(migracion)
+            elif checksum != migracion.checksum:
+                raise ErrorMigracion(
+                    f"{migracion.nombre} cambió después de aplicarse (checksum distinto). "
+                    f"Las migraciones aplicadas no se editan: cree una nueva."
+                )
+        return pendientes
+
+    def migrar(self, dry_run=False, hasta=None):
+        pendientes = [m for m in self.pendientes() if hasta is None or m.version <= hasta]
+        if not pendientes:
+            print("La base de datos está al día.")
+            return []
+
+        if dry_run:
+            for migracion in pendientes:
+                self._mostrar(migracion)
+            return pendientes
+
+        if not self._tomar_candado():
+            raise ErrorMigracion("Otro proceso está aplicando migraciones en este momento.")
+        try:
+            with self.conexion.cursor() as cursor:
+                cursor.execute("SET SESSION lock_wait_timeout = %s", (self.lock_wait_timeout,))
+                cursor.execute("SET SESSION innodb_lock_wait_timeout = %s", (self.lock_wait_timeout,))
+            for migracion in pendientes:
+                self._aplicar(migracion)
+        finally:
+            self._soltar_candado()
+        return pendientes
+
+    # --- Internos ---
+
+    def _mostrar(self, migracion):
+        print(f"-- V{migracion.version:03d} {migracion.descripcion} ({migracion.nombre})")
+        if migracion.tipo == "sql":
+            for sentencia in migracion.sentencias():
+                print(sentencia + ";")
+                for aviso in advertencias_en_linea(sentencia):
+                    print(f"--   AVISO: {aviso}")
+        else:
+            modulo = migracion.modulo()
+            describir = getattr(modulo, "describir", None)
+            print(describir() if describir else (modulo.__doc__ or "(migración en Python)").strip())
+        print()
+
+    def _aplicar(self, migracion):
+        print(f"Aplicando V{migracion.version:03d} {migracion.descripcion}...")
+        inicio = time.monotonic()
+        if migracion.tipo == "sql":
+            for sentencia in migracion.sentencias():
+                for aviso in advertencias_en_linea(sentencia):
+                    logging.warning(f"{migracion.nombre}: {aviso}")
+                self._ejecutar(migracion, sentencia)
+        else:
+            try:
+                migracion.modulo().aplicar(self.conexion)
+            except (pymysql.Error, ValueError) as e:
+                # ValueError: datos que la migración no puede convertir
+                raise ErrorMigracion(f"{migracion.nombre} falló: {e}") from e
+        duracion_ms = int((time.monotonic() - inicio) * 1000)
+        with self.conexion.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO schema_version (version, descripcion, checksum, duracion_ms) VALUES (%s, %s, %s, %s)",
+                (migracion.version, migracion.descripcion, migracion.checksum, duracion_ms)
+            )
+        self.conexion.commit()
+        print(f"  listo en {duracion_ms} ms")
+
+    def _ejecutar(self, migracion, sentencia):
+        for intento in range(1, self.reintentos + 1):
+            try:
+                with self.conexion.cursor() as cursor:
+                    cursor.execute(sentencia)
+                self.conexion.commit()
+                return
+            except pymysql.err.OperationalError as e:
+                if e.args[0] != ERROR_ESPERA_CANDADO or intento == self.reintentos:
+                    raise ErrorMigracion(f"{migracion.nombre} falló en:\n{sentencia}\n{e}") from e
+                espera = min(2 ** intento, 30)
+                print(f"  tabla ocupada, reintento {intento} en {espera}s...")
+                time.sleep(espera)
+            except pymysql.Error as e:
+                raise ErrorMigracion(f"{migracion.nombre} falló en:\n{sentencia}\n{e}") from e
+
+    def _tomar_candado(self):
+        with self.conexion.cursor() as cursor:
+            cursor.execute("SELECT GET_LOCK(CONCAT(DATABASE(), '.migraciones'), 0)")
+            return cursor.fetchone()[0] == 1
+
+    def _soltar_candado(self):
+        with self.conexion.cursor() as cursor:
+            cursor.execute("SELECT RELEASE_LOCK(CONCAT(DATABASE(), '.migraciones'))")
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Aplica las migraciones de esquema pendientes.")
+    parser.add_argument("--dry-run", action="store_true", help="muestra las sentencias sin ejecutarlas")
+    parser.add_argument("--estado", action="store_true", help="lista migraciones aplicadas y pendientes")
+    parser.add_argument("--hasta", type=int, help="aplica sólo hasta esta versión")
+    parser.add_argument("--lock-wait-timeout", type=int, default=5,
+                        help="segundos que un ALTER espera el candado de la tabla antes de reintentar")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    conexion = pymysql.connect(
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME'),
+        autocommit=True
+    )
+    try:
+        migrador = Migrador(conexion, lock_wait_timeout=args.lock_wait_timeout)
+        if args.estado:
+            aplicadas = migrador.aplicadas()
+            for migracion in migrador.migraciones():
+                marca = "aplicada " if migracion.version in aplicadas else "pendiente"
+                print(f"[{marca}] V{migracion.version:03d} {migracion.descripcion}")
+            return 0
+        migrador.migrar(dry_run=args.dry_run, hasta=args.hasta)
+        return 0
+    except ErrorMigracion as e:
+        print(f"ERROR: {e}")
+        logging.error(f"Migración fallida: {e}")
+        return 1
+    finally:
+        conexion.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+
+import pymysql
+
+
+class PoolAgotadoError(pymysql.err.OperationalError):
+    """Se lanza cuando no se libera ninguna conexión dentro del tiempo de espera."""
+
+
+class PoolConexiones:
+    """
+    Pool acotado de conexiones PyMySQL que pueden compartir varios hilos.
+    Cada hilo toma su propia conexión, así los cursores nunca se mezclan.
+    """
+
+    def __init__(self, fabrica, min_conexiones=1, max_conexiones=5,
+                 tiempo_inactividad=300.0, verificar_tras=30.0, tiempo_espera=10.0):
+        if min_conexiones < 0 or max_conexiones < 1 or min_conexiones > max_conexiones:
+            raise ValueError("Tamaños de pool inválidos (min/max).")
+
+        self._fabrica = fabrica
+        self.min_conexiones = min_conexiones
+        self.max_conexiones = max_conexiones
+        self.tiempo_inactividad = tiempo_inactividad
+        self.verificar_tras = verificar_tras
+        self.tiempo_espera = tiempo_espera
+
+        self._condicion = threading.Condition()
+        self._inactivas = deque()  # (conexion, instante en que se liberó)
+        self._en_uso = 0
+        self._total = 0
+        self._cerrado = False
+
+        # Métricas para dimensionar el pool
+        self._esperas = 0
+        self._tiempo_espera_total = 0.0
+        self._tiempo_espera_max = 0.0
+        self._prestamos = 0
+        self._creadas = 0
+        self._descartadas = 0
+
+        for _ in range(min_conexiones):
+            conexion = self._fabrica()
+            with self._condicion:
+                self._total += 1
+                self._creadas += 1
+                self._inactivas.append((conexion, time.monotonic()))
+
+    def esta_abierto(self):
+        return not self._cerrado
+
+    def obtener(self):
+        """Presta una conexión sana; espera si todas están ocupadas."""
+        inicio = time.monotonic()
+        limite = inicio + self.tiempo_espera
+        conexion = None
+        liberada = None
+
+        with self._condicion:
+            while True:
+                if self._cerrado:
+                    raise pymysql.err.OperationalError(0, "El pool de conexiones está cerrado.")
+                self._purgar_inactivas()
+                if self._inactivas:
+                    conexion, liberada = self._inactivas.pop()
+                    break
+                if self._total < self.max_conexiones:
+                    self._total += 1
+                    break
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    self._registrar_espera(time.monotonic() - inicio)
+                    raise PoolAgotadoError(0, f"Sin conexiones libres tras {self.tiempo_espera}s de espera.")
+                self._condicion.wait(restante)
+
+            self._en_uso += 1
+            self._prestamos += 1
+            self._registrar_espera(time.monotonic() - inicio)
+
+        try:
+            if conexion is None:
+                return self._abrir_nueva()
+            if self._esta_sana(conexion, liberada):
+                return conexion
+            self._cerrar_silencioso(conexion)
+            with self._condicion:
+                self._descartadas += 1
+            return self._abrir_nueva()
+        except BaseException:
+            with self._condicion:
+                self._en_uso -= 1
+                self._total -= 1
+                self._condicion.notify()
+            raise
+
+    def liberar(self, conexion, descartar=False):
+        """Devuelve una conexión al pool (o la cierra si está rota)."""
+        cerrar = False
+        with self._condicion:
+            self._en_uso -= 1
+            if descartar or self._cerrado or not conexion.open:
+                self._total -= 1
+                self._descartadas += 1
+                cerrar = True
+            else:
+                self._inactivas.append((conexion, time.monotonic()))
+            self._condicion.notify()
+        if cerrar:
+            self._cerrar_silencioso(conexion)
+
+    @contextmanager
+    def conexion(self):
+        """
+        Uso: with pool.conexion() as conexion: ...
+        Si el bloque falla se hace rollback antes de devolverla; si ni eso
+        funciona, la conexión se descarta.
+        """
+        conexion = self.obtener()
+        descartar = False
+        try:
+            yield conexion
+        except BaseException:
+            try:
+                conexion.rollback()
+            except Exception:
+                descartar = True
+            raise
+        finally:
+            self.liberar(conexion, descartar)
+
+    def estadisticas(self):
+        with self._condicion:
+            return {
+                "en_uso": self._en_uso,
+                "inactivas": len(self._inactivas),
+                "total": self._total,
+                "max": self.max_conexiones,
+                "prestamos": self._prestamos,
+                "esperas": self._esperas,
+                "espera_total_ms": round(self._tiempo_espera_total * 1000, 2),
+                "espera_max_ms": round(self._tiempo_espera_max * 1000, 2),
+                "creadas": self._creadas,
+                "descartadas": self._descartadas,
+            }
+
+    def cerrar(self):
+        """Cierra las conexiones libres; las prestadas se cierran al devolverse."""
+        with self._condicion:
+            self._cerrado = True
+            pendientes = [c for c, _ in self._inactivas]
+            self._total -= len(pendientes)
+            self._inactivas.clear()
+            self._condicion.notify_all()
+        for conexion in pendientes:
+            self._cerrar_silencioso(conexion)
+
+    # --- Internos ---
+
+    def _abrir_nueva(self):
+        conexion = self._fabrica()
+        with self._condicion:
+            self._creadas += 1
+        return conexion
+
+    def _esta_sana(self, conexion, liberada):
+        if not conexion.open:
+            return False
+        if time.monotonic() - liberada < self.verificar_tras:
+            return True
+        try:
+            conexion.ping(reconnect=False)
+            return True
+        except pymysql.Error as e:
+            logging.error(f"Conexión del pool descartada tras ping fallido: {e}")
+            return False
+
+    def _purgar_inactivas(self):
+        # Se llama con el candado tomado. Las más antiguas están a la izquierda.
+        ahora = time.monotonic()
+        while (self._inactivas and self._total > self.min_conexiones
+               and ahora - self._inactivas[0][1] > self.tiempo_inactividad):
+            conexion, _ = self._inactivas.popleft()
+            self._total -= 1
+            self._descartadas += 1
+            self._cerrar_silencioso(conexion)
+
+    def _registrar_espera(self, segundos):
+        if segundos > 0.001:
+            self._esperas += 1
+        self._tiempo_espera_total += segundos
+        self._tiempo_espera_max = max(self._tiempo_espera_max, segundos)
+
+    @staticmethod
+    def _cerrar_silencioso(conexion):
+        try:
+            conexion.close()
+        except Exception:
+            pass
@@ -0,0 +1,131 @@
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import pymysql
+
+# Catálogos de texto libre que se llenan al dar de alta personas: tabla -> (columna id, columna descripción)
+CATALOGOS_NOMBRES = {
+    "cNombre": ("CvNombre", "DsNombre"),
+    "cApellid": ("CvApellid", "DsApellid"),
+}
+
+
+def normalizar(texto):
+    """
+    Clave con la que se compara un nombre, aproximando la collation
+    utf8_general_ci de las tablas: sin acentos, sin mayúsculas y sin
+    espacios al final ('Pérez ' y 'perez' son el mismo registro).
+    """
+    descompuesto = unicodedata.normalize("NFD", texto)
+    sin_acentos = "".join(c for c in descompuesto if unicodedata.category(c) != "Mn")
+    return sin_acentos.casefold().rstrip(" ")
+
+
+class ResolutorNombres:
+    """
+    Convierte nombres y apellidos en sus claves de cNombre/cApellid,
+    creando los que falten. Resuelve muchos valores por consulta y guarda
+    en una LRU por tabla los que ya están confirmados en la base de datos.
+    """
+
+    def __init__(self, capacidad=5000, tam_bloque=500):
+        self.capacidad = capacidad
+        self.tam_bloque = tam_bloque
+        self._lock = threading.Lock()
+        self._lru = {tabla: OrderedDict() for tabla in CATALOGOS_NOMBRES}
+        self._aciertos = 0
+        self._fallos = 0
+
+    def resolver(self, cursor, tabla, valores):
+        """
+        Regresa {valor: id} para todos los `valores`, con a lo más tres viajes
+        a la BD por cada bloque de `tam_bloque` valores distintos: SELECT ... IN,
+        INSERT de los que faltan y SELECT ... IN de los recién insertados.
+        Se usa dentro de la transacción del llamador; nada entra a la LRU
+        hasta que éste llama a `recordar()` después del commit (un id de una
+        transacción revertida no debe quedar en caché).
+        """
+        pk_col, ds_col = CATALOGOS_NOMBRES[tabla]
+        ids = {}
+        faltantes = {}  # clave normalizada -> primer valor original con esa clave
+        with self._lock:
+            lru = self._lru[tabla]
+            for valor in valores:
+                clave = normalizar(valor)
+                if clave in lru:
+                    lru.move_to_end(clave)
+                    ids[clave] = lru[clave]
+                    self._aciertos += 1
+                elif clave not in faltantes:
+                    faltantes[clave] = valor
+                    self._fallos += 1
+
+        pendientes = list(faltantes.items())
+        for i in range(0, len(pendientes), self.tam_bloque):
+            bloque = pendientes[i:i + self.tam_bloque]
+            existentes = self._buscar(cursor, tabla, pk_col, ds_col, [v for _, v in bloque])
+            ids.update(existentes)
+
+            nuevos = [v for c, v in bloque if c not in existentes]
+            if nuevos:
+                # ON DUPLICATE KEY cubre a otra sesión que haya insertado el mismo nombre entre tanto
+                cursor.execute(
+                    f"INSERT INTO {tabla} ({ds_col}) VALUES {', '.join(['(%s)'] * len(nuevos))} "
+                    f"ON DUPLICATE KEY UPDATE {ds_col} = {ds_col}",
+                    nuevos
+                )
+                ids.update(self._buscar(cursor, tabla, pk_col, ds_col, nuevos))
+
+        resultado = {}
+        for valor in valores:
+            clave = normalizar(valor)
+            if clave not in ids:
+                raise pymysql.err.DataError(0, f"No se pudo resolver '{valor}' en {tabla}.")
+            resultado[valor] = ids[clave]
+        return resultado
+
+    def recordar(self, tabla, resueltos):
+        """Guarda en la LRU lo que regresó `resolver()` una vez confirmada la transacción."""
+        self._guardar(tabla, {normalizar(v): i for v, i in resueltos.items()})
+
+    def invalidar(self, tabla=None):
+        with self._lock:
+            for t in ([tabla] if tabla is not None else list(self._lru)):
+                if t in self._lru:
+                    self._lru[t].clear()
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "aciertos": self._aciertos,
+                "fallos": self._fallos,
+                "en_cache": {t: len(lru) for t, lru in self._lru.items()},
+            }
+
+    # --- Internos ---
+
+    @staticmethod
+    def _buscar(cursor, tabla, pk_col, ds_col, valores):
+        cursor.execute(
+            f"SELECT {pk_col}, {ds_col} FROM {tabla} WHERE {ds_col} IN ({', '.join(['%s'] * len(valores))})",
+            valores
+        )
+        encontrados = {}
+        for pk, ds in cursor.fetchall():
+            clave = normalizar(ds)
+            # Sin el índice único podría haber duplicados: se usa siempre el más antiguo
+            if clave not in encontrados or pk < encontrados[clave]:
+                encontrados[clave] = pk
+        return encontrados
+
+    def _guardar(self, tabla, por_clave):
+        if not por_clave:
+            return
+        with self._lock:
+            lru = self._lru[tabla]
+            for clave, pk in por_clave.items():
+                lru[clave] = pk
+                lru.move_to_end(clave)
+            while len(lru) > self.capacidad:
+                lru.popitem(last=False)
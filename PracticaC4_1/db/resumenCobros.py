@@ -0,0 +1,167 @@
+"""
+Resumen de cobros por alumno y por mes (tabla `fResumenCobro`).
+DatabaseManager lo mantiene al día en la misma transacción que add_pago,
+update_pago y delete_pago; este módulo además lo puede revisar o reconstruir
+desde fCobro. Uso (desde PracticaC4_1/):
+
+    python -m db.resumenCobros                 compara el resumen contra fCobro
+    python -m db.resumenCobros --reparar       reconstruye sólo los alumnos con diferencias
+    python -m db.resumenCobros --reconstruir   reconstruye toda la tabla
+"""
+import argparse
+import logging
+import os
+import sys
+
+import pymysql
+
+# Primer día del mes del cobro; se queda como DATE para que el JOIN con el resumen use el índice
+PERIODO_COBRO = "DATE_SUB(f.FechaCobro, INTERVAL DAYOFMONTH(f.FechaCobro) - 1 DAY)"
+
+# Aporte de los cobros al resumen. Neto = Monto - Descuento; lo que no está 'Pagado' cuenta como pendiente.
+_APORTE = """
+    f.CvUsuario AS CvUsuario, {periodo} AS Periodo,
+    {signo} * COUNT(*) AS Cobros,
+    {signo} * SUM(f.Monto) AS Facturado,
+    {signo} * SUM(COALESCE(f.Descuento, 0)) AS Descuento,
+    {signo} * SUM(IF(f.Estado = 'Pagado', f.Monto - COALESCE(f.Descuento, 0), 0)) AS Pagado,
+    {signo} * SUM(IF(f.Estado = 'Pagado', 0, f.Monto - COALESCE(f.Descuento, 0))) AS Pendiente
+"""
+_SIGNOS = 5  # veces que aparece {signo} en _APORTE
+
+_COLUMNAS = "CvUsuario, Periodo, Cobros, Facturado, Descuento, Pagado, Pendiente"
+
+# Suma (signo 1) o resta (signo -1) al resumen lo que aporta un cobro. Se usa antes de
+# borrar o modificar el cobro (resta) y después de insertarlo o modificarlo (suma).
+SENTENCIA_ACUMULAR_COBRO = f"""
+    INSERT INTO fResumenCobro ({_COLUMNAS})
+    SELECT {_APORTE.format(periodo=PERIODO_COBRO, signo='%s')}
+    FROM fCobro f
+    WHERE f.CvCobro IN ({{marcadores}})
+    GROUP BY f.CvUsuario, {PERIODO_COBRO}
+    ON DUPLICATE KEY UPDATE  -- calificadas: fCobro también tiene columna Descuento
+        fResumenCobro.Cobros = fResumenCobro.Cobros + VALUES(Cobros),
+        fResumenCobro.Facturado = fResumenCobro.Facturado + VALUES(Facturado),
+        fResumenCobro.Descuento = fResumenCobro.Descuento + VALUES(Descuento),
+        fResumenCobro.Pagado = fResumenCobro.Pagado + VALUES(Pagado),
+        fResumenCobro.Pendiente = fResumenCobro.Pendiente + VALUES(Pendiente)
+"""
+
+# Tras una resta, el mes que se quedó sin cobros sale del resumen
+SENTENCIA_PURGAR_VACIOS = f"""
+    DELETE r FROM fResumenCobro r
+    JOIN fCobro f ON r.CvUsuario = f.CvUsuario AND r.Periodo = {PERIODO_COBRO}
+    WHERE f.CvCobro IN ({{marcadores}}) AND r.Cobros = 0
+"""
+
+_RESUMEN_DESDE_COBROS = f"SELECT {_APORTE.format(periodo=PERIODO_COBRO, signo=1)} FROM fCobro f {{where}} " \
+                        f"GROUP BY f.CvUsuario, {PERIODO_COBRO}"
+
+CONSULTA_DIFERENCIAS = f"""
+    SELECT c.CvUsuario, c.Periodo, c.Cobros, r.Cobros, c.Facturado, r.Facturado, c.Pendiente, r.Pendiente
+    FROM ({_RESUMEN_DESDE_COBROS.format(where='')}) AS c
+    LEFT JOIN fResumenCobro r ON r.CvUsuario = c.CvUsuario AND r.Periodo = c.Periodo
+    WHERE r.CvUsuario IS NULL OR r.Cobros <> c.Cobros OR r.Facturado <> c.Facturado
+       OR r.Descuento <> c.Descuento OR r.Pagado <> c.Pagado OR r.Pendiente <> c.Pendiente
+    UNION ALL
+    SELECT r.CvUsuario, r.Periodo, NULL, r.Cobros, NULL, r.Facturado, NULL, r.Pendiente
+    FROM fResumenCobro r
+    WHERE NOT EXISTS (
+        SELECT 1 FROM fCobro f
+        WHERE f.CvUsuario = r.CvUsuario AND f.FechaCobro >= r.Periodo
+          AND f.FechaCobro < r.Periodo + INTERVAL 1 MONTH
+    )
+"""
+
+
+def acumular_cobros(cursor, cv_cobros, signo):
+    """Aplica al resumen el aporte de los cobros indicados, dentro de la transacción del cursor."""
+    if not cv_cobros:
+        return
+    marcadores = ", ".join(["%s"] * len(cv_cobros))
+    cursor.execute(SENTENCIA_ACUMULAR_COBRO.format(marcadores=marcadores), (signo,) * _SIGNOS + tuple(cv_cobros))
+    if signo < 0:
+        cursor.execute(SENTENCIA_PURGAR_VACIOS.format(marcadores=marcadores), tuple(cv_cobros))
+
+
+def reconstruir(conexion, cv_usuarios=None):
+    """
+    Recalcula el resumen desde fCobro (todo, o sólo los alumnos indicados) en una
+    transacción. El INSERT ... SELECT bloquea en modo compartido los cobros que lee,
+    así que un pago registrado mientras tanto espera a que termine.
+    """
+    with conexion.cursor() as cursor:
+        if cv_usuarios is None:
+            cursor.execute("DELETE FROM fResumenCobro")
+            cursor.execute(f"INSERT INTO fResumenCobro ({_COLUMNAS}) {_RESUMEN_DESDE_COBROS.format(where='')}")
+        else:
+            cv_usuarios = list(cv_usuarios)
+            if not cv_usuarios:
+                return 0
+            marcadores = ", ".join(["%s"] * len(cv_usuarios))
+            cursor.execute(f"DELETE FROM fResumenCobro WHERE CvUsuario IN ({marcadores})", tuple(cv_usuarios))
+            cursor.execute(
+                f"INSERT INTO fResumenCobro ({_COLUMNAS}) "
+                f"{_RESUMEN_DESDE_COBROS.format(where=f'WHERE f.CvUsuario IN ({marcadores})')}",
+                tuple(cv_usuarios)
+            )
+        filas = cursor.rowcount
+    conexion.commit()
+    return filas
+
+
+def diferencias(conexion):
+    """[(CvUsuario, Periodo, cobros, cobros_resumen, facturado, facturado_resumen, pendiente, pendiente_resumen)]"""
+    with conexion.cursor() as cursor:
+        cursor.execute(CONSULTA_DIFERENCIAS)
+        return cursor.fetchall()
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Revisa o reconstruye el resumen mensual de cobros.")
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument("--reparar", action="store_true", help="reconstruye sólo los alumnos con diferencias")
+    grupo.add_argument("--reconstruir", action="store_true", help="reconstruye toda la tabla desde fCobro")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    conexion = pymysql.connect(
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME'),
+        autocommit=False
+    )
+    try:
+        if args.reconstruir:
+            print(f"Resumen reconstruido: {reconstruir(conexion)} filas.")
+            return 0
+
+        encontradas = diferencias(conexion)
+        conexion.rollback()
+        for cv_usuario, periodo, cobros, cobros_r, facturado, facturado_r, pendiente, pendiente_r in encontradas:
+            print(f"CvUsuario={cv_usuario} {periodo:%Y-%m}: cobros {cobros} vs {cobros_r}, "
+                  f"facturado {facturado} vs {facturado_r}, pendiente {pendiente} vs {pendiente_r}")
+        if not encontradas:
+            print("El resumen coincide con fCobro.")
+            return 0
+        if args.reparar:
+            alumnos = {fila[0] for fila in encontradas}
+            reconstruir(conexion, alumnos)
+            print(f"Reconstruidos {len(alumnos)} alumno(s).")
+            return 0
+        print(f"\n{len(encontradas)} diferencia(s). Corrija con --reparar.")
+        return 1
+    except pymysql.Error as e:
+        conexion.rollback()
+        print(f"ERROR: {e}")
+        logging.error(f"Revisión del resumen de cobros fallida: {e}")
+        return 1
+    finally:
+        conexion.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
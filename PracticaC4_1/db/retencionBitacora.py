@@ -0,0 +1,162 @@
+"""
+Mantenimiento de las particiones mensuales de `bitacora_accesos`.
+Uso (desde PracticaC4_1/), p. ej. una vez al mes con el programador de tareas:
+
+    python -m db.retencionBitacora                  crea los meses futuros y archiva lo de más de 12 meses
+    python -m db.retencionBitacora --meses 6 --sin-archivo
+    python -m db.retencionBitacora --dry-run
+
+Borrar una partición es instantáneo (no es un DELETE fila por fila). Antes de
+borrarla, sus filas se copian a `bitacora_accesos_archivo`, una tabla
+comprimida que no se consulta desde la aplicación.
+"""
+import argparse
+import logging
+import os
+import sys
+from datetime import date
+
+import pymysql
+
+TABLA = "bitacora_accesos"
+TABLA_ARCHIVO = "bitacora_accesos_archivo"
+PARTICION_MAXIMA = "p_max"
+
+SQL_TABLA_ARCHIVO = f"""
+CREATE TABLE IF NOT EXISTS {TABLA_ARCHIVO} (
+  id_acceso INT NOT NULL,
+  usuario_intento VARCHAR(100) NOT NULL,
+  fecha_hora DATETIME NOT NULL,
+  exito BOOLEAN NOT NULL,
+  detalle_evento VARCHAR(255) NOT NULL,
+  direccion_ip VARCHAR(45) NULL,
+  PRIMARY KEY (id_acceso, fecha_hora)
+) ENGINE = InnoDB ROW_FORMAT = COMPRESSED
+COMMENT = 'Bitácora de accesos de meses ya retirados de bitacora_accesos.'
+"""
+
+
+def sumar_meses(fecha, meses):
+    """Primer día del mes que está `meses` después (o antes) del mes de `fecha`."""
+    indice = fecha.year * 12 + (fecha.month - 1) + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def nombre_particion(mes):
+    return f"p{mes:%Y%m}"
+
+
+def definicion_particion(mes):
+    """La partición de un mes guarda lo anterior al primer día del mes siguiente."""
+    return f"PARTITION {nombre_particion(mes)} VALUES LESS THAN ('{sumar_meses(mes, 1):%Y-%m-%d}')"
+
+
+def definiciones_mensuales(desde, hasta):
+    """Particiones de cada mes entre `desde` y `hasta` (inclusive) más la de MAXVALUE."""
+    meses = []
+    mes = sumar_meses(desde, 0)
+    while mes <= hasta:
+        meses.append(definicion_particion(mes))
+        mes = sumar_meses(mes, 1)
+    meses.append(f"PARTITION {PARTICION_MAXIMA} VALUES LESS THAN (MAXVALUE)")
+    return meses
+
+
+class RetencionBitacora:
+    def __init__(self, conexion, dry_run=False):
+        self.conexion = conexion
+        self.dry_run = dry_run
+
+    def particiones(self):
+        """[(nombre, límite superior o None para MAXVALUE, filas aproximadas)] en orden."""
+        with self.conexion.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+                FROM information_schema.PARTITIONS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+                ORDER BY PARTITION_ORDINAL_POSITION
+                """, (TABLA,))
+            filas = cursor.fetchall()
+        resultado = []
+        for nombre, descripcion, total in filas:
+            limite = None if descripcion.upper() == "MAXVALUE" else date.fromisoformat(descripcion.strip("'")[:10])
+            resultado.append((nombre, limite, total))
+        return resultado
+
+    def asegurar_meses_futuros(self, meses=3):
+        """
+        Separa de p_max los meses que falten hasta hoy + `meses`. Si se corre a
+        tiempo p_max está vacía y el REORGANIZE no mueve filas.
+        """
+        particiones = self.particiones()
+        if not particiones:
+            raise RuntimeError(f"{TABLA} no está particionada; aplique las migraciones (python -m db.migrador).")
+        limites = [l for _, l, _ in particiones if l is not None]
+        desde = limites[-1] if limites else sumar_meses(date.today(), 0)
+        hasta = sumar_meses(date.today(), meses)
+        if desde > hasta:
+            return []
+        nuevas = definiciones_mensuales(desde, hasta)
+        self._ejecutar(f"ALTER TABLE {TABLA} REORGANIZE PARTITION {PARTICION_MAXIMA} INTO ({', '.join(nuevas)})")
+        return nuevas[:-1]
+
+    def retirar_antiguas(self, meses_retencion=12, archivar=True):
+        """Archiva (opcional) y elimina las particiones con datos de hace más de `meses_retencion` meses."""
+        corte = sumar_meses(date.today(), -meses_retencion)
+        vencidas = [(n, l, t) for n, l, t in self.particiones() if l is not None and l <= corte]
+        if archivar and vencidas:
+            self._ejecutar(SQL_TABLA_ARCHIVO)
+        for nombre, limite, total in vencidas:
+            if archivar:
+                # INSERT IGNORE: si una corrida anterior se cortó después de archivar, no se duplica
+                self._ejecutar(f"INSERT IGNORE INTO {TABLA_ARCHIVO} SELECT id_acceso, usuario_intento, fecha_hora, "
+                               f"exito, detalle_evento, direccion_ip FROM {TABLA} PARTITION ({nombre})")
+            self._ejecutar(f"ALTER TABLE {TABLA} DROP PARTITION {nombre}")
+            print(f"Partición {nombre} (hasta {limite}, ~{total} filas) {'archivada y ' if archivar else ''}eliminada.")
+        return [n for n, _, _ in vencidas]
+
+    def _ejecutar(self, sentencia):
+        if self.dry_run:
+            print(" ".join(sentencia.split()) + ";")
+            return
+        with self.conexion.cursor() as cursor:
+            cursor.execute(sentencia)
+        self.conexion.commit()
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Retención de la bitácora de accesos por particiones mensuales.")
+    parser.add_argument("--meses", type=int, default=12, help="meses de bitácora que se conservan en línea")
+    parser.add_argument("--futuros", type=int, default=3, help="meses por delante que se dejan creados")
+    parser.add_argument("--sin-archivo", action="store_true", help="elimina sin copiar a bitacora_accesos_archivo")
+    parser.add_argument("--dry-run", action="store_true", help="muestra las sentencias sin ejecutarlas")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    conexion = pymysql.connect(
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME'),
+        autocommit=True
+    )
+    try:
+        retencion = RetencionBitacora(conexion, dry_run=args.dry_run)
+        creadas = retencion.asegurar_meses_futuros(args.futuros)
+        if creadas:
+            print(f"Particiones nuevas: {len(creadas)}")
+        retencion.retirar_antiguas(args.meses, archivar=not args.sin_archivo)
+        return 0
+    except (pymysql.Error, RuntimeError) as e:
+        print(f"ERROR: {e}")
+        logging.error(f"Retención de bitácora fallida: {e}")
+        return 1
+    finally:
+        conexion.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import os
+import json
+import struct
+import threading
+import zlib
+import logging
+
+# Cada registro: longitud (4 bytes) + crc32 (4 bytes) + JSON en UTF-8
+_CABECERA = struct.Struct(">II")
+
+
+class SpoolLocal:
+    """
+    Archivo local de solo-agregar donde se guardan filas que no se pudieron
+    escribir en la base de datos (bitácora y errores) para reenviarlas después.
+    Se divide en segmentos que rotan por tamaño; un segmento se borra sólo
+    cuando todas sus filas se reenviaron con éxito.
+    """
+
+    def __init__(self, directorio, tam_segmento=1024 * 1024):
+        self.directorio = directorio
+        self.tam_segmento = tam_segmento
+        self._lock = threading.Lock()
+        self._lock_reproduccion = threading.Lock()
+        self._archivo = None
+        self._numero_actual = None
+        self._filas_guardadas = 0
+        self._filas_reenviadas = 0
+        os.makedirs(self.directorio, exist_ok=True)
+
+    def agregar(self, tabla, filas):
+        """Guarda un lote de filas de `tabla` con un único fsync al final."""
+        if not filas:
+            return
+        with self._lock:
+            archivo = self._archivo_para_escribir()
+            for fila in filas:
+                datos = json.dumps({"t": tabla, "f": list(fila)}, default=str).encode("utf-8")
+                archivo.write(_CABECERA.pack(len(datos), zlib.crc32(datos)) + datos)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+            self._filas_guardadas += len(filas)
+            if archivo.tell() >= self.tam_segmento:
+                self._cerrar_actual()
+
+    def hay_pendientes(self):
+        with self._lock:
+            return bool(self._segmentos())
+
+    def reproducir(self, escribir, tam_lote=500):
+        """
+        Reenvía los segmentos en orden llamando a `escribir(tabla, filas)`.
+        Si una escritura falla se detiene y el segmento queda para el siguiente intento.
+        Regresa el número de filas reenviadas (0 si ya hay otro reenvío en curso).
+        """
+        if not self._lock_reproduccion.acquire(blocking=False):
+            return 0
+        try:
+            return self._reproducir(escribir, tam_lote)
+        finally:
+            self._lock_reproduccion.release()
+
+    def _reproducir(self, escribir, tam_lote):
+        with self._lock:
+            # El segmento activo también se reenvía; lo nuevo irá a otro archivo
+            self._cerrar_actual()
+            segmentos = self._segmentos()
+
+        reenviadas = 0
+        for ruta in segmentos:
+            por_tabla = {}
+            for tabla, fila in self._leer_segmento(ruta):
+                por_tabla.setdefault(tabla, []).append(fila)
+            try:
+                for tabla, filas in por_tabla.items():
+                    for i in range(0, len(filas), tam_lote):
+                        escribir(tabla, filas[i:i + tam_lote])
+            except Exception as e:
+                logging.error(f"Reenvío del spool detenido en {os.path.basename(ruta)}: {e}")
+                break
+            os.remove(ruta)
+            reenviadas += sum(len(f) for f in por_tabla.values())
+
+        with self._lock:
+            self._filas_reenviadas += reenviadas
+        return reenviadas
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "segmentos": len(self._segmentos()),
+                "filas_guardadas": self._filas_guardadas,
+                "filas_reenviadas": self._filas_reenviadas,
+            }
+
+    def cerrar(self):
+        with self._lock:
+            self._cerrar_actual()
+
+    # --- Internos (se llaman con el candado tomado) ---
+
+    def _segmentos(self):
+        nombres = sorted(n for n in os.listdir(self.directorio)
+                         if n.startswith("segmento_") and n.endswith(".spool"))
+        return [os.path.join(self.directorio, n) for n in nombres]
+
+    def _archivo_para_escribir(self):
+        if self._archivo is None:
+            existentes = self._segmentos()
+            ultimo = int(os.path.basename(existentes[-1])[9:-6]) if existentes else 0
+            self._numero_actual = ultimo + 1
+            ruta = os.path.join(self.directorio, f"segmento_{self._numero_actual:06d}.spool")
+            self._archivo = open(ruta, "ab")
+        return self._archivo
+
+    def _cerrar_actual(self):
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+    @staticmethod
+    def _leer_segmento(ruta):
+        with open(ruta, "rb") as archivo:
+            contenido = archivo.read()
+        pos = 0
+        while pos + _CABECERA.size <= len(contenido):
+            longitud, crc = _CABECERA.unpack_from(contenido, pos)
+            inicio = pos + _CABECERA.size
+            datos = contenido[inicio:inicio + longitud]
+            if len(datos) < longitud or zlib.crc32(datos) != crc:
+                # Escritura cortada (p. ej. se fue la luz): lo anterior es válido
+                logging.error(f"Registro incompleto en {os.path.basename(ruta)}, se ignora el resto.")
+                return
+            registro = json.loads(datos.decode("utf-8"))
+            yield registro["t"], tuple(registro["f"])
+            pos = inicio + longitud
@@ -0,0 +1,113 @@
+"""
+Revisa con EXPLAIN que las búsquedas frecuentes de DatabaseManager usen índice.
+Uso (desde PracticaC4_1/):
+
+    python -m db.verificarIndices
+
+Toma la conexión de las mismas variables de entorno (.env) que Main.py y
+termina con código 1 si alguna consulta recorre completa una tabla.
+"""
+import os
+import sys
+from datetime import timedelta
+
+import pymysql
+from dotenv import load_dotenv
+
+from .databaseManager import (
+    DatabaseManager, CONSULTA_VALIDAR_USUARIO, CONSULTA_LOGIN_EXISTE, CONSULTA_LOGIN_EXISTE_OTRO,
+    CONSULTA_PASSWORD_USUARIO, SENTENCIA_ACTUALIZAR_PASSWORD
+)
+from .resolutorNombres import CATALOGOS_NOMBRES
+
+# Tipos de acceso de EXPLAIN que significan leer la tabla o el índice completo
+ACCESOS_COMPLETOS = {"ALL", "index"}
+
+
+def _valores_de_muestra(cursor):
+    """Un login/password y un nombre/apellido reales, para que EXPLAIN no se resuelva como 'Impossible WHERE'."""
+    cursor.execute("SELECT CvUser, Login, Password FROM mUsuario ORDER BY CvUser LIMIT 1")
+    usuario = cursor.fetchone() or (0, "sin_usuarios", "sin_password")
+    muestras = {"usuario": usuario}
+    for tabla, (_, ds_col) in CATALOGOS_NOMBRES.items():
+        cursor.execute(f"SELECT {ds_col} FROM {tabla} LIMIT 1")
+        fila = cursor.fetchone()
+        muestras[tabla] = fila[0] if fila else "sin_datos"
+    cursor.execute("SELECT usuario_intento, direccion_ip, fecha_hora FROM bitacora_accesos "
+                   "ORDER BY fecha_hora DESC LIMIT 1")
+    muestras["bitacora"] = cursor.fetchone()
+    return muestras
+
+
+def consultas_vigiladas(muestras):
+    """(descripción, sentencia, parámetros) de cada búsqueda que debe usar índice."""
+    cv_user, login, password = muestras["usuario"]
+    consultas = [
+        ("validar_usuario", CONSULTA_VALIDAR_USUARIO, (login, login)),
+        ("check_login_exists", CONSULTA_LOGIN_EXISTE, (login,)),
+        ("check_login_exists (edición)", CONSULTA_LOGIN_EXISTE_OTRO, (login, cv_user)),
+        ("verificar_password", CONSULTA_PASSWORD_USUARIO, (login, login)),
+        ("actualizar_password", SENTENCIA_ACTUALIZAR_PASSWORD, (password, login)),
+        ("desactivar_cuentas_vencidas", "SELECT CvUser FROM mUsuario WHERE EdoCta = 1 AND FecVen < CURDATE()", ()),
+    ]
+    for tabla, (pk_col, ds_col) in CATALOGOS_NOMBRES.items():
+        consultas.append((f"ResolutorNombres ({tabla})",
+                          f"SELECT {pk_col}, {ds_col} FROM {tabla} WHERE {ds_col} IN (%s)",
+                          (muestras[tabla],)))
+    if muestras["bitacora"]:
+        # Filtros del módulo de Auditoría sobre la última semana de bitácora
+        usuario, ip, fecha = muestras["bitacora"]
+        filtros = {"usuario": {"usuario": usuario}, "ip": {"ip": ip or "0.0.0.0"}, "fallidos": {"exito": False}}
+        for nombre, filtro in filtros.items():
+            condiciones, params = DatabaseManager._filtro_bitacora(fecha - timedelta(days=7), fecha, **filtro)
+            consultas.append((f"buscar_bitacora ({nombre})",
+                              f"SELECT id_acceso FROM bitacora_accesos WHERE {' AND '.join(condiciones)} "
+                              f"ORDER BY fecha_hora DESC, id_acceso DESC LIMIT 300", tuple(params)))
+    return consultas
+
+
+def revisar(conexion):
+    """Regresa una lista de (descripción, tabla, tipo, índice, ok) por cada fila de EXPLAIN."""
+    resultados = []
+    with conexion.cursor() as cursor:
+        muestras = _valores_de_muestra(cursor)
+    with conexion.cursor(pymysql.cursors.DictCursor) as cursor:
+        for descripcion, sentencia, params in consultas_vigiladas(muestras):
+            cursor.execute("EXPLAIN " + sentencia.strip().rstrip(";"), params)
+            for fila in cursor.fetchall():
+                tipo = fila.get("type")
+                resultados.append((descripcion, fila.get("table"), tipo, fila.get("key"),
+                                   tipo not in ACCESOS_COMPLETOS))
+    return resultados
+
+
+def main():
+    load_dotenv()
+    conexion = pymysql.connect(
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME'),
+        autocommit=False
+    )
+    try:
+        resultados = revisar(conexion)
+    finally:
+        # EXPLAIN UPDATE no modifica nada, pero por si acaso
+        conexion.rollback()
+        conexion.close()
+
+    fallas = 0
+    for descripcion, tabla, tipo, indice, ok in resultados:
+        marca = "OK   " if ok else "FALLA"
+        print(f"[{marca}] {descripcion:<32} tabla={tabla!s:<6} tipo={tipo!s:<8} indice={indice}")
+        fallas += not ok
+    if fallas:
+        print(f"\n{fallas} acceso(s) sin índice. ¿Faltan migraciones? (python -m db.migrador --estado)")
+        return 1
+    print("\nTodas las búsquedas vigiladas usan índice.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
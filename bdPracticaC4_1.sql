@@ -142,7 +142,8 @@ ENGINE = InnoDB;
 CREATE TABLE IF NOT EXISTS `bdPracticaC4_1`.`cApellid` (
   `CvApellid` INT NOT NULL AUTO_INCREMENT,
   `DsApellid` VARCHAR(30) NOT NULL,
-  PRIMARY KEY (`CvApellid`))
+  PRIMARY KEY (`CvApellid`),
+  UNIQUE INDEX `uq_cApellid_DsApellid` (`DsApellid` ASC))
 ENGINE = InnoDB;
 
 CREATE TABLE IF NOT EXISTS `bdPracticaC4_1`.`cTpPerso` (
@@ -178,7 +179,8 @@ ENGINE = InnoDB;
 CREATE TABLE IF NOT EXISTS `bdPracticaC4_1`.`cNombre` (
   `CvNombre` INT NOT NULL AUTO_INCREMENT,
   `DsNombre` VARCHAR(30) NOT NULL,
-  PRIMARY KEY (`CvNombre`))
+  PRIMARY KEY (`CvNombre`),
+  UNIQUE INDEX `uq_cNombre_DsNombre` (`DsNombre` ASC))
 ENGINE = InnoDB;
 
 CREATE TABLE IF NOT EXISTS `bdPracticaC4_1`.`mDtsPerson` (
@@ -269,11 +271,13 @@ CREATE TABLE IF NOT EXISTS `bdPracticaC4_1`.`mUsuario` (
   `CvPerson` INT NOT NULL,
   `Login` VARCHAR(45) NOT NULL,
   `Password` VARCHAR(255) NOT NULL,
-  `FecIni` VARCHAR(30) NOT NULL,
-  `FecVen` VARCHAR(30) NOT NULL,
-  `EdoCta` VARCHAR(45) NOT NULL,
+  `FecIni` DATE NOT NULL,
+  `FecVen` DATE NOT NULL,
+  `EdoCta` TINYINT(1) NOT NULL DEFAULT 1,
   PRIMARY KEY (`CvUser`),
   INDEX `CvPerson_idx` (`CvPerson` ASC),
+  UNIQUE INDEX `uq_mUsuario_Login` (`Login` ASC),
+  INDEX `idx_mUsuario_EdoCta_FecVen` (`EdoCta` ASC, `FecVen` ASC),
   CONSTRAINT `CvPerson`
     FOREIGN KEY (`CvPerson`)
     REFERENCES `bdPracticaC4_1`.`mDtsPerson` (`CvPerson`)
@@ -295,8 +299,35 @@ CREATE TABLE IF NOT EXISTS `bdPracticaC4_1`.`bitacora_accesos` (
   `fecha_hora` DATETIME NOT NULL,
   `exito` BOOLEAN NOT NULL,
   `detalle_evento` VARCHAR(255) NOT NULL,
-  PRIMARY KEY (`id_acceso`)
-) ENGINE = InnoDB;
+  `direccion_ip` VARCHAR(45) NULL,
+  PRIMARY KEY (`id_acceso`, `fecha_hora`),
+  INDEX `idx_bitacora_fecha` (`fecha_hora`),
+  INDEX `idx_bitacora_usuario_fecha` (`usuario_intento`, `fecha_hora`),
+  INDEX `idx_bitacora_ip_fecha` (`direccion_ip`, `fecha_hora`),
+  INDEX `idx_bitacora_exito_fecha` (`exito`, `fecha_hora`)
+) ENGINE = InnoDB
+-- Particionada por mes: las consultas por rango de fecha sólo leen los meses
+-- que tocan. Las particiones mensuales las crea y retira
+-- `python -m db.retencionBitacora` (mientras tanto todo cae en p_max).
+PARTITION BY RANGE COLUMNS (`fecha_hora`) (
+  PARTITION p_max VALUES LESS THAN (MAXVALUE)
+);
+
+
+-- -----------------------------------------------------
+-- Tabla `mErrores` (Módulo Auditoría)
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `bdPracticaC4_1`.`mErrores` (
+  `id_error` INT NOT NULL AUTO_INCREMENT,
+  `mensaje_error` TEXT NOT NULL,
+  `modulo` VARCHAR(100) NOT NULL,
+  `fecha_hora` DATETIME NOT NULL,
+  `usuario_activo` VARCHAR(100) NOT NULL,
+  `direccion_ip` VARCHAR(45) NULL,
+  PRIMARY KEY (`id_error`),
+  INDEX `idx_mErrores_fecha` (`fecha_hora` ASC)
+) ENGINE = InnoDB
+COMMENT = 'Errores de la aplicación (DatabaseManager.registrar_error).';
 
 
 -- -----------------------------------------------------
@@ -356,17 +387,54 @@ CREATE TABLE IF NOT EXISTS `bdPracticaC4_1`.`fCobro` (
   `Monto` DECIMAL(10,2) NOT NULL,
   `Descuento` DECIMAL(10,2) NULL DEFAULT 0,
   `Estado` VARCHAR(20) NOT NULL COMMENT 'Ej: \"Pagado\", \"Pendiente\".',
+  `Periodo` DATE NULL COMMENT 'Mes facturado (día 1); sólo cobros generados.',
+  `CvDescuento` INT NULL COMMENT 'Entrada de cDescuentos aplicada (NULL si no hay).',
   PRIMARY KEY (`CvCobro`),
   INDEX `fk_fCobro_mUsuario_idx` (`CvUsuario` ASC),
+  INDEX `fk_fCobro_cDescuentos_idx` (`CvDescuento` ASC),
+  -- La facturación mensual no genera dos veces el mismo mes (NULL en cobros manuales)
+  UNIQUE INDEX `uq_fCobro_usuario_tipo_periodo` (`CvUsuario` ASC, `Tipo` ASC, `Periodo` ASC),
+  -- Paginación por llave (keyset) del módulo de Pagos
+  INDEX `idx_fCobro_fecha` (`FechaCobro` DESC, `CvCobro` DESC),
+  INDEX `idx_fCobro_usuario_fecha` (`CvUsuario` ASC, `FechaCobro` DESC, `CvCobro` DESC),
   CONSTRAINT `fk_fCobro_mUsuario`
     FOREIGN KEY (`CvUsuario`)
     REFERENCES `bdPracticaC4_1`.`mUsuario` (`CvUser`)
     ON DELETE CASCADE
+    ON UPDATE CASCADE,
+  CONSTRAINT `fk_fCobro_cDescuentos`
+    FOREIGN KEY (`CvDescuento`)
+    REFERENCES `bdPracticaC4_1`.`cDescuentos` (`CvDescuento`)
+    ON DELETE SET NULL
     ON UPDATE CASCADE)
 ENGINE = InnoDB
 COMMENT = 'Registro de cobros y pagos de los alumnos.';
 
 
+-- -----------------------------------------------------
+-- Tabla `fResumenCobro` (Módulo Escuela de Música)
+-- Totales de fCobro por alumno y mes. Lo mantiene DatabaseManager en la misma
+-- transacción que cada cobro; se revisa con `python -m db.resumenCobros`.
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `bdPracticaC4_1`.`fResumenCobro` (
+  `CvUsuario` INT NOT NULL,
+  `Periodo` DATE NOT NULL COMMENT 'Primer día del mes.',
+  `Cobros` INT NOT NULL DEFAULT 0,
+  `Facturado` DECIMAL(12,2) NOT NULL DEFAULT 0,
+  `Descuento` DECIMAL(12,2) NOT NULL DEFAULT 0,
+  `Pagado` DECIMAL(12,2) NOT NULL DEFAULT 0,
+  `Pendiente` DECIMAL(12,2) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`CvUsuario`, `Periodo`),
+  INDEX `idx_fResumenCobro_periodo` (`Periodo` ASC),
+  CONSTRAINT `fk_fResumenCobro_mUsuario`
+    FOREIGN KEY (`CvUsuario`)
+    REFERENCES `bdPracticaC4_1`.`mUsuario` (`CvUser`)
+    ON DELETE CASCADE
+    ON UPDATE CASCADE)
+ENGINE = InnoDB
+COMMENT = 'Totales de fCobro por alumno y mes (neto = Monto - Descuento).';
+
+
 -- -----------------------------------------------------
 -- Tabla `tEvaluacion` (Módulo Escuela de Música)
 -- -----------------------------------------------------
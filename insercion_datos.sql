@@ -83,11 +83,11 @@ INSERT INTO mDtsPerson (CvNombre, CvApePat, CvApeMat, FecNac, E_mail, RedSoc, Ed
 -- (IDs de CvPerson coinciden con los inserts de arriba)
 
 INSERT INTO mUsuario (CvPerson, `Login`, `Password`, FecIni, FecVen, EdoCta) VALUES
-(1, 'director', 'Admin123*', '2025-01-01', '2026-01-01', 'True'), -- ID Usuario: 1
-(2, 'jbanana', 'Profe456#', '2025-01-01', '2026-01-01', 'True'), -- ID Usuario: 2
-(3, 'alan', 'Alumno789+', '2025-01-01', '2026-01-01', 'True'), -- ID Usuario: 3
-(4, 'rivaldo', 'Alumno101%', '2025-01-01', '2026-01-01', 'True'), -- ID Usuario: 4
-(5, 'rllamas', 'Rossa123#', '2025-01-01', '2026-01-01', 'True'); -- ID Usuario: 5
+(1, 'director', 'Admin123*', '2025-01-01', '2026-01-01', 1), -- ID Usuario: 1
+(2, 'jbanana', 'Profe456#', '2025-01-01', '2026-01-01', 1), -- ID Usuario: 2
+(3, 'alan', 'Alumno789+', '2025-01-01', '2026-01-01', 1), -- ID Usuario: 3
+(4, 'rivaldo', 'Alumno101%', '2025-01-01', '2026-01-01', 1), -- ID Usuario: 4
+(5, 'rllamas', 'Rossa123#', '2025-01-01', '2026-01-01', 1); -- ID Usuario: 5
 
 -- -----------------------------------------------------
 -- 4. TABLAS DEL PROYECTO (Depende de mUsuario y cClases)
@@ -103,6 +103,13 @@ INSERT INTO fCobro (CvUsuario, FechaCobro, `Tipo`, Monto, Descuento, Estado) VAL
 (3, '2025-10-01', 'Inscripción', 500.00, 0.00, 'Pagado'),
 (4, '2025-11-01', 'Mensualidad', 300.00, 0.00, 'Pendiente');
 
+-- El resumen por alumno y mes se carga a partir de esos cobros
+INSERT INTO fResumenCobro (CvUsuario, Periodo, Cobros, Facturado, Descuento, Pagado, Pendiente)
+SELECT CvUsuario, DATE_SUB(FechaCobro, INTERVAL DAYOFMONTH(FechaCobro) - 1 DAY), COUNT(*), SUM(Monto),
+       SUM(Descuento), SUM(IF(Estado = 'Pagado', Monto - Descuento, 0)), SUM(IF(Estado = 'Pagado', 0, Monto - Descuento))
+FROM fCobro
+GROUP BY CvUsuario, DATE_SUB(FechaCobro, INTERVAL DAYOFMONTH(FechaCobro) - 1 DAY);
+
 -- Insertamos Asistencias (Usuarios 3 y 4 en Clase 1)
 INSERT INTO eAsistencia (CvClase, CvUsuario, FechaAsistencia, Estado) VALUES
 (1, 3, '2025-11-03', 'Asistió'),
@@ -126,4 +133,7 @@ INSERT INTO `cDescuentos` (DsDescuento, Porcentaje) VALUES
 ('Sin Descuento', 0.00),
 ('Beca 10%', 0.10),
 ('Beca 25%', 0.25),
-('Apoyo 50%', 0.50);
\ No newline at end of file
+('Apoyo 50%', 0.50);
+
+-- Los cobros de arriba se capturaron sin descuento
+UPDATE fCobro SET CvDescuento = (SELECT CvDescuento FROM cDescuentos WHERE DsDescuento = 'Sin Descuento');
\ No newline at end of file